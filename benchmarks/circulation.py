@@ -0,0 +1,84 @@
+"""
+Замеры журнала выдач: заполнение синтетическими выдачами и возвратами
+и время запросов history, overdue и top на заполненном журнале.
+
+    python -m benchmarks.circulation --events 10000000 --books 100k
+"""
+import json
+import random
+import statistics
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.generator import parse_size
+from src.circulation import DAY, Circulation
+from src.models import BookStatus, Change, ChangeType
+
+BATCH_SIZE = 10_000
+START = 1_600_000_000
+
+
+def fill(circulation: Circulation, events: int, books: int, seed: int = 0) -> None:
+    """
+    Записывает примерно events событий по books книгам за период около трёх лет.
+    Популярность книг неравномерна: часть книг выдаётся намного чаще остальных.
+    """
+    rng = random.Random(seed)
+    issued: set[int] = set()
+    now = START
+    circulation.clock = lambda: now
+    written = 0
+    while written < events:
+        changes = []
+        for _ in range(BATCH_SIZE):
+            number = int(books * rng.random() ** 3)
+            if number in issued:
+                issued.discard(number)
+                changes.append(Change(ChangeType.STATUS, f"book-{number}", status=BookStatus.AVAILABLE))
+            else:
+                issued.add(number)
+                changes.append(Change(ChangeType.STATUS, f"book-{number}", status=BookStatus.ISSUED))
+        written += circulation.record(changes)
+        now += 3 * 365 * DAY * BATCH_SIZE // events
+
+
+def median_time(action: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Замеры запросов к журналу выдач")
+    parser.add_argument("--events", type=parse_size, default=1_000_000, help="Число событий: 100k, 1m или число")
+    parser.add_argument("--books", type=parse_size, default=100_000, help="Число книг")
+    parser.add_argument("--repeat", type=int, default=5, help="Число повторений")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        circulation = Circulation(str(Path(directory) / "books.loans"))
+        start = time.perf_counter()
+        fill(circulation, args.events, args.books)
+        fill_time = time.perf_counter() - start
+
+        end = circulation.clock()
+        results = {
+            "fill": fill_time,
+            "history": median_time(lambda: circulation.history("book-0", 20), args.repeat),
+            "overdue": median_time(lambda: circulation.overdue(now=end, limit=100), args.repeat),
+            "top.all": median_time(lambda: circulation.top(limit=10), args.repeat),
+            "top.month": median_time(lambda: circulation.top(since=end - 30 * DAY, limit=10), args.repeat),
+        }
+        circulation.close()
+
+    print(json.dumps({"events": args.events, "books": args.books, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Сравнение способов выполнения search_books и подсчётов на каталоге в памяти:
+перебор с BookFilter, индексы Catalogue и маски ColumnStore (с NumPy).
+
+    python -m benchmarks.columnar --size 1m
+"""
+import json
+import statistics
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from typing import Callable
+from unittest.mock import patch
+
+from benchmarks.generator import generate_books, parse_size
+from src.catalogue import Catalogue
+from src.columnar import VECTORIZED
+from src.models import BookFilter, BookStatus
+
+QUERIES = {
+    "year": {"year": 1900},
+    "year_range": {"year_from": 1900, "year_to": 1950},
+    "status": {"status": BookStatus.AVAILABLE},
+    "author": {"author": "толстой"},
+    "range_status_author": {"year_from": 1850, "year_to": 2000, "status": BookStatus.ISSUED, "author": "а"},
+}
+
+
+def median_time(action: Callable[[], object], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Сравнение фильтрации перебором, индексами и масками")
+    parser.add_argument("--size", type=parse_size, default=100_000, help="Число книг: 10k, 100k, 1m")
+    parser.add_argument("--repeat", type=int, default=5, help="Число повторений")
+    args = parser.parse_args()
+
+    books = list(generate_books(args.size))
+    catalogue = Catalogue(books)
+    results = {}
+    for name, query in QUERIES.items():
+        book_filter = BookFilter(**query)
+        timings = {
+            "loop": median_time(lambda: [book for book in books if book_filter(book)], args.repeat),
+        }
+        with patch("src.catalogue.VECTORIZED", False):
+            timings["indexes"] = median_time(lambda: catalogue.search(**query), args.repeat)
+        if VECTORIZED:
+            timings["columns"] = median_time(lambda: catalogue.search(**query), args.repeat)
+        results[f"search.{name}"] = timings
+
+    aggregates = {
+        "status": (lambda: Counter(book.status for book in books), catalogue.count_by_status),
+        "year": (lambda: Counter(book.year for book in books), catalogue.count_by_year),
+        "author": (lambda: Counter(book.author for book in books), catalogue.count_by_author),
+    }
+    for name, (loop, columns) in aggregates.items():
+        results[f"count.{name}"] = {
+            "loop": median_time(loop, args.repeat),
+            "columns": median_time(columns, args.repeat),
+        }
+
+    print(json.dumps({"size": args.size, "numpy": VECTORIZED, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Сравнение двух запусков benchmarks.run.
+
+Сценарии сопоставляются по имени, типу хранилища и размеру каталога,
+сравниваются медианы. Если какой-либо сценарий замедлился больше чем
+в threshold раз, команда завершается с кодом 1.
+
+    python -m benchmarks.compare before.json after.json --threshold 1.2
+"""
+import json
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import NamedTuple
+
+Key = tuple[str, str, int]
+
+
+class Comparison(NamedTuple):
+    """
+    Сравнение одного сценария: медианы до и после в секундах
+    """
+    key: Key
+    before: float
+    after: float
+
+    @property
+    def ratio(self) -> float:
+        return self.after / self.before if self.before > 0 else float("inf")
+
+
+def load_results(path: Path) -> dict[Key, float]:
+    """
+    Читает файл результатов и возвращает медианы по сценариям
+    """
+    try:
+        report = json.loads(path.read_text(encoding="utf-8"))
+        return {
+            (result["scenario"], result["storage"], result["size"]): result["median"]
+            for result in report["results"]
+        }
+    except FileNotFoundError:
+        raise ValueError(f"Файл {path} не найден")
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError(f"Неверный формат файла результатов {path}: {e}")
+
+
+def compare(before: dict[Key, float], after: dict[Key, float]) -> list[Comparison]:
+    """
+    Сопоставляет сценарии, которые есть в обоих запусках
+    """
+    return [Comparison(key, before[key], after[key]) for key in before if key in after]
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Сравнение результатов замеров")
+    parser.add_argument("before", type=Path, help="Результаты до изменения")
+    parser.add_argument("after", type=Path, help="Результаты после изменения")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="Допустимое замедление: отношение медиан после/до (по умолчанию 1.2)",
+    )
+    args = parser.parse_args()
+
+    try:
+        comparisons = compare(load_results(args.before), load_results(args.after))
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        sys.exit(2)
+
+    regressions = 0
+    for comparison in comparisons:
+        scenario, storage, size = comparison.key
+        regression = comparison.ratio > args.threshold
+        regressions += regression
+        print(
+            f"{scenario:<28} {storage:<8} {size:>9} "
+            f"{comparison.before * 1000:>10.2f} мс {comparison.after * 1000:>10.2f} мс "
+            f"{comparison.ratio:>6.2f}x{'  замедление' if regression else ''}"
+        )
+
+    if regressions:
+        print(f"Замедлившихся сценариев: {regressions}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Замеры поиска дубликатов: группировка синтетического каталога по отпечаткам,
+поиск похожих книг через MinHash и проверка дубликата при добавлении.
+
+    python -m benchmarks.dedupe --books 1m
+"""
+import json
+import time
+from argparse import ArgumentParser
+
+from benchmarks.circulation import median_time
+from benchmarks.generator import generate_books, parse_size
+from src.catalogue import Catalogue
+from src.dedupe import duplicate_groups
+
+LOOKUPS = 10_000
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Замеры поиска дубликатов")
+    parser.add_argument("--books", type=parse_size, default=100_000, help="Число книг: 100k, 1m или число")
+    parser.add_argument("--repeat", type=int, default=1, help="Число повторений группировки")
+    parser.add_argument("--no-fuzzy", action="store_true", help="Не замерять поиск похожих книг")
+    args = parser.parse_args()
+
+    books = list(generate_books(args.books))
+    results = {}
+    groups = duplicate_groups(books)
+    results["exact"] = median_time(lambda: duplicate_groups(books), args.repeat)
+    counts = {"exact": [len(groups), sum(map(len, groups))]}
+    if not args.no_fuzzy:
+        start = time.perf_counter()
+        groups = duplicate_groups(books, fuzzy=True)
+        results["fuzzy"] = time.perf_counter() - start
+        counts["fuzzy"] = [len(groups), sum(map(len, groups))]
+
+    catalogue = Catalogue(books)
+    start = time.perf_counter()
+    catalogue.find_duplicates("", "", 0)
+    results["index.build"] = time.perf_counter() - start
+    sample = books[:LOOKUPS]
+    start = time.perf_counter()
+    for book in sample:
+        catalogue.find_duplicates(book.title, book.author, book.year)
+    results["index.lookup"] = (time.perf_counter() - start) / len(sample)
+
+    print(json.dumps({"books": args.books, "groups": counts, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Детерминированный генератор синтетических каталогов.
+
+Названия и авторы собираются из списков русских и английских слов и имён,
+частоты слов убывают по закону Ципфа, как в реальных каталогах, поэтому
+часть слов встречается в тысячах названий, а большинство — редко.
+Один и тот же seed всегда даёт одни и те же книги, включая id.
+
+    python -m benchmarks.generator 100k data/books.json
+"""
+import random
+import uuid
+from argparse import ArgumentParser
+from itertools import accumulate
+from pathlib import Path
+from typing import Iterator
+
+from src.codec import encode_books
+from src.models import Book, BookStatus
+
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+RUSSIAN_WORDS = (
+    "война мир время жизнь история любовь дом дорога город ночь день море река лес сад "
+    "сердце душа свет тень память судьба путь книга слово песня сказка тайна остров "
+    "звезда небо земля огонь вода ветер снег зима весна лето осень мастер капитан "
+    "дочь сын отец мать брат сестра друг враг герой странник охотник последний первый "
+    "белый чёрный красный тихий долгий старый новый золотой потерянный великий "
+    "записки повесть рассказы хроника легенда путешествие возвращение начало конец"
+).split()
+
+ENGLISH_WORDS = (
+    "war peace time life history love house road city night day sea river forest garden "
+    "heart soul light shadow memory fate path book word song tale secret island star "
+    "sky earth fire water wind snow winter spring summer autumn master captain daughter "
+    "son father mother brother sister friend enemy hero wanderer hunter last first white "
+    "black red silent long old new golden lost great notes story chronicle legend "
+    "journey return beginning end python data systems guide introduction"
+).split()
+
+RUSSIAN_FIRST_NAMES = (
+    "Александр Алексей Анна Борис Валентин Вера Владимир Галина Григорий Дмитрий Евгений "
+    "Екатерина Иван Ирина Лев Людмила Марина Михаил Николай Ольга Пётр Сергей Татьяна Фёдор"
+).split()
+
+RUSSIAN_LAST_NAMES = (
+    "Толстой Достоевский Чехов Пушкин Гоголь Тургенев Бунин Булгаков Пастернак Набоков "
+    "Ахматова Цветаева Лермонтов Горький Шолохов Платонов Зощенко Паустовский Куприн "
+    "Андреев Иванов Петров Смирнов Кузнецов Попов Соколов Лебедев Козлов Новиков Морозов "
+    "Волков Соловьёв Васильев Зайцев Павлов Семёнов Голубев Виноградов Богданов Воробьёв"
+).split()
+
+ENGLISH_FIRST_NAMES = (
+    "James Mary John Patricia Robert Jennifer Michael Linda William Elizabeth David "
+    "Barbara Richard Susan Joseph Jessica Thomas Sarah Charles Karen George Emily"
+).split()
+
+ENGLISH_LAST_NAMES = (
+    "Smith Johnson Williams Brown Jones Garcia Miller Davis Wilson Anderson Taylor Thomas "
+    "Moore Jackson Martin Lee Thompson White Harris Clark Lewis Walker Hall Allen Young "
+    "King Wright Scott Green Baker Adams Nelson Hill Campbell Mitchell Roberts Carter"
+).split()
+
+
+def parse_size(value: str) -> int:
+    """
+    Разбирает размер каталога: число или одно из обозначений 10k, 100k, 1m
+    """
+    value = value.lower()
+    if value in SIZES:
+        return SIZES[value]
+    return int(value)
+
+
+def generate_books(count: int, seed: int = 0) -> Iterator[Book]:
+    """
+    Возвращает count детерминированно сгенерированных книг.
+    Около трети книг — на английском, примерно каждая пятая выдана.
+    """
+    rng = random.Random(seed)
+    languages = (
+        (RUSSIAN_WORDS, RUSSIAN_FIRST_NAMES, RUSSIAN_LAST_NAMES),
+        (ENGLISH_WORDS, ENGLISH_FIRST_NAMES, ENGLISH_LAST_NAMES),
+    )
+    weights = [
+        (list(accumulate(1 / rank for rank in range(1, len(words) + 1))), words)
+        for words, _, _ in languages
+    ]
+    # Авторов меньше, чем книг, и у популярных авторов много книг
+    authors = [
+        [f"{rng.choice(first)} {rng.choice(last)}" for _ in range(max(count // 20, 10))]
+        for _, first, last in languages
+    ]
+    author_weights = [list(accumulate(1 / rank for rank in range(1, len(names) + 1))) for names in authors]
+
+    for _ in range(count):
+        language = 1 if rng.random() < 0.33 else 0
+        cumulative, words = weights[language]
+        title = " ".join(rng.choices(words, cum_weights=cumulative, k=rng.randint(1, 5)))
+        author = rng.choices(authors[language], cum_weights=author_weights[language])[0]
+        yield Book(
+            title=title[0].upper() + title[1:],
+            author=author,
+            year=rng.randint(1800, 2024),
+            status=BookStatus.ISSUED if rng.random() < 0.2 else BookStatus.AVAILABLE,
+            id=str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        )
+
+
+def write_catalogue(path: Path, count: int, seed: int = 0) -> None:
+    """
+    Записывает сгенерированный каталог в файл формата books.json
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(encode_books(generate_books(count, seed)), encoding="utf-8")
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Генерация синтетического каталога книг")
+    parser.add_argument("size", type=parse_size, help="Число книг: 10k, 100k, 1m или число")
+    parser.add_argument("path", type=Path, help="Путь к создаваемому books.json")
+    parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора")
+    args = parser.parse_args()
+
+    write_catalogue(args.path, args.size, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Замеры постраничной выдачи по курсору: первая и дальняя страница
+отсортированного списка в каталоге в памяти и в SQLite против сортировки
+всех книг и среза по смещению.
+
+    python -m benchmarks.paging --books 1m --page 500
+"""
+import json
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from benchmarks.circulation import median_time
+from benchmarks.generator import generate_books, parse_size
+from src.catalogue import Catalogue
+from src.models import Book, BookFilter
+from src.paging import PAGE_SIZE, Order
+from src.services import LibraryService
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+
+def page_times(service: LibraryService, order_by: str, page: int, repeat: int) -> dict:
+    """
+    Замеряет первую страницу и страницу номер page, к которой переходит по курсорам
+    """
+    cursor = None
+    for _ in range(page - 1):
+        cursor = service.page_books(order_by, cursor, PAGE_SIZE).cursor
+    return {
+        "first": median_time(lambda: service.page_books(order_by, None, PAGE_SIZE), repeat),
+        f"page-{page}": median_time(lambda: service.page_books(order_by, cursor, PAGE_SIZE), repeat),
+    }
+
+
+def change(catalogue: Catalogue, book: Book) -> None:
+    catalogue.add(book)
+    catalogue.remove(book.id)
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Замеры постраничной выдачи по курсору")
+    parser.add_argument("--books", type=parse_size, default=100_000, help="Число книг: 100k, 1m или число")
+    parser.add_argument("--page", type=int, default=500, help="Номер дальней страницы")
+    parser.add_argument("--order-by", default="title", help="Порядок книг")
+    parser.add_argument("--repeat", type=int, default=5, help="Число повторений")
+    args = parser.parse_args()
+
+    books = list(generate_books(args.books))
+    order = Order.parse(args.order_by)
+    offset = (args.page - 1) * PAGE_SIZE
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        storage = Storage(str(Path(directory) / "books.json"))
+        storage.save_books(books)
+        service = LibraryService(storage)
+        service.preload()
+        start = time.perf_counter()
+        service.page_books(args.order_by, None, PAGE_SIZE)
+        results["catalogue.order.build"] = time.perf_counter() - start
+        results["catalogue"] = page_times(service, args.order_by, args.page, args.repeat)
+        results["catalogue"]["sort.offset"] = median_time(
+            lambda: sorted(books, key=order.key, reverse=order.descending)[offset:offset + PAGE_SIZE], 1
+        )
+
+        stream = LibraryService(storage)
+        start = time.perf_counter()
+        stream.page_books(args.order_by, None, PAGE_SIZE)
+        results["stream.first"] = time.perf_counter() - start
+
+        sqlite = SQLiteStorage(str(Path(directory) / "books.db"))
+        start = time.perf_counter()
+        sqlite.save_books(books)
+        results["sqlite.save"] = time.perf_counter() - start
+        results["sqlite"] = page_times(LibraryService(sqlite), args.order_by, args.page, args.repeat)
+        sqlite.close()
+
+    # Цена поддержки порядка при изменении: вставка и удаление книги в каталоге
+    catalogue = Catalogue(books)
+    new_book = Book("Новая книга", "Автор", 2000)
+    results["catalogue.add_remove"] = median_time(lambda: change(catalogue, new_book), args.repeat)
+    catalogue.page(order, None, 1, BookFilter())
+    results["catalogue.add_remove.ordered"] = median_time(lambda: change(catalogue, new_book), args.repeat)
+
+    print(json.dumps({"books": args.books, "page": args.page, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
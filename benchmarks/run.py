@@ -0,0 +1,297 @@
+"""
+Замеры операций LibraryService и команд CLI на синтетических каталогах.
+
+Для каждого размера каталога и типа хранилища выполняются сценарии сервиса
+(в том же процессе), команды CLI (отдельными процессами, как их запускает
+пользователь) и замеры времени импортов при запуске CLI по отчёту
+python -X importtime. Результаты выводятся в JSON, который можно сравнить
+с предыдущим запуском через benchmarks.compare.
+
+    python -m benchmarks.run --sizes 10k 100k --output results.json
+"""
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.generator import generate_books, parse_size, write_catalogue
+from src.cli import print_books_table
+from src.main import DATA_FILES, create_storage
+from src.server import create_server
+from src.services import LibraryService
+
+ROOT = Path(__file__).resolve().parent.parent
+STORAGES = ("json", "journal", "sqlite", "sharded", "binary")
+
+
+class Workspace:
+    """
+    Рабочий каталог замеров с данными в раскладке CLI (data/books.json, data/books.db, ...)
+    """
+
+    def __init__(self, directory: Path, kind: str, catalogue: Path) -> None:
+        self.directory = directory
+        self.kind = kind
+        self.data_file = directory / DATA_FILES[kind]
+        self.data_file.parent.mkdir(parents=True, exist_ok=True)
+        if kind in ("sqlite", "sharded", "binary"):
+            storage = create_storage(kind, str(self.data_file))
+            storage.save_books(create_storage("json", str(catalogue)).iter_books())
+            storage.close()
+        else:
+            shutil.copyfile(catalogue, self.data_file)
+
+    def service(self) -> LibraryService:
+        """
+        Создаёт сервис с пустыми кешами, как в новом процессе CLI
+        """
+        return LibraryService(
+            create_storage(self.kind, str(self.data_file)),
+            search_index_path=f"{self.data_file}.search",
+        )
+
+
+def timed(action: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    action()
+    return time.perf_counter() - start
+
+
+def service_scenarios(workspace: Workspace) -> dict[str, Callable[[], float]]:
+    """
+    Возвращает сценарии сервиса: каждый вызов выполняет одно повторение и возвращает его время.
+    Сценарии с тёплым сервисом используют каталог и индексы, загруженные заранее.
+    """
+    warm = workspace.service()
+    warm.preload()
+    warm.find_books("война")
+    sample = warm.get_all_books()[len(warm.get_all_books()) // 2]
+
+    def add_and_remove() -> float:
+        book = warm.add_book("Тестовая книга", "Тестовый автор", 2000)
+        return timed(lambda: warm.remove_book(book.id))
+
+    def batch() -> float:
+        books = list(generate_books(1000, seed=time.perf_counter_ns()))
+        elapsed = timed(lambda: warm.add_books(books))
+        warm.remove_books(book.id for book in books)
+        return elapsed
+
+    statuses = ["выдана", "в наличии"]
+
+    def update_status() -> float:
+        statuses.reverse()
+        return timed(lambda: warm.update_book_status(sample.id, statuses[0]))
+
+    def print_table() -> float:
+        books = warm.get_all_books()
+        return timed(lambda: print_books_table(books, io.StringIO()))
+
+    def cold(action: Callable[[LibraryService], object]) -> Callable[[], float]:
+        def scenario() -> float:
+            service = workspace.service()
+            elapsed = timed(lambda: action(service))
+            close = getattr(service.storage, "close", None)
+            if close is not None:
+                close()
+            return elapsed
+        return scenario
+
+    return {
+        "service.load": cold(lambda service: service.get_all_books()),
+        "service.iter_books": cold(lambda service: sum(1 for _ in service.iter_books())),
+        "service.search.author": lambda: timed(lambda: warm.search_books(author="толстой")),
+        "service.search.title": lambda: timed(lambda: warm.search_books(title="мир")),
+        "service.search.year_range": lambda: timed(
+            lambda: warm.search_books(year_from=1900, year_to=1910)
+        ),
+        "service.search.status": lambda: timed(lambda: warm.search_books(status="выдана")),
+        "service.find": lambda: timed(lambda: warm.find_books("война мир")),
+        "service.add_book": lambda: timed(
+            lambda: warm.add_book("Тестовая книга", "Тестовый автор", 2000)
+        ),
+        "service.remove_book": add_and_remove,
+        "service.update_book_status": update_status,
+        "service.add_books.1000": batch,
+        "service.print_books_table": print_table,
+    }
+
+
+def cli_scenarios(workspace: Workspace) -> dict[str, Callable[[], float]]:
+    """
+    Возвращает сценарии команд CLI, каждая команда запускается отдельным процессом
+    """
+    sample = workspace.service().get_all_books()[0]
+    environment = {**os.environ, "PYTHONPATH": str(ROOT)}
+    environment.pop("LIBRARY_SERVER", None)
+
+    def run(*args: str) -> float:
+        command = [sys.executable, "-m", "src.main", "--storage", workspace.kind, *args]
+        return timed(
+            lambda: subprocess.run(
+                command,
+                cwd=workspace.directory,
+                env=environment,
+                stdout=subprocess.DEVNULL,
+                check=True,
+            )
+        )
+
+    return {
+        "cli.help": lambda: run("--help"),
+        "cli.list": lambda: run("list"),
+        "cli.search": lambda: run("search", "--author", "Толстой"),
+        "cli.find": lambda: run("find", "война мир"),
+        "cli.add": lambda: run("add", "--title", "Тестовая книга", "--author", "Автор", "--year", "2000"),
+        "cli.update": lambda: run("update", "--id", sample.id, "--status", "выдана"),
+    }
+
+
+def total_import_time(report: str) -> float:
+    """
+    Суммирует время импортов верхнего уровня из отчёта -X importtime в секундах
+    """
+    total = 0
+    for line in report.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        # Вложенные импорты отмечены отступом и уже учтены во времени родителя
+        name = parts[2][1:]
+        if not name.startswith(" "):
+            total += int(parts[1])
+    return total / 1_000_000
+
+
+def startup_scenarios(workspace: Workspace) -> dict[str, Callable[[], float]]:
+    """
+    Возвращает сценарии времени импортов при запуске команд CLI.
+    В отличие от времени процесса, эта величина мало зависит от шума
+    и показывает, какие модули команда загружает зря.
+    """
+    sample = workspace.service().get_all_books()[0]
+    environment = {**os.environ, "PYTHONPATH": str(ROOT)}
+    environment.pop("LIBRARY_SERVER", None)
+
+    def run(*args: str) -> float:
+        command = [sys.executable, "-X", "importtime", "-m", "src.main", "--storage", workspace.kind, *args]
+        result = subprocess.run(
+            command,
+            cwd=workspace.directory,
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=True,
+        )
+        return total_import_time(result.stderr)
+
+    # Сервер в фоновом потоке живёт до конца замеров: команде через --server
+    # нужен только клиент, и её импорты не должны зависеть от хранилища
+    server = create_server(workspace.service(), "127.0.0.1", 0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    return {
+        "startup.help": lambda: run("--help"),
+        "startup.list": lambda: run("list", "--limit", "1"),
+        "startup.update": lambda: run("update", "--id", sample.id, "--status", "выдана"),
+        "startup.server.list": lambda: run("--server", url, "list", "--limit", "1"),
+    }
+
+
+def measure(scenario: Callable[[], float], repeat: int) -> dict:
+    times = [scenario() for _ in range(repeat)]
+    return {
+        "repeat": repeat,
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+    }
+
+
+def run_benchmarks(
+    sizes: list[int],
+    storages: list[str],
+    groups: list[str],
+    repeat: int,
+    seed: int = 0,
+    log: Callable[[str], None] = lambda message: None,
+) -> dict:
+    """
+    Выполняет сценарии для всех сочетаний размера и хранилища и возвращает результаты
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for size in sizes:
+            catalogue = Path(temp_dir) / f"catalogue-{size}.json"
+            write_catalogue(catalogue, size, seed)
+            for kind in storages:
+                workspace = Workspace(Path(temp_dir) / f"{kind}-{size}", kind, catalogue)
+                scenarios = {}
+                if "service" in groups:
+                    scenarios.update(service_scenarios(workspace))
+                if "cli" in groups:
+                    scenarios.update(cli_scenarios(workspace))
+                if "startup" in groups:
+                    scenarios.update(startup_scenarios(workspace))
+                for name, scenario in scenarios.items():
+                    result = {"scenario": name, "storage": kind, "size": size}
+                    result.update(measure(scenario, repeat))
+                    log(f"{name:<28} {kind:<8} {size:>9} {result['median'] * 1000:>10.2f} мс")
+                    results.append(result)
+
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Замеры операций библиотеки")
+    parser.add_argument(
+        "--sizes", nargs="+", type=parse_size, default=[10_000], help="Размеры каталога: 10k 100k 1m"
+    )
+    parser.add_argument("--storage", nargs="+", choices=STORAGES, default=list(STORAGES))
+    parser.add_argument(
+        "--only", nargs="+", choices=["service", "cli", "startup"], default=["service", "cli", "startup"]
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Число повторений сценария")
+    parser.add_argument("--seed", type=int, default=0, help="Начальное значение генератора")
+    parser.add_argument("--output", type=Path, help="Файл для результатов (по умолчанию stdout)")
+    args = parser.parse_args()
+
+    report = run_benchmarks(
+        args.sizes,
+        args.storage,
+        args.only,
+        args.repeat,
+        args.seed,
+        log=lambda message: print(message, file=sys.stderr),
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
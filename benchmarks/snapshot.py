@@ -0,0 +1,52 @@
+"""
+Замеры снимков каталога: сохранение в books.json (encode_books и запись файла)
+против записи снимка из сжатых фрагментов, чтение снимка и размеры файлов.
+
+    python -m benchmarks.snapshot --books 1m --workers 4
+"""
+import json
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+from benchmarks.generator import generate_books, parse_size
+from src.snapshot import read_snapshot, write_snapshot
+from src.storage import Storage
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Замеры записи и чтения снимков каталога")
+    parser.add_argument("--books", type=parse_size, default=100_000, help="Число книг: 100k, 1m или число")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="Числа процессов для замеров")
+    parser.add_argument("--compression", nargs="+", default=["gzip"], help="Способы сжатия")
+    args = parser.parse_args()
+
+    books = list(generate_books(args.books))
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        storage = Storage(str(Path(directory) / "books.json"))
+        start = time.perf_counter()
+        storage.save_books(books)
+        results["save_books"] = {"seconds": time.perf_counter() - start, "bytes": storage.file_path.stat().st_size}
+
+        for compression in args.compression:
+            for workers in args.workers:
+                target = Path(directory) / f"{compression}-{workers}"
+                start = time.perf_counter()
+                manifest = write_snapshot(books, str(target), compression=compression, workers=workers)
+                export_time = time.perf_counter() - start
+                start = time.perf_counter()
+                count = sum(1 for _ in read_snapshot(str(target), workers=workers))
+                results[f"{compression}.workers-{workers}"] = {
+                    "export": export_time,
+                    "restore": time.perf_counter() - start,
+                    "bytes": sum(chunk["bytes"] for chunk in manifest["chunks"]),
+                    "books": count,
+                }
+
+    print(json.dumps({"books": args.books, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
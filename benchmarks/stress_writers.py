@@ -0,0 +1,71 @@
+"""
+Нагрузочная проверка параллельной записи.
+
+Несколько процессов одновременно добавляют книги через LibraryService
+в одно хранилище, после чего проверяется, что ни одно добавление не потеряно.
+
+    python -m benchmarks.stress_writers --storage journal --writers 8 --updates 100
+"""
+import json
+import tempfile
+import time
+from argparse import ArgumentParser
+from multiprocessing import Pool
+from pathlib import Path
+
+from src.main import DATA_FILES, create_storage
+from src.services import LibraryService
+
+
+def write_books(kind: str, file_path: str, writer: int, updates: int) -> None:
+    """
+    Добавляет updates книг от имени одного процесса-писателя
+    """
+    service = LibraryService(create_storage(kind, file_path))
+    for number in range(updates):
+        service.add_book(f"Книга {writer}-{number}", f"Писатель {writer}", 2000)
+
+
+def run(kind: str, writers: int, updates: int) -> dict:
+    """
+    Запускает писателей параллельно и возвращает результат проверки
+    """
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = str(Path(temp_dir) / Path(DATA_FILES[kind]).name)
+        create_storage(kind, file_path)
+
+        start = time.perf_counter()
+        with Pool(writers) as pool:
+            pool.starmap(
+                write_books, [(kind, file_path, writer, updates) for writer in range(writers)]
+            )
+        seconds = time.perf_counter() - start
+
+        books = create_storage(kind, file_path).load_books()
+        expected = writers * updates
+        return {
+            "storage": kind,
+            "writers": writers,
+            "updates": expected,
+            "saved": len(books),
+            "lost": expected - len(books),
+            "seconds": round(seconds, 3),
+            "updates_per_second": round(expected / seconds, 1),
+        }
+
+
+def main() -> None:
+    parser = ArgumentParser(description="Проверка отсутствия потерянных обновлений")
+    parser.add_argument("--storage", choices=list(DATA_FILES), default="json")
+    parser.add_argument("--writers", type=int, default=4, help="Число процессов-писателей")
+    parser.add_argument("--updates", type=int, default=50, help="Добавлений на писателя")
+    args = parser.parse_args()
+
+    result = run(args.storage, args.writers, args.updates)
+    print(json.dumps(result, ensure_ascii=False))
+    if result["lost"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
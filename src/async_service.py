@@ -0,0 +1,193 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, TypeVar
+
+from src.models import Book, Change
+from src.paging import Page
+from src.services import LibraryService
+
+T = TypeVar("T")
+
+
+class ReadWriteLock:
+    """
+    Блокировка для asyncio: читатели работают одновременно, писатель — один.
+    Ожидающий писатель не пропускает вперёд новых читателей, поэтому поток
+    запросов на чтение не может задержать запись бесконечно.
+    """
+
+    def __init__(self) -> None:
+        self._condition = asyncio.Condition()
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @asynccontextmanager
+    async def read(self) -> AsyncIterator[None]:
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: not self._writing and not self._waiting_writers
+            )
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._readers -= 1
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def write(self) -> AsyncIterator[None]:
+        async with self._condition:
+            self._waiting_writers += 1
+            try:
+                await self._condition.wait_for(lambda: not self._writing and not self._readers)
+            finally:
+                self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+
+class AsyncLibraryService:
+    """
+    Асинхронный интерфейс к LibraryService.
+
+    Вызовы сервиса выполняются в потоках, чтобы чтение файлов не блокировало
+    цикл событий. Запросы на чтение выполняются параллельно, а изменения —
+    по одному и только когда нет активных читателей.
+    """
+
+    def __init__(self, library_service: LibraryService) -> None:
+        self.library_service = library_service
+        self._lock = ReadWriteLock()
+
+    async def preload(self) -> None:
+        """
+        Заранее загружает каталог в память
+        """
+        await self._write(self.library_service.preload)
+
+    async def add_book(self, title: str, author: str, year: int, merge_duplicates: bool = False) -> Book:
+        """
+        Добавляет новую книгу в библиотеку и возвращает её
+        или, с merge_duplicates, уже существующую такую же книгу
+        """
+        return await self._write(self.library_service.add_book, title, author, year, merge_duplicates)
+
+    async def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Добавляет книги одним сохранением и возвращает их количество
+        """
+        return await self._write(self.library_service.add_books, list(books))
+
+    async def remove_book(self, book_id: str) -> None:
+        """
+        Удаляет книгу по её id
+        """
+        await self._write(self.library_service.remove_book, book_id)
+
+    async def remove_books(self, book_ids: Iterable[str]) -> int:
+        """
+        Удаляет книги по id одним сохранением и возвращает их количество
+        """
+        return await self._write(self.library_service.remove_books, list(book_ids))
+
+    async def update_book_status(
+        self,
+        book_id: str,
+        status: str,
+        borrower: str | None = None,
+        days: int | None = None,
+    ) -> None:
+        """
+        Обновляет статус книги по её id
+        """
+        await self._write(self.library_service.update_book_status, book_id, status, borrower, days)
+
+    async def update_statuses(self, updates: Iterable[tuple[str, str]]) -> int:
+        """
+        Обновляет статусы книг по парам (id, статус) одним сохранением
+        """
+        return await self._write(self.library_service.update_statuses, list(updates))
+
+    async def apply_changes(self, changes: Iterable[Change]) -> int:
+        """
+        Проверяет и применяет пакет изменений одним сохранением
+        """
+        return await self._write(self.library_service.apply_changes, list(changes))
+
+    async def search_books(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: str | None = None,
+        order_by: str | None = None,
+    ) -> list[Book]:
+        """
+        Возвращает список книг, отфильтрованных по переданным критериям
+        """
+        return await self._read(
+            self.library_service.search_books, title, author, year, year_from, year_to, status, order_by
+        )
+
+    async def page_books(
+        self,
+        order_by: str = "title",
+        cursor: str | None = None,
+        limit: int | None = 20,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: str | None = None,
+    ) -> Page:
+        """
+        Возвращает страницу найденных книг в порядке order_by и курсор следующей страницы
+        """
+        return await self._read(
+            self.library_service.page_books,
+            order_by,
+            cursor,
+            limit,
+            title,
+            author,
+            year,
+            year_from,
+            year_to,
+            status,
+        )
+
+    async def find_books(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Полнотекстовый поиск по названию и автору
+        """
+        return await self._read(self.library_service.find_books, query, limit)
+
+    async def get_all_books(self, order_by: str | None = None) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке добавления или в порядке order_by
+        """
+        return await self._read(self.library_service.get_all_books, order_by)
+
+    async def compact_storage(self) -> None:
+        """
+        Сворачивает журнал изменений хранилища в снимок
+        """
+        await self._write(self.library_service.compact_storage)
+
+    async def _read(self, method: Callable[..., T], *args) -> T:
+        async with self._lock.read():
+            return await asyncio.to_thread(method, *args)
+
+    async def _write(self, method: Callable[..., T], *args) -> T:
+        async with self._lock.write():
+            return await asyncio.to_thread(method, *args)
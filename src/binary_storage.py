@@ -0,0 +1,496 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import ContextManager, Iterable, Iterator
+
+from src.models import Book, BookFilter, BookStatus, Change, ChangeType
+from src.storage import Storage, lock_file, write_atomic
+
+MAGIC = b"LIBBOOK\x00"
+FORMAT_VERSION = 2
+# Сигнатура, версия, число книг и смещения разделов файла для каждой версии.
+# Версия 2 добавила столбец id в формате UUID по 16 байт; файлы версии 1 читаются.
+HEADERS = {1: struct.Struct("<8sII9Q"), 2: struct.Struct("<8sII10Q")}
+PREFIX = struct.Struct("<8sI")
+UUID_SIZE = 16
+NIL_UUID = bytes(UUID_SIZE)
+STATUSES = list(BookStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def _to_bytes(column: array) -> bytes:
+    """
+    Возвращает байты столбца в порядке little-endian, принятом в файле
+    """
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _pack_id(book_id: str) -> bytes | None:
+    """
+    Возвращает 16 байт UUID, если id записан в каноническом виде
+    (строчные шестнадцатеричные цифры, группы 8-4-4-4-12), иначе None.
+    Нулевой UUID не упаковывается: нули в столбце означают id в куче строк.
+    """
+    if len(book_id) != 36 or book_id[8:24:5] != "----" or book_id != book_id.lower():
+        return None
+    try:
+        packed = bytes.fromhex(book_id.replace("-", ""))
+    except ValueError:
+        return None
+    # Ровно 16 байт получаются, только если остальные 32 символа — шестнадцатеричные цифры:
+    # лишние дефисы и пробелы, которые fromhex пропускает, уменьшили бы число байтов
+    return packed if len(packed) == UUID_SIZE and packed != NIL_UUID else None
+
+
+def _unpack_id(packed: bytes) -> str:
+    digits = packed.hex()
+    return f"{digits[:8]}-{digits[8:12]}-{digits[12:16]}-{digits[16:20]}-{digits[20:]}"
+
+
+def _strings(values: list[bytes]) -> tuple[bytes, bytes]:
+    """
+    Возвращает таблицу смещений (count + 1 чисел) и кучу строк столбца
+    """
+    offsets = array("Q", [0])
+    position = 0
+    for value in values:
+        position += len(value)
+        offsets.append(position)
+    return _to_bytes(offsets), b"".join(values)
+
+
+def encode_catalogue(books: Iterable[Book]) -> bytes:
+    """
+    Сериализует книги в двоичный формат.
+
+    Файл состоит из заголовка и разделов, выровненных по 8 байт:
+    для названий и авторов — таблица смещений и куча строк UTF-8,
+    год — столбец int32, статус — столбец байтов, и порядок записей
+    для двоичного поиска по id.
+
+    Id в каноническом виде UUID хранятся столбцом по 16 байт вместо 36 байт
+    строки, остальные id — в куче строк, как названия. В порядке записей
+    сначала идут упакованные id по возрастанию байтов, затем остальные,
+    поэтому поиск сравнивает байты из файла, не восстанавливая строки.
+    """
+    books = list(books)
+    packed = [_pack_id(book.id) for book in books]
+    ids = [b"" if uuid else book.id.encode("utf-8") for book, uuid in zip(books, packed)]
+    numbers = range(len(books))
+    order = sorted((i for i in numbers if packed[i]), key=packed.__getitem__)
+    order += sorted((i for i in numbers if not packed[i]), key=ids.__getitem__)
+    sections = [
+        *_strings(ids),
+        b"".join(uuid or NIL_UUID for uuid in packed),
+        *_strings([book.title.encode("utf-8") for book in books]),
+        *_strings([book.author.encode("utf-8") for book in books]),
+        _to_bytes(array("i", (book.year for book in books))),
+        bytes(STATUS_CODES[book.status] for book in books),
+        _to_bytes(array("I", order)),
+    ]
+
+    parts = []
+    offsets = []
+    position = HEADERS[FORMAT_VERSION].size
+    for section in sections:
+        padding = -position % 8
+        parts.append(b"\x00" * padding)
+        position += padding
+        offsets.append(position)
+        parts.append(section)
+        position += len(section)
+    return HEADERS[FORMAT_VERSION].pack(MAGIC, FORMAT_VERSION, len(books), *offsets) + b"".join(parts)
+
+
+class BinaryCatalogue:
+    """
+    Каталог в двоичном формате, открытый через mmap.
+
+    Столбцы года, статуса и таблицы смещений читаются прямо из отображённой
+    памяти без копирования, а строки декодируются только для нужных записей.
+    """
+
+    def __init__(self, path: Path) -> None:
+        try:
+            with path.open("rb") as file:
+                self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, ValueError) as e:
+            raise RuntimeError(f"Ошибка чтения из файла {path}: {e}")
+
+        try:
+            magic, version = PREFIX.unpack_from(self._map)
+            if magic != MAGIC or version not in HEADERS:
+                raise RuntimeError(f"Файл {path} не является двоичным каталогом версии {FORMAT_VERSION}")
+            _, _, count, *offsets = HEADERS[version].unpack_from(self._map)
+        except struct.error as e:
+            raise RuntimeError(f"Повреждённый двоичный каталог {path}: {e}")
+        if version == 1:
+            offsets.insert(2, None)
+
+        view = memoryview(self._map)
+        (id_offsets, ids, uuids, title_offsets, titles, author_offsets, authors, years, statuses, order) = offsets
+        self.count = count
+        self._ids = (self._column(view, "Q", id_offsets, count + 1), ids)
+        # Начало столбца UUID или None для файлов версии 1, где все id в куче строк
+        self._uuids = uuids
+        self._titles = (self._column(view, "Q", title_offsets, count + 1), titles)
+        self._authors = (self._column(view, "Q", author_offsets, count + 1), authors)
+        self.years = self._column(view, "i", years, count)
+        self.statuses = view[statuses:statuses + count]
+        # Смещение столбца статусов в файле: статус книги можно изменить на месте
+        self.status_offset = statuses
+        self._order = self._column(view, "I", order, count)
+        # Записи с упакованными id идут в порядке первыми: их число находится двоичным поиском
+        self._packed_count = 0 if uuids is None else bisect_left(
+            range(count), True, key=lambda i: self._packed(self._order[i]) is None
+        )
+
+    def close(self) -> None:
+        """
+        Освобождает столбцы, ссылающиеся на отображённую память, и закрывает отображение
+        """
+        for column in (self._ids[0], self._titles[0], self._authors[0], self.years, self.statuses, self._order):
+            if isinstance(column, memoryview):
+                column.release()
+        self._map.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def book(self, number: int) -> Book:
+        """
+        Декодирует книгу по номеру записи
+        """
+        return Book(
+            self._string(self._titles, number),
+            sys.intern(self._string(self._authors, number)),
+            self.years[number],
+            STATUSES[self.statuses[number]],
+            self.book_id(number),
+        )
+
+    def book_id(self, number: int) -> str:
+        """
+        Декодирует id книги по номеру записи: из столбца UUID или из кучи строк
+        """
+        packed = self._packed(number)
+        if packed is None:
+            return self._string(self._ids, number)
+        return _unpack_id(packed)
+
+    def books(self) -> Iterator[Book]:
+        """
+        Декодирует все книги по порядку записей. Столбцы читаются
+        из локальных переменных, без вызова методов на каждое поле.
+        """
+        data = self._map
+        id_offsets, ids = self._ids
+        title_offsets, titles = self._titles
+        author_offsets, authors = self._authors
+        years, statuses = self.years, self.statuses
+        uuids = self._uuids
+        intern = sys.intern
+        for number in range(self.count):
+            packed = NIL_UUID if uuids is None else data[uuids + number * UUID_SIZE:uuids + (number + 1) * UUID_SIZE]
+            yield Book(
+                data[titles + title_offsets[number]:titles + title_offsets[number + 1]].decode("utf-8"),
+                intern(data[authors + author_offsets[number]:authors + author_offsets[number + 1]].decode("utf-8")),
+                years[number],
+                STATUSES[statuses[number]],
+                _unpack_id(packed) if packed != NIL_UUID
+                else data[ids + id_offsets[number]:ids + id_offsets[number + 1]].decode("utf-8"),
+            )
+
+    def title(self, number: int) -> str:
+        return self._string(self._titles, number)
+
+    def author(self, number: int) -> str:
+        return self._string(self._authors, number)
+
+    def find(self, book_id: str) -> int | None:
+        """
+        Возвращает номер записи книги с данным id двоичным поиском или None
+        """
+        packed = None if self._uuids is None else _pack_id(book_id)
+        if packed is not None:
+            key, low, high, column = packed, 0, self._packed_count, self._packed
+        else:
+            key, low, high = book_id.encode("utf-8"), self._packed_count, self.count
+            offsets, start = self._ids
+            column = lambda i: self._map[start + offsets[i]:start + offsets[i + 1]]
+        position = bisect_left(range(self.count), key, low, high, key=lambda i: column(self._order[i]))
+        if position < high:
+            number = self._order[position]
+            if column(number) == key:
+                return number
+        return None
+
+    def count_by_status(self) -> dict[BookStatus, int]:
+        """
+        Считает книги по статусам, читая только столбец статусов
+        """
+        statuses = self.statuses.tobytes()
+        return {status: statuses.count(code) for status, code in STATUS_CODES.items()}
+
+    def _packed(self, number: int) -> bytes | None:
+        """
+        Возвращает 16 байт упакованного id записи или None, если id в куче строк
+        """
+        if self._uuids is None:
+            return None
+        start = self._uuids + number * UUID_SIZE
+        packed = self._map[start:start + UUID_SIZE]
+        return None if packed == NIL_UUID else packed
+
+    def _string(self, column: tuple, number: int) -> str:
+        offsets, start = column
+        return self._map[start + offsets[number]:start + offsets[number + 1]].decode("utf-8")
+
+    @staticmethod
+    def _column(view: memoryview, typecode: str, start: int, count: int):
+        """
+        Возвращает числовой столбец: без копирования, если порядок байтов совпадает с файлом
+        """
+        size = array(typecode).itemsize
+        data = view[start:start + count * size]
+        if sys.byteorder == "little":
+            return data.cast(typecode)
+        column = array(typecode, data.tobytes())
+        column.byteswap()
+        return column
+
+
+class BinaryStorage:
+    """
+    Хранилище книг в двоичном файле, открываемом через mmap.
+
+    Поиск по id, подсчёт по статусам и фильтры по году и статусу читают
+    только нужные столбцы, не декодируя весь каталог.
+
+    Смена статуса записывается на место байта в столбце статусов, поэтому
+    её стоимость не зависит от размера каталога. Добавление и удаление
+    переписывают файл целиком, поэтому формат рассчитан на каталоги,
+    которые в основном читаются.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Конструктор класса BinaryStorage.
+        Принимает на вход путь к файлу каталога и создаёт пустой каталог, если файла нет.
+        """
+        self.file_path = Path(file_path)
+        self.patch_path = self.file_path.with_name(self.file_path.name + ".patch")
+        if not self.file_path.exists():
+            self.save_books([])
+
+        self._catalogue: BinaryCatalogue | None = None
+        self._stamp: tuple[int, int, int] | None = None
+        self._recover()
+
+    def close(self) -> None:
+        """
+        Закрывает отображение файла; при следующем обращении файл откроется заново
+        """
+        if self._catalogue is not None:
+            self._catalogue.close()
+            self._catalogue = None
+            self._stamp = None
+
+    def load_books(self) -> list[Book]:
+        """
+        Декодирует и возвращает все книги в порядке записи
+        """
+        return list(self.iter_books())
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Декодирует книги по одной
+        """
+        return self._open().books()
+
+    def save_books(self, books: Iterable[Book], changes: list[Change] | None = None) -> None:
+        """
+        Атомарно записывает книги в файл.
+        Если передан список изменений, применяет только его.
+        """
+        if changes is not None:
+            self.apply_changes(changes)
+            return
+
+        try:
+            write_atomic(self.file_path, encode_catalogue(books))
+            # Незавершённые исправления относились к прежнему файлу
+            self.patch_path.unlink(missing_ok=True)
+        except IOError as e:
+            raise RuntimeError(f"Ошибка записи в файл {self.file_path}: {e}")
+
+    def apply_changes(self, changes: list[Change]) -> None:
+        """
+        Применяет изменения.
+        Пакет из одних смен статуса записывается на место, остальные пакеты
+        переписывают файл целиком.
+        """
+        self._recover()
+        if all(change.type is ChangeType.STATUS for change in changes):
+            self._patch_statuses(changes)
+            return
+
+        books = {book.id: book for book in self.iter_books()}
+        for change in changes:
+            change.apply(books)
+        self.save_books(books.values())
+
+    def get_book(self, book_id: str) -> Book | None:
+        """
+        Возвращает книгу по её id двоичным поиском по файлу или None
+        """
+        catalogue = self._open()
+        number = catalogue.find(book_id)
+        return None if number is None else catalogue.book(number)
+
+    def search_books(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: BookStatus | None = None,
+    ) -> list[Book]:
+        """
+        Возвращает книги, удовлетворяющие всем переданным критериям.
+        Сначала проверяются столбцы года и статуса, строки декодируются
+        только у прошедших записей.
+        """
+        catalogue = self._open()
+        book_filter = BookFilter(title, author, year, year_from, year_to, status)
+        numbers: Iterable[int] = range(len(catalogue))
+        if status is not None:
+            code = STATUS_CODES[status]
+            statuses = catalogue.statuses
+            numbers = [i for i in numbers if statuses[i] == code]
+        if year is not None or year_from is not None or year_to is not None:
+            years = catalogue.years
+            low = year if year is not None else year_from
+            high = year if year is not None else year_to
+            numbers = [
+                i for i in numbers
+                if (low is None or years[i] >= low) and (high is None or years[i] <= high)
+            ]
+        if book_filter.title is not None:
+            numbers = [i for i in numbers if book_filter.title in catalogue.title(i).lower()]
+        if book_filter.author is not None:
+            numbers = [i for i in numbers if book_filter.author in catalogue.author(i).lower()]
+        # Точный год вместе с диапазоном проверяется полным фильтром
+        return [book for book in map(catalogue.book, numbers) if book_filter(book)]
+
+    def count_by_status(self) -> dict[BookStatus, int]:
+        """
+        Возвращает число книг каждого статуса
+        """
+        return self._open().count_by_status()
+
+    def lock(self) -> ContextManager[None]:
+        """
+        Возвращает блокировку хранилища для последовательности чтение-изменение-запись
+        между процессами
+        """
+        return lock_file(self.file_path.with_name(self.file_path.name + ".lock"))
+
+    def stamp(self) -> tuple[int, int, int]:
+        """
+        Возвращает отметку состояния файла: время изменения, размер и inode
+        """
+        stat = self.file_path.stat()
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _patch_statuses(self, changes: list[Change]) -> None:
+        """
+        Записывает новые статусы на место в столбце статусов.
+        Если байтов несколько, они сначала сохраняются в файл исправлений:
+        после сбоя посередине пакет дописывается при следующем открытии.
+        """
+        catalogue = self._open()
+        patches = {}
+        for change in changes:
+            number = catalogue.find(change.book_id)
+            if number is not None:
+                patches[catalogue.status_offset + number] = STATUS_CODES[change.status]
+        if not patches:
+            return
+
+        try:
+            if len(patches) > 1:
+                write_atomic(
+                    self.patch_path,
+                    json.dumps({"inode": self.stamp()[2], "patches": list(patches.items())}),
+                )
+            self._write_patches(patches)
+            self.patch_path.unlink(missing_ok=True)
+        except IOError as e:
+            raise RuntimeError(f"Ошибка записи в файл {self.file_path}: {e}")
+
+    def _write_patches(self, patches: dict[int, int]) -> None:
+        with self.file_path.open("r+b") as file:
+            for offset, code in patches.items():
+                file.seek(offset)
+                file.write(bytes((code,)))
+            file.flush()
+            os.fsync(file.fileno())
+
+    def _recover(self) -> None:
+        """
+        Дописывает пакет статусов, прерванный сбоем, если файл с тех пор не заменялся
+        """
+        try:
+            data = json.loads(self.patch_path.read_text(encoding="utf-8"))
+            if data["inode"] == self.stamp()[2]:
+                self._write_patches(dict(data["patches"]))
+            self.patch_path.unlink()
+        except FileNotFoundError:
+            return
+        except (ValueError, KeyError, TypeError):
+            # Файл исправлений записывается атомарно, поэтому повреждённым может быть только чужой файл
+            self.patch_path.unlink(missing_ok=True)
+        except IOError as e:
+            raise RuntimeError(f"Ошибка записи в файл {self.file_path}: {e}")
+
+    def _open(self) -> BinaryCatalogue:
+        """
+        Возвращает отображение файла, открывая его заново, если файл заменён
+        """
+        stamp = self.stamp()
+        if self._catalogue is None or stamp != self._stamp:
+            self._catalogue = BinaryCatalogue(self.file_path)
+            self._stamp = stamp
+        return self._catalogue
+
+
+def open_catalogue(path: str) -> Storage | BinaryStorage:
+    """
+    Открывает файл каталога: .bin — двоичный формат, иначе JSON
+    """
+    if Path(path).suffix == ".bin":
+        return BinaryStorage(path)
+    return Storage(path, cache=False)
+
+
+def convert(source: str, target: str) -> int:
+    """
+    Переписывает каталог из одного формата в другой, определяя форматы
+    по расширениям файлов, и возвращает число книг
+    """
+    if not Path(source).exists():
+        raise ValueError(f"Файл {source} не найден")
+
+    books = open_catalogue(source).load_books()
+    open_catalogue(target).save_books(books)
+    return len(books)
@@ -0,0 +1,246 @@
+from bisect import bisect_left, bisect_right, insort
+from itertools import islice
+from typing import Iterable, Iterator
+
+from src.columnar import VECTORIZED, ColumnStore
+from src.dedupe import book_fingerprint, fingerprint
+from src.models import Book, BookFilter, BookStatus
+from src.paging import Order, SortKey
+
+
+class Catalogue:
+    """
+    Каталог книг в памяти с индексами по id, автору, году и статусу.
+    Индексы обновляются при каждом изменении, поэтому операции по id
+    выполняются за O(1), а поиск просматривает только книги-кандидаты
+    или, если кандидатов больше восьмой части каталога, перебирает каталог.
+
+    Дополнительно каталог ведёт столбцовое представление (ColumnStore):
+    по нему считаются книги по статусам, годам и авторам, а при наличии
+    NumPy выполняется и поиск.
+
+    Индекс отпечатков для поиска дубликатов и порядки книг по названию,
+    автору и году для постраничной выдачи строятся при первом обращении
+    и после этого тоже обновляются при каждом изменении.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()) -> None:
+        self._by_id: dict[str, Book] = {}
+        self._columns = ColumnStore()
+        self._by_author: dict[str, set[str]] = {}
+        self._by_status: dict[BookStatus, set[str]] = {status: set() for status in BookStatus}
+        self._by_year: dict[int, set[str]] = {}
+        self._years: list[int] = []
+        self._by_fingerprint: dict[str, set[str]] | None = None
+        # id книг по возрастанию ключа Order.key для каждого поля порядка
+        self._orders: dict[str, list[str]] = {}
+
+        for book in books:
+            self.add(book)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __contains__(self, book_id: str) -> bool:
+        return book_id in self._by_id
+
+    def __iter__(self) -> Iterator[Book]:
+        return iter(self._by_id.values())
+
+    def get(self, book_id: str) -> Book | None:
+        """
+        Возвращает книгу по её id или None
+        """
+        return self._by_id.get(book_id)
+
+    def books(self) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке добавления
+        """
+        return list(self._by_id.values())
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу в каталог и индексы.
+        Книга с уже существующим id заменяет прежнюю.
+        """
+        if book.id in self._by_id:
+            self.remove(book.id)
+
+        self._by_id[book.id] = book
+        self._columns.add(book)
+        self._by_author.setdefault(book.author.lower(), set()).add(book.id)
+        self._by_status[book.status].add(book.id)
+        if book.year not in self._by_year:
+            self._by_year[book.year] = set()
+            insort(self._years, book.year)
+        self._by_year[book.year].add(book.id)
+        if self._by_fingerprint is not None:
+            self._by_fingerprint.setdefault(book_fingerprint(book), set()).add(book.id)
+        for field, book_ids in self._orders.items():
+            insort(book_ids, book.id, key=self._order_key(Order(field)))
+
+    def remove(self, book_id: str) -> Book | None:
+        """
+        Удаляет книгу из каталога и индексов и возвращает её или None
+        """
+        book = self._by_id.get(book_id)
+        if book is None:
+            return None
+
+        # Позиция в порядке ищется двоичным поиском, пока книга ещё в каталоге
+        for field, book_ids in self._orders.items():
+            order = Order(field)
+            del book_ids[bisect_left(book_ids, order.key(book), key=self._order_key(order))]
+        del self._by_id[book_id]
+        self._columns.remove(book_id)
+        self._discard(self._by_author, book.author.lower(), book_id)
+        self._by_status[book.status].discard(book_id)
+        if self._discard(self._by_year, book.year, book_id):
+            del self._years[bisect_left(self._years, book.year)]
+        if self._by_fingerprint is not None:
+            self._discard(self._by_fingerprint, book_fingerprint(book), book_id)
+        return book
+
+    def set_status(self, book_id: str, status: BookStatus) -> Book | None:
+        """
+        Меняет статус книги и возвращает её или None
+        """
+        book = self._by_id.get(book_id)
+        if book is None:
+            return None
+
+        self._by_status[book.status].discard(book_id)
+        book.status = status
+        self._by_status[status].add(book_id)
+        self._columns.set_status(book_id, status)
+        return book
+
+    def search(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: BookStatus | None = None,
+    ) -> list[Book]:
+        """
+        Возвращает книги, удовлетворяющие всем переданным критериям.
+        Название и автор ищутся по подстроке без учёта регистра,
+        год — точно или в диапазоне [year_from, year_to].
+        """
+        if VECTORIZED:
+            return self._columns.select(title, author, year, year_from, year_to, status)
+
+        book_filter = BookFilter(title, author, year, year_from, year_to, status)
+        # Для каждого критерия по индексу — множества id, объединение которых ему удовлетворяет
+        groups = []
+        if year is not None:
+            groups.append([self._by_year.get(year, set())])
+        if year_from is not None or year_to is not None:
+            groups.append(self._year_sets(year_from, year_to))
+        if status is not None:
+            groups.append([self._by_status[status]])
+        if author:
+            groups.append([ids for name, ids in self._by_author.items() if book_filter.author in name])
+
+        smallest = min(groups, key=lambda sets: sum(map(len, sets)), default=None)
+        if smallest is None or sum(map(len, smallest)) > len(self._by_id) // 8:
+            # Отбор слабый: перебор по порядку дешевле объединения и сортировки множеств
+            return [book for book in self._by_id.values() if book_filter(book)]
+
+        book_ids = sorted(set().union(*smallest), key=self._columns.row)
+        return [book for book in map(self._by_id.__getitem__, book_ids) if book_filter(book)]
+
+    def find_duplicates(self, title: str, author: str, year: int) -> list[Book]:
+        """
+        Возвращает книги с тем же отпечатком, что у переданных названия,
+        автора и года, в порядке добавления
+        """
+        if self._by_fingerprint is None:
+            self._by_fingerprint = {}
+            for book in self._by_id.values():
+                self._by_fingerprint.setdefault(book_fingerprint(book), set()).add(book.id)
+        book_ids = sorted(self._by_fingerprint.get(fingerprint(title, author, year), ()), key=self._columns.row)
+        return [self._by_id[book_id] for book_id in book_ids]
+
+    def page(
+        self, order: Order, after: SortKey | None, limit: int | None, book_filter: BookFilter
+    ) -> list[Book]:
+        """
+        Возвращает до limit книг, удовлетворяющих фильтру и идущих
+        в порядке order после ключа after. Начало страницы находится
+        двоичным поиском, поэтому её стоимость не зависит от номера страницы,
+        а только от числа книг, просмотренных до limit подходящих.
+        """
+        book_ids = self._order(order.field)
+        if after is None:
+            start = len(book_ids) if order.descending else 0
+        elif order.descending:
+            start = bisect_left(book_ids, after, key=self._order_key(order))
+        else:
+            start = bisect_right(book_ids, after, key=self._order_key(order))
+        positions = range(start - 1, -1, -1) if order.descending else range(start, len(book_ids))
+        books = filter(book_filter, (self._by_id[book_ids[position]] for position in positions))
+        return list(islice(books, limit))
+
+    def reset_orders(self) -> None:
+        """
+        Отбрасывает порядки книг: перед большим пакетом изменений дешевле
+        построить их заново при следующем запросе, чем вставлять книги по одной
+        """
+        self._orders.clear()
+
+    def count_by_status(self) -> dict[BookStatus, int]:
+        """
+        Возвращает число книг каждого статуса
+        """
+        return self._columns.count_by_status()
+
+    def count_by_year(self) -> dict[int, int]:
+        """
+        Возвращает число книг по годам издания в порядке возрастания года
+        """
+        return self._columns.count_by_year()
+
+    def count_by_author(self) -> dict[str, int]:
+        """
+        Возвращает число книг каждого автора по убыванию числа книг
+        """
+        return self._columns.count_by_author()
+
+    def _order(self, field: str) -> list[str]:
+        """
+        Возвращает id книг по возрастанию ключа поля, при первом обращении сортируя каталог
+        """
+        if field not in self._orders:
+            self._orders[field] = sorted(self._by_id, key=self._order_key(Order(field)))
+        return self._orders[field]
+
+    def _order_key(self, order: Order):
+        """
+        Возвращает функцию ключа порядка по id книги каталога
+        """
+        key, by_id = order.key, self._by_id
+        return lambda book_id: key(by_id[book_id])
+
+    def _year_sets(self, year_from: int | None, year_to: int | None) -> list[set[str]]:
+        """
+        Возвращает множества id книг по годам из диапазона включительно
+        """
+        start = 0 if year_from is None else bisect_left(self._years, year_from)
+        end = len(self._years) if year_to is None else bisect_right(self._years, year_to)
+        return [self._by_year[year] for year in self._years[start:end]]
+
+    @staticmethod
+    def _discard(index: dict, key, book_id: str) -> bool:
+        """
+        Удаляет id из записи индекса и возвращает True, если запись опустела
+        """
+        ids = index[key]
+        ids.discard(book_id)
+        if not ids:
+            del index[key]
+            return True
+        return False
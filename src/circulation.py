@@ -0,0 +1,220 @@
+import sqlite3
+import time
+from enum import Enum
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+from src.models import BookStatus, Change, ChangeType
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    book_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    at INTEGER NOT NULL,
+    borrower TEXT
+);
+CREATE INDEX IF NOT EXISTS events_book ON events (book_id, seq);
+CREATE INDEX IF NOT EXISTS events_issued ON events (at, book_id) WHERE type = 'issue';
+CREATE TABLE IF NOT EXISTS loans (
+    book_id TEXT PRIMARY KEY,
+    borrower TEXT,
+    issued_at INTEGER NOT NULL,
+    due_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS loans_due ON loans (due_at);
+CREATE TABLE IF NOT EXISTS issue_counts (
+    book_id TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS issue_counts_count ON issue_counts (count);
+"""
+
+LOAN_DAYS = 14
+DAY = 24 * 60 * 60
+
+
+class LoanEventType(Enum):
+    """
+    Тип события выдачи.
+    """
+    ISSUE = "issue"
+    RETURN = "return"
+
+
+class LoanEvent(NamedTuple):
+    """
+    Событие выдачи или возврата книги
+    """
+    book_id: str
+    type: LoanEventType
+    at: int
+    borrower: str | None = None
+
+    def to_dict(self) -> dict:
+        return {"book_id": self.book_id, "type": self.type.value, "at": self.at, "borrower": self.borrower}
+
+    @staticmethod
+    def from_dict(data: dict) -> "LoanEvent":
+        return LoanEvent(data["book_id"], LoanEventType(data["type"]), data["at"], data["borrower"])
+
+
+class Loan(NamedTuple):
+    """
+    Незакрытая выдача книги
+    """
+    book_id: str
+    borrower: str | None
+    issued_at: int
+    due_at: int
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+    @staticmethod
+    def from_dict(data: dict) -> "Loan":
+        return Loan(data["book_id"], data["borrower"], data["issued_at"], data["due_at"])
+
+
+class Circulation:
+    """
+    Журнал выдач в базе SQLite.
+
+    События выдачи и возврата только дописываются в таблицу events.
+    Рядом с журналом ведутся производные таблицы, которые обновляются
+    при каждой записи: незакрытые выдачи со сроком возврата и число выдач
+    каждой книги. Поэтому история книги, просроченные выдачи и самые
+    популярные книги выбираются по индексам, не просматривая весь журнал.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        loan_days: int = LOAN_DAYS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Конструктор класса Circulation.
+        Принимает на вход путь к файлу базы данных, срок выдачи по умолчанию в днях
+        и источник текущего времени. База открывается при первом обращении.
+        """
+        self.file_path = Path(file_path)
+        self.loan_days = loan_days
+        self.clock = clock
+        self._connection: sqlite3.Connection | None = None
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с базой данных
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def record(self, changes: Iterable[Change], borrower: str | None = None, days: int | None = None) -> int:
+        """
+        Записывает в журнал выдачи и возвраты, соответствующие сменам статуса,
+        и возвращает число записанных событий.
+
+        Выдача уже выданной книги и возврат книги без открытой выдачи
+        не записываются. Удаление книги закрывает её выдачу без события.
+        """
+        now = int(self.clock())
+        due_at = now + (self.loan_days if days is None else days) * DAY
+        connection = self._connect()
+        recorded = 0
+        try:
+            with connection:
+                for change in changes:
+                    if change.type is ChangeType.REMOVE:
+                        connection.execute("DELETE FROM loans WHERE book_id = ?", (change.book_id,))
+                    elif change.type is ChangeType.STATUS and change.status is BookStatus.ISSUED:
+                        cursor = connection.execute(
+                            "INSERT OR IGNORE INTO loans (book_id, borrower, issued_at, due_at) "
+                            "VALUES (?, ?, ?, ?)",
+                            (change.book_id, borrower, now, due_at),
+                        )
+                        if cursor.rowcount:
+                            self._append(LoanEvent(change.book_id, LoanEventType.ISSUE, now, borrower))
+                            connection.execute(
+                                "INSERT INTO issue_counts (book_id, count) VALUES (?, 1) "
+                                "ON CONFLICT (book_id) DO UPDATE SET count = count + 1",
+                                (change.book_id,),
+                            )
+                            recorded += 1
+                    elif change.type is ChangeType.STATUS:
+                        loan = connection.execute(
+                            "SELECT borrower FROM loans WHERE book_id = ?", (change.book_id,)
+                        ).fetchone()
+                        if loan is not None:
+                            connection.execute("DELETE FROM loans WHERE book_id = ?", (change.book_id,))
+                            self._append(LoanEvent(change.book_id, LoanEventType.RETURN, now, loan[0]))
+                            recorded += 1
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка записи в базу данных {self.file_path}: {e}")
+        return recorded
+
+    def history(self, book_id: str, limit: int | None = None) -> list[LoanEvent]:
+        """
+        Возвращает события книги, начиная с последнего
+        """
+        rows = self._execute(
+            "SELECT type, at, borrower FROM events WHERE book_id = ? ORDER BY seq DESC LIMIT ?",
+            (book_id, -1 if limit is None else limit),
+        )
+        return [LoanEvent(book_id, LoanEventType(kind), at, borrower) for kind, at, borrower in rows]
+
+    def overdue(self, now: int | None = None, limit: int | None = None) -> list[Loan]:
+        """
+        Возвращает незакрытые выдачи, срок которых истёк, начиная с самой давней
+        """
+        rows = self._execute(
+            "SELECT book_id, borrower, issued_at, due_at FROM loans WHERE due_at < ? ORDER BY due_at LIMIT ?",
+            (int(self.clock()) if now is None else now, -1 if limit is None else limit),
+        )
+        return [Loan(*row) for row in rows]
+
+    def top(self, since: int | None = None, limit: int = 10) -> list[tuple[str, int]]:
+        """
+        Возвращает id самых часто выдаваемых книг и число их выдач.
+        Без since используются счётчики за всё время, с ним — выдачи
+        начиная с этого момента по индексу времени выдачи. Индекс указан
+        явно: иначе планировщик выбирает индекс по книгам ради группировки
+        и просматривает весь журнал.
+        """
+        if since is None:
+            query = "SELECT book_id, count FROM issue_counts ORDER BY count DESC, book_id LIMIT ?"
+            params: tuple = (limit,)
+        else:
+            query = (
+                "SELECT book_id, COUNT(*) AS count FROM events INDEXED BY events_issued "
+                "WHERE type = 'issue' AND at >= ? "
+                "GROUP BY book_id ORDER BY count DESC, book_id LIMIT ?"
+            )
+            params = (since, limit)
+        return [(book_id, count) for book_id, count in self._execute(query, params)]
+
+    def _append(self, event: LoanEvent) -> None:
+        self._connection.execute(
+            "INSERT INTO events (book_id, type, at, borrower) VALUES (?, ?, ?, ?)",
+            (event.book_id, event.type.value, event.at, event.borrower),
+        )
+
+    def _execute(self, query: str, params: tuple) -> list[tuple]:
+        try:
+            return self._connect().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка чтения из базы данных {self.file_path}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Возвращает соединение, при первом обращении открывая базу и создавая схему
+        """
+        if self._connection is None:
+            try:
+                # Соединение может использоваться из потоков сервера, доступ к нему сериализует вызывающий
+                self._connection = sqlite3.connect(self.file_path, check_same_thread=False)
+                self._connection.executescript(SCHEMA)
+            except sqlite3.Error as e:
+                raise RuntimeError(f"Ошибка открытия базы данных {self.file_path}: {e}")
+        return self._connection
@@ -1,6 +1,104 @@
-from argparse import ArgumentParser
-from textwrap import shorten
-from src.services import LibraryService
+from __future__ import annotations
+
+import os
+import sys
+import time
+from argparse import ArgumentParser, ArgumentTypeError
+from contextlib import contextmanager
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Iterable, Iterator, TextIO
+
+from src import profiling
+
+# Модули хранилищ и форматов импортируются в ветках команд, которым они нужны,
+# чтобы разбор аргументов и --help не тратили время на их загрузку
+if TYPE_CHECKING:
+    from src.facets import FacetCounts
+    from src.models import Book
+    from src.services import LibraryService
+
+
+# Ширина столбцов таблицы
+COLUMN_WIDTHS = {"ID": 36, "Название": 30, "Автор": 20, "Год": 6, "Статус": 10}
+ROW_TEMPLATE = "| " + " | ".join(f"{{:<{width}}}" for width in COLUMN_WIDTHS.values()) + " |\n"
+HISTORY_WIDTHS = {"Дата": 16, "Событие": 8, "Читатель": 30}
+OVERDUE_WIDTHS = {"ID": 36, "Название": 30, "Читатель": 20, "Вернуть до": 10, "Дней": 5}
+TOP_WIDTHS = {"ID": 36, "Название": 30, "Автор": 20, "Выдач": 7}
+DEDUPE_WIDTHS = {"Группа": 6, "ID": 36, "Название": 30, "Автор": 20, "Год": 6}
+STATUS_WIDTHS = {"Статус": 10, "Книг": 9}
+YEAR_RANGE_WIDTHS = {"Годы": 11, "Книг": 9}
+AUTHOR_WIDTHS = {"Автор": 30, "Книг": 9}
+EVENT_NAMES = {"issue": "выдача", "return": "возврат"}
+# Команды, которые работают с файлами напрямую и не создают сервис
+LOCAL_COMMANDS = {"convert"}
+# Число строк, которые собираются в память перед одной записью в вывод
+CHUNK_SIZE = 1000
+CSV_FIELDS = ["id", "title", "author", "year", "status"]
+OUTPUT_FORMATS = ["table", "jsonl", "csv"]
+ORDER_FIELDS = ["title", "author", "year"]
+
+
+def non_negative(value: str) -> int:
+    """
+    Разбирает неотрицательное целое число аргумента командной строки
+    """
+    number = int(value)
+    if number < 0:
+        raise ArgumentTypeError("значение не может быть отрицательным")
+    return number
+
+
+def positive(value: str) -> int:
+    """
+    Разбирает положительное целое число аргумента командной строки
+    """
+    number = int(value)
+    if number < 1:
+        raise ArgumentTypeError("значение должно быть положительным")
+    return number
+
+
+def fraction(value: str) -> float:
+    """
+    Разбирает число от 0 до 1 аргумента командной строки
+    """
+    number = float(value)
+    if not 0 <= number <= 1:
+        raise ArgumentTypeError("значение должно быть от 0 до 1")
+    return number
+
+
+def add_output_arguments(parser: ArgumentParser, limit_default: int | None = None) -> None:
+    """
+    Добавляет аргументы постраничного вывода и формата
+    """
+    parser.add_argument(
+        "--limit",
+        type=non_negative,
+        default=limit_default,
+        help="Максимальное число выводимых книг" if limit_default is None
+        else "Максимальное число результатов",
+    )
+    parser.add_argument("--offset", type=non_negative, default=0, help="Сколько книг пропустить")
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="table",
+        help="Формат вывода: таблица, JSONL или CSV",
+    )
+
+
+def add_order_arguments(parser: ArgumentParser) -> None:
+    """
+    Добавляет аргументы сортировки и постраничного вывода по курсору
+    """
+    parser.add_argument("--order-by", choices=ORDER_FIELDS, help="Сортировать по названию, автору или году")
+    parser.add_argument("--desc", action="store_true", help="Сортировать по убыванию")
+    parser.add_argument(
+        "--after",
+        metavar="CURSOR",
+        help="Вывести книги после курсора, напечатанного предыдущей командой с --order-by и --limit",
+    )
 
 
 def setup_parser() -> ArgumentParser:
@@ -8,6 +106,38 @@ def setup_parser() -> ArgumentParser:
     Создает и настраивает парсер аргументов командной строки
     """
     parser = ArgumentParser(description="Система управления библиотекой")
+    parser.add_argument(
+        "--storage",
+        choices=["json", "journal", "sqlite", "sharded", "binary"],
+        default="json",
+        help="Тип хранилища: JSON-файл, снимок с журналом изменений, база SQLite, "
+        "каталог сегментов, обрабатываемых параллельно, или двоичный файл",
+    )
+    parser.add_argument(
+        "--server",
+        default=os.environ.get("LIBRARY_SERVER"),
+        help="Адрес запущенного сервера библиотеки (по умолчанию из LIBRARY_SERVER)",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_const",
+        const="-",
+        default=os.environ.get(profiling.STATS_ENV),
+        help="Вывести замеры фаз команды строкой JSON в stderr",
+    )
+    parser.add_argument(
+        "--stats-file",
+        dest="stats",
+        metavar="PATH",
+        help="Дописать замеры фаз команды строкой JSON в файл "
+        f"(по умолчанию из {profiling.STATS_ENV}; - означает stderr)",
+    )
+    parser.add_argument(
+        "--profile",
+        default=os.environ.get(profiling.PROFILE_ENV),
+        metavar="PATH",
+        help=f"Сохранить профиль cProfile команды в файл (по умолчанию из {profiling.PROFILE_ENV})",
+    )
     subparsers = parser.add_subparsers(dest="command", help="Доступные команды")
 
     # Парсер для добавления книги
@@ -15,6 +145,13 @@ def setup_parser() -> ArgumentParser:
     add_parser.add_argument("--title", required=True, help="Название книги")
     add_parser.add_argument("--author", required=True, help="Автор книги")
     add_parser.add_argument("--year", required=True, type=int, help="Год издания")
+    add_parser.add_argument(
+        "--duplicates",
+        choices=["add", "warn", "merge"],
+        default="add",
+        help="Если такая книга уже есть: добавить, добавить с предупреждением "
+        "или не добавлять (по умолчанию add)",
+    )
 
     # Парсер для удаления книги
     remove_parser = subparsers.add_parser("remove", help="Удалить книгу")
@@ -25,9 +162,23 @@ def setup_parser() -> ArgumentParser:
     search_parser.add_argument("--title", help="Название книги")
     search_parser.add_argument("--author", help="Автор книги")
     search_parser.add_argument("--year", type=int, help="Год издания")
+    search_parser.add_argument("--year-from", type=int, help="Год издания не раньше")
+    search_parser.add_argument("--year-to", type=int, help="Год издания не позже")
+    search_parser.add_argument(
+        "--status", choices=["в наличии", "выдана"], help="Статус книги"
+    )
+    add_output_arguments(search_parser)
+    add_order_arguments(search_parser)
+
+    # Парсер для полнотекстового поиска
+    find_parser = subparsers.add_parser("find", help="Полнотекстовый поиск по названию и автору")
+    find_parser.add_argument("query", help="Поисковый запрос")
+    add_output_arguments(find_parser, limit_default=10)
 
     # Парсер для отображения всех книг
-    subparsers.add_parser("list", help="Отобразить все книги")
+    list_parser = subparsers.add_parser("list", help="Отобразить все книги")
+    add_output_arguments(list_parser)
+    add_order_arguments(list_parser)
 
     # Парсер для обновления статуса книги
     update_parser = subparsers.add_parser("update", help="Обновить статус книги")
@@ -35,35 +186,320 @@ def setup_parser() -> ArgumentParser:
     update_parser.add_argument(
         "--status", required=True, choices=["в наличии", "выдана"], help="Новый статус"
     )
+    update_parser.add_argument("--borrower", help="Читатель, которому выдана книга")
+    update_parser.add_argument("--days", type=non_negative, help="Срок выдачи в днях")
+
+    # Парсеры для журнала выдач
+    history_parser = subparsers.add_parser("history", help="История выдач книги")
+    history_parser.add_argument("--id", required=True, help="ID книги")
+    history_parser.add_argument(
+        "--limit", type=non_negative, default=20, help="Число последних событий"
+    )
+    overdue_parser = subparsers.add_parser("overdue", help="Книги с просроченным сроком возврата")
+    overdue_parser.add_argument("--limit", type=non_negative, help="Максимальное число выдач")
+    top_parser = subparsers.add_parser("top", help="Самые часто выдаваемые книги")
+    top_parser.add_argument(
+        "--days", type=non_negative, help="Учитывать выдачи за последние дни (по умолчанию за всё время)"
+    )
+    top_parser.add_argument("--limit", type=non_negative, default=10, help="Число книг")
+
+    # Парсер для поиска дубликатов
+    dedupe_parser = subparsers.add_parser(
+        "dedupe", help="Найти книги с одинаковыми названием, автором и годом"
+    )
+    dedupe_mode = dedupe_parser.add_mutually_exclusive_group()
+    dedupe_mode.add_argument(
+        "--fuzzy", action="store_true", help="Объединять и книги с похожими названиями и авторами"
+    )
+    dedupe_mode.add_argument(
+        "--remove", action="store_true", help="Удалить дубликаты, оставив первую книгу каждой группы"
+    )
+    dedupe_parser.add_argument(
+        "--threshold", type=fraction, default=0.8, help="Порог сходства для --fuzzy от 0 до 1"
+    )
+
+    # Парсер для сводки по каталогу
+    stats_parser = subparsers.add_parser(
+        "stats", help="Число книг по статусам, годам и авторам"
+    )
+    stats_parser.add_argument(
+        "--year-step", type=positive, default=10, help="Длина диапазона лет (по умолчанию 10)"
+    )
+    stats_parser.add_argument(
+        "--authors", type=non_negative, default=10, help="Число авторов с наибольшим числом книг"
+    )
+    stats_parser.add_argument(
+        "--format", choices=["table", "json"], default="table", help="Формат вывода"
+    )
+
+    # Парсер для массового импорта книг
+    import_parser = subparsers.add_parser(
+        "import", help="Импортировать книги из CSV или JSONL одним сохранением"
+    )
+    import_parser.add_argument("path", help="Путь к файлу или - для стандартного ввода")
+    import_parser.add_argument(
+        "--format",
+        choices=["csv", "jsonl"],
+        help="Формат данных (по умолчанию определяется по расширению файла)",
+    )
+
+    # Парсер для пакетного применения изменений
+    batch_parser = subparsers.add_parser(
+        "batch", help="Применить поток команд в формате JSONL одним сохранением"
+    )
+    batch_parser.add_argument(
+        "path", nargs="?", default="-", help="Путь к файлу или - для стандартного ввода"
+    )
+
+    # Парсер для запуска сервера
+    serve_parser = subparsers.add_parser(
+        "serve", help="Запустить сервер с каталогом, загруженным в память"
+    )
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Адрес сервера")
+    serve_parser.add_argument("--port", type=int, default=8000, help="Порт сервера")
+
+    # Парсер для компактирования журнала
+    subparsers.add_parser("compact", help="Свернуть журнал изменений в снимок")
+
+    # Парсер для переноса данных из JSON-файла
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="Заменить содержимое хранилища книгами из JSON-файла"
+    )
+    migrate_parser.add_argument(
+        "--source", default="data/books.json", help="Путь к JSON-файлу с книгами"
+    )
+
+    # Парсеры для снимков каталога
+    export_parser = subparsers.add_parser(
+        "export", help="Сохранить каталог снимком из сжатых фрагментов с контрольными суммами"
+    )
+    export_parser.add_argument("path", help="Новый или пустой каталог снимка")
+    export_parser.add_argument(
+        "--format", choices=["jsonl", "csv"], default="jsonl", help="Формат фрагментов"
+    )
+    export_parser.add_argument(
+        "--compression",
+        choices=["gzip", "lzma", "zstd", "none"],
+        default="gzip",
+        help="Способ сжатия фрагментов (zstd требует модуль zstandard)",
+    )
+    export_parser.add_argument(
+        "--level", type=non_negative, help="Уровень сжатия (по умолчанию быстрый)"
+    )
+    export_parser.add_argument(
+        "--chunk-size", type=positive, default=100_000, help="Число книг во фрагменте"
+    )
+    export_parser.add_argument(
+        "--workers", type=positive, help="Число процессов (по умолчанию по числу процессоров)"
+    )
+    restore_parser = subparsers.add_parser(
+        "restore", help="Заменить содержимое хранилища книгами из снимка"
+    )
+    restore_parser.add_argument("path", help="Каталог снимка")
+    restore_parser.add_argument(
+        "--check", action="store_true", help="Только проверить контрольные суммы и фрагменты"
+    )
+    restore_parser.add_argument(
+        "--workers", type=positive, help="Число процессов (по умолчанию по числу процессоров)"
+    )
+
+    # Парсер для преобразования формата файла каталога
+    convert_parser = subparsers.add_parser(
+        "convert", help="Преобразовать файл каталога между форматами JSON и двоичным (.bin)"
+    )
+    convert_parser.add_argument("source", help="Исходный файл каталога")
+    convert_parser.add_argument("target", help="Создаваемый файл каталога")
 
     return parser
 
 
-def execute_command(args, library_service: LibraryService) -> None:
+def execute_command(args, library_service: LibraryService | None) -> None:
     """
-    Выполняет команду, переданную через аргументы командной строки
+    Выполняет команду, переданную через аргументы командной строки.
+    Для команд из LOCAL_COMMANDS сервис не нужен и может быть None.
     """
     try:
         if args.command == "add":
-            library_service.add_book(args.title, args.author, args.year)
-            print("Книга успешно добавлена.")
+            duplicates = []
+            if args.duplicates != "add":
+                duplicates = library_service.find_duplicates(args.title, args.author, args.year)
+            if args.duplicates == "merge":
+                book = library_service.add_book(args.title, args.author, args.year, merge_duplicates=True)
+            else:
+                book = library_service.add_book(args.title, args.author, args.year)
+            if any(duplicate.id == book.id for duplicate in duplicates):
+                print(f"Книга уже есть в библиотеке: {book.id}.")
+            else:
+                print("Книга успешно добавлена.")
+                if duplicates:
+                    ids = ", ".join(duplicate.id for duplicate in duplicates)
+                    print(f"Внимание: такая книга уже есть в библиотеке: {ids}.")
 
         elif args.command == "remove":
             library_service.remove_book(args.id)
             print("Книга успешно удалена.")
 
+        elif args.command == "search" and (args.order_by or args.desc or args.after):
+            print_page(
+                library_service,
+                args,
+                title=args.title,
+                author=args.author,
+                year=args.year,
+                year_from=args.year_from,
+                year_to=args.year_to,
+                status=args.status,
+            )
+
         elif args.command == "search":
-            books = library_service.search_books(args.title, args.author, args.year)
-            print_books_table(books)
+            books = library_service.iter_search_books(
+                args.title,
+                args.author,
+                args.year,
+                year_from=args.year_from,
+                year_to=args.year_to,
+                status=args.status,
+            )
+            print_books(paginate(books, args.offset, args.limit), args.format)
+
+        elif args.command == "find":
+            books = library_service.find_books(args.query, args.offset + args.limit)
+            print_books(books[args.offset:], args.format)
+
+        elif args.command == "list" and (args.order_by or args.desc or args.after):
+            print_page(library_service, args)
 
         elif args.command == "list":
-            books = library_service.get_all_books()
-            print_books_table(books)
+            books = library_service.iter_books()
+            print_books(paginate(books, args.offset, args.limit), args.format)
 
         elif args.command == "update":
-            library_service.update_book_status(args.id, args.status)
+            library_service.update_book_status(args.id, args.status, args.borrower, args.days)
             print("Статус книги успешно обновлён.")
 
+        elif args.command == "history":
+            events = library_service.book_history(args.id, args.limit)
+            print_table(
+                HISTORY_WIDTHS,
+                ((format_time(event.at), EVENT_NAMES[event.type.value], event.borrower or "") for event in events),
+                "Нет событий для отображения.",
+            )
+
+        elif args.command == "overdue":
+            from src.circulation import DAY
+
+            now = time.time()
+            loans = library_service.overdue_loans(args.limit)
+            print_table(
+                OVERDUE_WIDTHS,
+                (
+                    (
+                        book.id,
+                        book.title,
+                        loan.borrower or "",
+                        format_time(loan.due_at, "%Y-%m-%d"),
+                        int((now - loan.due_at) // DAY),
+                    )
+                    for book, loan in loans
+                ),
+                "Нет просроченных выдач.",
+            )
+
+        elif args.command == "top":
+            books = library_service.top_books(args.days, args.limit)
+            print_table(
+                TOP_WIDTHS,
+                ((book.id, book.title, book.author, count) for book, count in books),
+                "Нет выдач для отображения.",
+            )
+
+        elif args.command == "dedupe":
+            groups = library_service.duplicate_groups(args.fuzzy, args.threshold)
+            print_table(
+                DEDUPE_WIDTHS,
+                (
+                    (number, book.id, book.title, book.author, book.year)
+                    for number, group in enumerate(groups, 1)
+                    for book in group
+                ),
+                "Дубликаты не найдены.",
+            )
+            extra = [book.id for group in groups for book in group[1:]]
+            if args.remove:
+                count = library_service.remove_books(extra)
+                print(f"Удалено дубликатов: {count}.")
+            elif groups:
+                print(f"Групп дубликатов: {len(groups)}, лишних книг: {len(extra)}.")
+
+        elif args.command == "stats":
+            facets = library_service.facets(args.year_step, args.authors)
+            if args.format == "json":
+                import json
+
+                print(json.dumps(facets.to_dict(), ensure_ascii=False, indent=2))
+            else:
+                print_facets(facets)
+
+        elif args.command == "import":
+            from src.importer import read_books
+
+            file_format = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+            with open_input(args.path) as file, timer() as elapsed:
+                count = library_service.add_books(read_books(file, file_format))
+            print(f"Импортировано книг: {count}{format_throughput(count, elapsed())}.")
+
+        elif args.command == "batch":
+            from src.importer import read_changes
+
+            with open_input(args.path) as file, timer() as elapsed:
+                count = library_service.apply_changes(read_changes(file))
+            print(f"Применено изменений: {count}{format_throughput(count, elapsed())}.")
+
+        elif args.command == "compact":
+            library_service.compact_storage()
+            print("Журнал успешно свёрнут.")
+
+        elif args.command == "migrate":
+            count = library_service.migrate_from_json(args.source)
+            print(f"Перенесено книг: {count}.")
+
+        elif args.command == "export":
+            from src.snapshot import write_snapshot
+
+            with timer() as elapsed:
+                manifest = write_snapshot(
+                    library_service.iter_books(),
+                    args.path,
+                    args.format,
+                    args.compression,
+                    args.level,
+                    args.chunk_size,
+                    args.workers,
+                )
+            count = manifest["books"]
+            print(
+                f"Экспортировано книг: {count}, фрагментов: {len(manifest['chunks'])}"
+                f"{format_throughput(count, elapsed())}."
+            )
+
+        elif args.command == "restore":
+            from src.snapshot import read_snapshot
+
+            if args.check:
+                count = sum(1 for _ in read_snapshot(args.path, args.workers))
+                print(f"Снимок цел, книг: {count}.")
+            else:
+                with timer() as elapsed:
+                    # Снимок читается и проверяется целиком до замены содержимого хранилища
+                    count = library_service.replace_books(list(read_snapshot(args.path, args.workers)))
+                print(f"Восстановлено книг: {count}{format_throughput(count, elapsed())}.")
+
+        elif args.command == "convert":
+            from src.binary_storage import convert
+
+            count = convert(args.source, args.target)
+            print(f"Преобразовано книг: {count}.")
+
         else:
             print("Неизвестная команда.")
     except ValueError as e:
@@ -72,31 +508,200 @@ def execute_command(args, library_service: LibraryService) -> None:
         print(f"Системная ошибка: {e}")
 
 
-def print_books_table(books):
+@contextmanager
+def open_input(path: str) -> Iterator[TextIO]:
+    """
+    Открывает файл для чтения или возвращает стандартный ввод для пути "-"
+    """
+    if path == "-":
+        yield sys.stdin
+        return
+    try:
+        with open(path, encoding="utf-8", newline="") as file:
+            yield file
+    except FileNotFoundError:
+        raise ValueError(f"Файл {path} не найден")
+
+
+@contextmanager
+def timer() -> Iterator:
+    """
+    Засекает время выполнения блока.
+    Возвращает функцию, которая после выхода из блока отдаёт длительность в секундах.
+    """
+    start = time.perf_counter()
+    end = None
+    yield lambda: (end or time.perf_counter()) - start
+    end = time.perf_counter()
+
+
+def format_time(timestamp: int, pattern: str = "%Y-%m-%d %H:%M") -> str:
+    """
+    Форматирует время в секундах от начала эпохи в местном часовом поясе
+    """
+    from datetime import datetime
+
+    return datetime.fromtimestamp(timestamp).strftime(pattern)
+
+
+def format_throughput(count: int, seconds: float) -> str:
+    """
+    Форматирует время и скорость обработки записей
+    """
+    rate = count / seconds if seconds > 0 else 0
+    return f" за {seconds:.2f} с ({rate:.0f} в секунду)"
+
+
+def paginate(books: Iterable[Book], offset: int, limit: int | None) -> Iterator[Book]:
+    """
+    Пропускает offset книг и возвращает не больше limit следующих.
+    Книги после последней нужной не запрашиваются у итератора.
+    """
+    return islice(books, offset, None if limit is None else offset + limit)
+
+
+def print_page(library_service: LibraryService, args, **criteria) -> None:
+    """
+    Выводит найденные книги в порядке --order-by, начиная после курсора --after.
+    Курсор следующей страницы выводится в stderr, чтобы не смешиваться
+    с книгами в форматах JSONL и CSV.
+    """
+    if args.order_by is None:
+        raise ValueError("--desc и --after используются вместе с --order-by")
+    if args.limit == 0:
+        # Как и без --order-by: пустая выдача, без запроса страницы нулевого размера
+        print_books([], args.format)
+        return
+    order_by = f"-{args.order_by}" if args.desc else args.order_by
+    limit = None if args.limit is None else args.offset + args.limit
+    page = library_service.page_books(order_by, args.after, limit, **criteria)
+    print_books(page.books[args.offset:], args.format)
+    if page.cursor is not None:
+        print(f"Следующая страница: --after {page.cursor}", file=sys.stderr)
+
+
+def print_books(books: Iterable[Book], output_format: str = "table", file: TextIO | None = None) -> None:
+    """
+    Выводит книги в одном из форматов: таблица, JSONL или CSV.
+    Если книги читаются из хранилища потоком, время их чтения входит во время вывода.
+    """
+    file = file or sys.stdout
+    books = profiling.recorder.counted(books, "cli.rows")
+    with profiling.recorder.timer("cli.print"):
+        if output_format == "jsonl":
+            from src.codec import encode_jsonl
+
+            write_chunks(encode_jsonl(books), file)
+        elif output_format == "csv":
+            import csv
+
+            writer = csv.writer(file, lineterminator="\n")
+            writer.writerow(CSV_FIELDS)
+            writer.writerows(
+                (book.id, book.title, book.author, book.year, book.status.value) for book in books
+            )
+        else:
+            print_books_table(books, file)
+
+
+def write_chunks(lines: Iterable[str], file: TextIO) -> None:
+    """
+    Записывает строки в вывод блоками по CHUNK_SIZE
+    """
+    lines = iter(lines)
+    while chunk := "".join(islice(lines, CHUNK_SIZE)):
+        file.write(chunk)
+
+
+def fit(text: str, width: int) -> str:
+    """
+    Обрезает текст до ширины столбца, заменяя конец многоточием
+    """
+    if len(text) <= width:
+        return text
+    return text[:width - 1].rstrip() + "…"
+
+
+def print_books_table(books: Iterable[Book], file: TextIO | None = None) -> None:
     """
     Форматированный вывод списка книг в виде таблицы.
+    Книги выводятся по мере получения, поэтому список может быть итератором.
+    Строки собираются блоками и записываются в вывод одним вызовом на блок.
     """
-    if not books:
-        print("Нет книг для отображения.")
+    file = file or sys.stdout
+    books = iter(books)
+    first_book = next(books, None)
+    if first_book is None:
+        file.write("Нет книг для отображения.\n")
         return
 
-    # Ширина столбцов
-    col_widths = {"ID": 36, "Название": 30, "Автор": 20, "Год": 6, "Статус": 10}
-
-    # Заголовок
-    header = f"| {'ID'.ljust(col_widths['ID'])} | {'Название'.ljust(col_widths['Название'])} | {'Автор'.ljust(col_widths['Автор'])} | {'Год'.ljust(col_widths['Год'])} | {'Статус'.ljust(col_widths['Статус'])} |"
-    print("-" * len(header))
-    print(header)
-    print("-" * len(header))
-
-    # Вывод книг
-    for book in books:
-        print(
-            f"| {book.id.ljust(col_widths['ID'])} "
-            f"| {shorten(book.title, width=col_widths['Название'] - 1, placeholder='…').ljust(col_widths['Название'])} "
-            f"| {shorten(book.author, width=col_widths['Автор'] - 1, placeholder='…').ljust(col_widths['Автор'])} "
-            f"| {str(book.year).ljust(col_widths['Год'])} "
-            f"| {str(book.status).ljust(col_widths['Статус'])} |"
-        )
-
-    print("-" * len(header))
+    title_width, author_width = COLUMN_WIDTHS["Название"] - 1, COLUMN_WIDTHS["Автор"] - 1
+    header = ROW_TEMPLATE.format(*COLUMN_WIDTHS)
+    separator = "-" * (len(header) - 1) + "\n"
+    file.write(separator + header + separator)
+
+    write_chunks(
+        (
+            ROW_TEMPLATE.format(
+                book.id,
+                fit(book.title, title_width),
+                fit(book.author, author_width),
+                book.year,
+                book.status.value,
+            )
+            for book in chain([first_book], books)
+        ),
+        file,
+    )
+    file.write(separator)
+
+
+def print_facets(facets: FacetCounts, file: TextIO | None = None) -> None:
+    """
+    Выводит сводку по каталогу таблицами по статусам, диапазонам лет и авторам
+    """
+    file = file or sys.stdout
+    file.write(f"Всего книг: {facets.total}\n")
+    print_table(STATUS_WIDTHS, facets.statuses.items(), "Нет книг.", file)
+    step = facets.year_step
+    print_table(
+        YEAR_RANGE_WIDTHS,
+        ((str(start) if step == 1 else f"{start}–{start + step - 1}", count) for start, count in facets.year_ranges.items()),
+        "Нет книг.",
+        file,
+    )
+    print_table(AUTHOR_WIDTHS, facets.authors.items(), "Нет авторов для отображения.", file)
+
+
+def print_table(
+    widths: dict[str, int],
+    rows: Iterable[tuple],
+    empty_message: str,
+    file: TextIO | None = None,
+) -> None:
+    """
+    Выводит строки таблицы со столбцами заданной ширины.
+    Строковые значения обрезаются по ширине столбца.
+    """
+    file = file or sys.stdout
+    rows = iter(rows)
+    first_row = next(rows, None)
+    if first_row is None:
+        file.write(empty_message + "\n")
+        return
+
+    template = "| " + " | ".join(f"{{:<{width}}}" for width in widths.values()) + " |\n"
+    header = template.format(*widths)
+    separator = "-" * (len(header) - 1) + "\n"
+    file.write(separator + header + separator)
+
+    write_chunks(
+        (
+            template.format(
+                *(fit(value, width) if isinstance(value, str) else value for value, width in zip(row, widths.values()))
+            )
+            for row in chain([first_row], rows)
+        ),
+        file,
+    )
+    file.write(separator)
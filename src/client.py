@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import json
+from http.client import HTTPConnection, HTTPException
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator
+from urllib.parse import quote, urlencode, urlsplit
+
+from src.models import Book, BookStatus, Change, ChangeType
+
+# Клиент запускается вместо загрузки каталога, поэтому модули журнала выдач,
+# счётчиков, страниц и хранилища (с sqlite3) импортируются при первом обращении к ним
+if TYPE_CHECKING:
+    from src.circulation import Loan, LoanEvent
+    from src.facets import FacetCounts
+    from src.paging import Page
+
+
+class RemoteLibraryService:
+    """
+    Клиент сервера библиотеки с тем же интерфейсом, что и LibraryService.
+    Позволяет CLI не загружать каталог, а обращаться к уже запущенному серверу.
+    """
+
+    def __init__(self, url: str) -> None:
+        address = urlsplit(url if "//" in url else f"//{url}")
+        self.url = url
+        self._connection = HTTPConnection(address.hostname or "127.0.0.1", address.port or 8000)
+
+    def add_book(self, title: str, author: str, year: int, merge_duplicates: bool = False) -> Book:
+        """
+        Добавляет новую книгу в библиотеку и возвращает её
+        или, с merge_duplicates, уже существующую такую же книгу
+        """
+        body = {"title": title, "author": author, "year": year}
+        if merge_duplicates:
+            body["merge"] = True
+        return Book.from_dict(self._request("POST", "/books", body))
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Добавляет книги одним запросом
+        """
+        return self.apply_changes(Change(ChangeType.ADD, book.id, book=book) for book in books)
+
+    def remove_books(self, book_ids: Iterable[str]) -> int:
+        """
+        Удаляет книги по id одним запросом
+        """
+        return self.apply_changes(Change(ChangeType.REMOVE, book_id) for book_id in book_ids)
+
+    def update_statuses(self, updates: Iterable[tuple[str, str]]) -> int:
+        """
+        Обновляет статусы книг по парам (id, статус) одним запросом
+        """
+        return self.apply_changes(
+            Change(ChangeType.STATUS, book_id, status=BookStatus.from_str(status))
+            for book_id, status in updates
+        )
+
+    def apply_changes(self, changes: Iterable[Change]) -> int:
+        """
+        Применяет пакет изменений одним запросом
+        """
+        data = self._request("POST", "/changes", [change.to_dict() for change in changes])
+        return data["count"]
+
+    def remove_book(self, book_id: str) -> None:
+        """
+        Удаляет книгу по её id
+        """
+        self._request("DELETE", f"/books/{quote(book_id, safe='')}")
+
+    def search_books(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: str | None = None,
+        order_by: str | None = None,
+    ) -> list[Book]:
+        """
+        Возвращает список книг, отфильтрованных по переданным критериям
+        """
+        params = {
+            "title": title,
+            "author": author,
+            "year": year,
+            "year_from": year_from,
+            "year_to": year_to,
+            "status": status,
+            "order_by": order_by,
+        }
+        query = urlencode({name: value for name, value in params.items() if value is not None})
+        return [Book.from_dict(data) for data in self._request("GET", f"/books?{query}")]
+
+    def page_books(
+        self,
+        order_by: str = "title",
+        cursor: str | None = None,
+        limit: int | None = 20,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: str | None = None,
+    ) -> Page:
+        """
+        Возвращает страницу найденных книг в порядке order_by и курсор следующей страницы
+        """
+        params = {
+            "order_by": order_by,
+            "cursor": cursor,
+            "limit": limit,
+            "title": title,
+            "author": author,
+            "year": year,
+            "year_from": year_from,
+            "year_to": year_to,
+            "status": status,
+        }
+        from src.paging import Page
+
+        query = urlencode({name: value for name, value in params.items() if value is not None})
+        return Page.from_dict(self._request("GET", f"/page?{query}"))
+
+    def iter_search_books(self, *args, **kwargs) -> Iterator[Book]:
+        """
+        Возвращает итератор по найденным книгам
+        """
+        return iter(self.search_books(*args, **kwargs))
+
+    def find_books(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Полнотекстовый поиск по названию и автору
+        """
+        params = urlencode({"query": query, "limit": limit})
+        return [Book.from_dict(data) for data in self._request("GET", f"/find?{params}")]
+
+    def get_all_books(self, order_by: str | None = None) -> list[Book]:
+        """
+        Возвращает список всех книг
+        """
+        return self.search_books(order_by=order_by)
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Возвращает итератор по всем книгам
+        """
+        return iter(self.get_all_books())
+
+    def update_book_status(
+        self,
+        book_id: str,
+        status: str,
+        borrower: str | None = None,
+        days: int | None = None,
+    ) -> None:
+        """
+        Обновляет статус книги по её id
+        """
+        self._request(
+            "PATCH",
+            f"/books/{quote(book_id, safe='')}",
+            {"status": status, "borrower": borrower, "days": days},
+        )
+
+    def book_history(self, book_id: str, limit: int | None = None) -> list[LoanEvent]:
+        """
+        Возвращает выдачи и возвраты книги, начиная с последнего события
+        """
+        from src.circulation import LoanEvent
+
+        query = "" if limit is None else f"?{urlencode({'limit': limit})}"
+        data = self._request("GET", f"/books/{quote(book_id, safe='')}/history{query}")
+        return [LoanEvent.from_dict(event) for event in data]
+
+    def overdue_loans(self, limit: int | None = None) -> list[tuple[Book, Loan]]:
+        """
+        Возвращает книги с просроченными выдачами
+        """
+        from src.circulation import Loan
+
+        query = "" if limit is None else f"?{urlencode({'limit': limit})}"
+        data = self._request("GET", f"/overdue{query}")
+        return [(Book.from_dict(item["book"]), Loan.from_dict(item["loan"])) for item in data]
+
+    def top_books(self, days: int | None = None, limit: int = 10) -> list[tuple[Book, int]]:
+        """
+        Возвращает самые часто выдаваемые книги и число их выдач
+        """
+        params = {"limit": limit} if days is None else {"days": days, "limit": limit}
+        data = self._request("GET", f"/top?{urlencode(params)}")
+        return [(Book.from_dict(item["book"]), item["count"]) for item in data]
+
+    def find_duplicates(self, title: str, author: str, year: int) -> list[Book]:
+        """
+        Возвращает книги с теми же названием, автором и годом
+        """
+        query = urlencode({"title": title, "author": author, "year": year})
+        return [Book.from_dict(data) for data in self._request("GET", f"/duplicates?{query}")]
+
+    def duplicate_groups(self, fuzzy: bool = False, threshold: float = 0.8) -> list[list[Book]]:
+        """
+        Возвращает группы книг-дубликатов
+        """
+        query = urlencode({"fuzzy": int(fuzzy), "threshold": threshold})
+        data = self._request("GET", f"/dedupe?{query}")
+        return [[Book.from_dict(book) for book in group] for group in data]
+
+    def facets(self, year_step: int = 10, authors: int | None = 10) -> FacetCounts:
+        """
+        Возвращает число книг по статусам, годам, диапазонам лет и авторам
+        """
+        from src.facets import FacetCounts
+
+        params = {"year_step": year_step} if authors is None else {"year_step": year_step, "authors": authors}
+        return FacetCounts.from_dict(self._request("GET", f"/facets?{urlencode(params)}"))
+
+    def compact_storage(self) -> None:
+        """
+        Сворачивает журнал изменений хранилища сервера в снимок
+        """
+        self._request("POST", "/compact", {})
+
+    def migrate_from_json(self, file_path: str) -> int:
+        """
+        Заменяет содержимое хранилища сервера книгами из локального JSON-файла.
+        Файл читается клиентом и передаётся в теле запроса.
+        """
+        from src.storage import Storage
+
+        if not Path(file_path).exists():
+            raise ValueError(f"Файл {file_path} не найден")
+
+        return self.replace_books(Storage(file_path).load_books())
+
+    def replace_books(self, books: list[Book]) -> int:
+        """
+        Заменяет содержимое хранилища сервера переданными книгами
+        """
+        data = self._request("POST", "/migrate", {"books": [book.to_dict() for book in books]})
+        return data["count"]
+
+    def _request(self, method: str, path: str, body: object = None) -> object:
+        """
+        Отправляет запрос серверу и возвращает разобранный ответ.
+        Ответы 4xx превращаются в ValueError, остальные ошибки — в RuntimeError.
+        """
+        payload = None if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        try:
+            self._connection.request(method, path, payload, headers)
+            response = self._connection.getresponse()
+            data = json.loads(response.read() or b"null")
+        except (OSError, HTTPException) as e:
+            self._connection.close()
+            raise RuntimeError(f"Сервер {self.url} недоступен: {e}")
+
+        if 400 <= response.status < 500:
+            raise ValueError(data["error"])
+        if response.status >= 500:
+            raise RuntimeError(data["error"])
+        return data
@@ -0,0 +1,48 @@
+from json.encoder import encode_basestring
+from typing import Iterable, Iterator
+
+from src.models import Book, BookStatus
+
+BOOK_TEMPLATE = (
+    '    {{\n'
+    '        "id": {},\n'
+    '        "title": {},\n'
+    '        "author": {},\n'
+    '        "year": {},\n'
+    '        "status": {}\n'
+    '    }}'
+)
+JSONL_TEMPLATE = '{{"id": {}, "title": {}, "author": {}, "year": {}, "status": {}}}\n'
+ENCODED_STATUSES = {status: encode_basestring(status.value) for status in BookStatus}
+
+
+def encode_books(books: Iterable[Book]) -> str:
+    """
+    Сериализует книги в тот же текст, что и json.dump(..., ensure_ascii=False, indent=4),
+    но без промежуточных словарей и медленного кодировщика с отступами
+    """
+    rows = ",\n".join(
+        BOOK_TEMPLATE.format(
+            encode_basestring(book.id),
+            encode_basestring(book.title),
+            encode_basestring(book.author),
+            int(book.year),
+            ENCODED_STATUSES[book.status],
+        )
+        for book in books
+    )
+    return f"[\n{rows}\n]" if rows else "[]"
+
+
+def encode_jsonl(books: Iterable[Book]) -> Iterator[str]:
+    """
+    Сериализует книги в строки JSONL, совпадающие с json.dumps(book.to_dict(), ensure_ascii=False)
+    """
+    for book in books:
+        yield JSONL_TEMPLATE.format(
+            encode_basestring(book.id),
+            encode_basestring(book.title),
+            encode_basestring(book.author),
+            int(book.year),
+            ENCODED_STATUSES[book.status],
+        )
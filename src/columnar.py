@@ -0,0 +1,193 @@
+from array import array
+from collections import Counter
+from typing import Iterable
+
+from src.models import Book, BookStatus
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Поиск по маскам выполняется только с NumPy; без него столбцы используются для подсчётов
+VECTORIZED = numpy is not None
+
+STATUSES = list(BookStatus)
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+DELETED = 255
+
+
+class ColumnStore:
+    """
+    Столбцовое представление каталога.
+
+    Книги хранятся строками в порядке добавления: год — в массиве int32,
+    статус — в массиве байтов, а автор и название закодированы номерами
+    в словарях различных значений. Удалённые строки помечаются статусом
+    DELETED и вычищаются, когда их становится больше половины.
+
+    С NumPy фильтры по году, статусу, автору и названию вычисляются
+    булевыми масками над столбцами, а подсчёты — через bincount.
+    """
+
+    def __init__(self, books: Iterable[Book] = ()) -> None:
+        self._build(books)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def row(self, book_id: str) -> int:
+        """
+        Возвращает номер строки книги; номера возрастают в порядке добавления
+        """
+        return self._rows[book_id]
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу строкой в конец столбцов
+        """
+        self._rows[book.id] = len(self._books)
+        self._books.append(book)
+        self._years.append(book.year)
+        self._statuses.append(STATUS_CODES[book.status])
+        self._authors.append(self._encode(self._author_codes, self._author_names, book.author))
+        self._titles.append(self._encode(self._title_codes, self._title_names, book.title))
+
+    def remove(self, book_id: str) -> None:
+        """
+        Помечает строку книги удалённой
+        """
+        row = self._rows.pop(book_id)
+        self._books[row] = None
+        self._statuses[row] = DELETED
+        self._deleted += 1
+        if self._deleted > len(self._books) // 2:
+            self._compact()
+
+    def set_status(self, book_id: str, status: BookStatus) -> None:
+        self._statuses[self._rows[book_id]] = STATUS_CODES[status]
+
+    def select(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: BookStatus | None = None,
+    ) -> list[Book]:
+        """
+        Возвращает книги, удовлетворяющие всем критериям, в порядке добавления.
+        Требует NumPy: условия вычисляются масками над столбцами.
+        """
+        if not self._books:
+            return []
+
+        statuses = numpy.frombuffer(self._statuses, dtype=numpy.uint8)
+        if status is not None:
+            mask = statuses == STATUS_CODES[status]
+        else:
+            mask = statuses != DELETED
+
+        if year is not None or year_from is not None or year_to is not None:
+            years = numpy.frombuffer(self._years, dtype=numpy.int32)
+            if year is not None:
+                mask &= years == year
+            if year_from is not None:
+                mask &= years >= year_from
+            if year_to is not None:
+                mask &= years <= year_to
+        if author:
+            mask &= self._matching(self._authors, self._author_names, author.lower())
+        if title:
+            mask &= self._matching(self._titles, self._title_names, title.lower())
+
+        books = self._books
+        return [books[row] for row in numpy.flatnonzero(mask).tolist()]
+
+    def count_by_status(self) -> dict[BookStatus, int]:
+        """
+        Возвращает число книг каждого статуса
+        """
+        counts = self._count(self._statuses, len(STATUSES))
+        return {status: counts.get(code, 0) for status, code in STATUS_CODES.items()}
+
+    def count_by_year(self) -> dict[int, int]:
+        """
+        Возвращает число книг по годам издания в порядке возрастания года
+        """
+        if numpy is not None and self._books:
+            years = numpy.frombuffer(self._years, dtype=numpy.int32)[self._live()]
+            values, counts = numpy.unique(years, return_counts=True)
+            return dict(zip(values.tolist(), counts.tolist()))
+        if self._deleted:
+            counts = Counter(year for year, code in zip(self._years, self._statuses) if code != DELETED)
+        else:
+            counts = Counter(self._years)
+        return dict(sorted(counts.items()))
+
+    def count_by_author(self) -> dict[str, int]:
+        """
+        Возвращает число книг каждого автора по убыванию числа книг
+        """
+        counts = self._count(self._authors, len(self._author_names))
+        names = list(self._author_codes)
+        return {names[code]: count for code, count in sorted(counts.items(), key=lambda item: -item[1])}
+
+    def _live(self):
+        return numpy.frombuffer(self._statuses, dtype=numpy.uint8) != DELETED
+
+    def _count(self, column, size: int) -> dict[int, int]:
+        """
+        Считает значения столбца кодов в неудалённых строках
+        """
+        if numpy is not None and self._books:
+            codes = numpy.frombuffer(column, dtype=numpy.uint8 if isinstance(column, bytearray) else numpy.uint32)
+            counts = numpy.bincount(codes[self._live()], minlength=size)
+            return {code: count for code, count in enumerate(counts.tolist()) if count}
+        if self._deleted:
+            return Counter(code for code, status in zip(column, self._statuses) if status != DELETED)
+        return Counter(column)
+
+    @staticmethod
+    def _matching(column: array, names: list[str], text: str):
+        """
+        Возвращает маску строк, в значении которых есть подстрока text.
+        Подстрока ищется по словарю различных значений, а не по каждой строке.
+        """
+        codes = [code for code, name in enumerate(names) if text in name]
+        return numpy.isin(numpy.frombuffer(column, dtype=numpy.uint32), codes)
+
+    @staticmethod
+    def _encode(codes: dict[str, int], names: list[str], value: str) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value.lower())
+        return code
+
+    def _build(self, books: Iterable[Book]) -> None:
+        """
+        Заполняет столбцы книгами заново
+        """
+        self._books: list[Book | None] = []
+        self._rows: dict[str, int] = {}
+        self._years = array("i")
+        self._statuses = bytearray()
+        self._authors = array("I")
+        self._titles = array("I")
+        # Словари значений: строка -> номер и номер -> строка в нижнем регистре
+        self._author_codes: dict[str, int] = {}
+        self._author_names: list[str] = []
+        self._title_codes: dict[str, int] = {}
+        self._title_names: list[str] = []
+        self._deleted = 0
+
+        for book in books:
+            self.add(book)
+
+    def _compact(self) -> None:
+        """
+        Пересобирает столбцы без удалённых строк, сохраняя порядок
+        """
+        self._build([book for book in self._books if book is not None])
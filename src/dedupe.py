@@ -0,0 +1,140 @@
+import zlib
+from operator import eq, itemgetter
+from typing import Iterable
+
+from src.models import Book
+from src.search import tokenize
+
+# Параметры MinHash: сигнатура из BANDS * ROWS значений, книги попадают в кандидаты,
+# если у них совпадают все значения хотя бы одной полосы
+BANDS = 4
+ROWS = 3
+SIGNATURE_SIZE = BANDS * ROWS
+SHINGLE_SIZE = 3
+# Значение ячейки сигнатуры, в которую не попал ни один хеш
+EMPTY = 1 << 32
+# Сколько книг корзины сверяется с новой книгой: ограничивает работу на частых корзинах
+BUCKET_CHECKS = 8
+# Насколько доля совпавших значений сигнатур может быть ниже порога,
+# чтобы пара ещё сверялась по подстрокам: оценка по SIGNATURE_SIZE значениям неточна
+ESTIMATE_MARGIN = 0.25
+
+
+def fingerprint(title: str, author: str, year: int) -> str:
+    """
+    Возвращает отпечаток книги: слова названия и автора без учёта регистра,
+    пунктуации и различий «е» и «ё», и год издания
+    """
+    return f"{' '.join(tokenize(title))}\x1f{' '.join(tokenize(author))}\x1f{year}"
+
+
+def book_fingerprint(book: Book) -> str:
+    return fingerprint(book.title, book.author, book.year)
+
+
+def shingles(text: str) -> set[str]:
+    """
+    Возвращает множество подстрок длины SHINGLE_SIZE
+    """
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def signature(text: str) -> tuple[int, ...]:
+    """
+    Возвращает MinHash-сигнатуру подстрок текста с одной перестановкой:
+    хеши раскладываются по ячейкам по остатку от деления, и в каждой
+    ячейке остаётся наименьший. Это один проход по хешам вместо прохода
+    на каждое значение сигнатуры.
+    """
+    values = [EMPTY] * SIGNATURE_SIZE
+    # crc32 вместо hash(): хеши строк меняются между запусками, а группы не должны
+    for value in map(zlib.crc32, map(str.encode, shingles(text))):
+        cell = value % SIGNATURE_SIZE
+        if value < values[cell]:
+            values[cell] = value
+    return tuple(values)
+
+
+def similarity(first: set[str], second: set[str]) -> float:
+    """
+    Коэффициент Жаккара двух множеств
+    """
+    return len(first & second) / len(first | second)
+
+
+def duplicate_groups(books: Iterable[Book], fuzzy: bool = False, threshold: float = 0.8) -> list[list[Book]]:
+    """
+    Возвращает группы книг-дубликатов в порядке первых книг групп,
+    книги в каждой группе — в порядке books.
+
+    Книги группируются по отпечатку за один проход. С fuzzy группы с одним
+    годом издания дополнительно объединяются, если подстроки их названий
+    и авторов совпадают не меньше чем на threshold (коэффициент Жаккара).
+    Кандидаты на объединение находятся через MinHash с разбиением на полосы,
+    поэтому время остаётся почти линейным, а не растёт с квадратом числа книг.
+    """
+    if fuzzy:
+        # Объединённые группы собираются из нескольких, и номера книг восстанавливают их порядок
+        numbered: dict[str, list[tuple[int, Book]]] = {}
+        for position, book in enumerate(books):
+            numbered.setdefault(book_fingerprint(book), []).append((position, book))
+        return _merge_similar(list(numbered.items()), threshold)
+
+    groups: dict[str, list[Book]] = {}
+    for book in books:
+        groups.setdefault(book_fingerprint(book), []).append(book)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def _merge_similar(groups: list[tuple[str, list[tuple[int, Book]]]], threshold: float) -> list[list[Book]]:
+    """
+    Объединяет похожие группы книг с номерами и возвращает группы из нескольких книг,
+    упорядоченные по номерам
+    """
+    parents = list(range(len(groups)))
+
+    def find(number: int) -> int:
+        while parents[number] != number:
+            parents[number] = parents[parents[number]]
+            number = parents[number]
+        return number
+
+    texts = []
+    signatures = []
+    for key, _ in groups:
+        title, author, year = key.split("\x1f")
+        text = f"{title} {author}"
+        texts.append((year, text))
+        signatures.append(signature(text))
+
+    cache: dict[int, set[str]] = {}
+
+    def shingles_of(number: int) -> set[str]:
+        if number not in cache:
+            cache[number] = shingles(texts[number][1])
+        return cache[number]
+
+    # Полосы обрабатываются по одной, чтобы в памяти была только одна таблица корзин
+    for band in range(BANDS):
+        buckets: dict[tuple, list[int]] = {}
+        for number, values in enumerate(signatures):
+            key = (texts[number][0], *values[band * ROWS:(band + 1) * ROWS])
+            bucket = buckets.setdefault(key, [])
+            for other in bucket[:BUCKET_CHECKS]:
+                if find(other) == find(number):
+                    continue
+                # Доля совпавших значений сигнатур оценивает сходство без построения множеств
+                estimate = sum(map(eq, signatures[other], values)) / SIGNATURE_SIZE
+                if estimate < threshold - ESTIMATE_MARGIN:
+                    continue
+                if similarity(shingles_of(other), shingles_of(number)) >= threshold:
+                    parents[find(number)] = find(other)
+            bucket.append(number)
+        cache.clear()
+
+    merged: dict[int, list[tuple[int, Book]]] = {}
+    for number, (_, books) in enumerate(groups):
+        merged.setdefault(find(number), []).extend(books)
+    return [[book for _, book in sorted(books, key=itemgetter(0))] for books in merged.values() if len(books) > 1]
@@ -0,0 +1,220 @@
+import json
+import sqlite3
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Hashable, Iterable, NamedTuple
+
+from src.models import Book, BookStatus
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counts (
+    facet TEXT NOT NULL,
+    key NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (facet, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS counts_top ON counts (facet, count);
+"""
+
+STATUS = "status"
+YEAR = "year"
+AUTHOR = "author"
+
+
+def book_facets(book: Book) -> tuple[tuple[str, object], ...]:
+    """
+    Возвращает пары (срез, значение), по которым учитывается книга
+    """
+    return (STATUS, book.status.value), (YEAR, book.year), (AUTHOR, book.author)
+
+
+def count_facets(books: Iterable[Book]) -> Counter:
+    """
+    Считает книги по срезам за один проход
+    """
+    counts: Counter = Counter()
+    for book in books:
+        counts.update(book_facets(book))
+    return counts
+
+
+class FacetCounts(NamedTuple):
+    """
+    Число книг по статусам, годам, диапазонам лет и авторам.
+    Диапазоны лет длиной year_step задаются своим первым годом,
+    авторы упорядочены по убыванию числа книг.
+    """
+    total: int
+    statuses: dict[str, int]
+    years: dict[int, int]
+    year_ranges: dict[int, int]
+    year_step: int
+    authors: dict[str, int]
+
+    @staticmethod
+    def from_counts(
+        statuses: dict[str, int],
+        years: dict[int, int],
+        authors: dict[str, int],
+        year_step: int = 10,
+    ) -> "FacetCounts":
+        """
+        Собирает сводку из счётчиков по срезам, добавляя итог и диапазоны лет
+        """
+        if year_step < 1:
+            raise ValueError("Длина диапазона лет должна быть положительной")
+        year_ranges: dict[int, int] = {}
+        for year, count in sorted(years.items()):
+            start = year - year % year_step
+            year_ranges[start] = year_ranges.get(start, 0) + count
+        return FacetCounts(
+            total=sum(statuses.values()),
+            statuses={status.value: statuses.get(status.value, 0) for status in BookStatus},
+            years=dict(sorted(years.items())),
+            year_ranges=year_ranges,
+            year_step=year_step,
+            authors=authors,
+        )
+
+    def to_dict(self) -> dict:
+        data = self._asdict()
+        # Ключи объектов JSON — строки, годы восстанавливаются в from_dict
+        data["years"] = {str(year): count for year, count in self.years.items()}
+        data["year_ranges"] = {str(year): count for year, count in self.year_ranges.items()}
+        return data
+
+    @staticmethod
+    def from_dict(data: dict) -> "FacetCounts":
+        return FacetCounts(
+            total=data["total"],
+            statuses=data["statuses"],
+            years={int(year): count for year, count in data["years"].items()},
+            year_ranges={int(year): count for year, count in data["year_ranges"].items()},
+            year_step=data["year_step"],
+            authors=data["authors"],
+        )
+
+
+class FacetStore:
+    """
+    Счётчики книг по срезам в базе SQLite рядом с хранилищем.
+
+    Вместе со счётчиками хранится отметка хранилища, которой они соответствуют.
+    Сервис переносит в счётчики каждое своё изменение и обновляет отметку,
+    поэтому сводка читается из нескольких строк таблицы, а не пересчитывается
+    по всем книгам. Если хранилище изменили в обход сервиса, отметки
+    не совпадут и счётчики будут пересчитаны при следующем запросе.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Конструктор класса FacetStore.
+        Принимает на вход путь к файлу базы данных. База открывается при первом обращении.
+        """
+        self.file_path = Path(file_path)
+        self._connection: sqlite3.Connection | None = None
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с базой данных
+        """
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def is_current(self, stamp: Hashable) -> bool:
+        """
+        Проверяет, что счётчики соответствуют отметке хранилища
+        """
+        rows = self._execute("SELECT value FROM meta WHERE key = 'stamp'", ())
+        return bool(rows) and rows[0][0] == json.dumps(stamp)
+
+    def replace(self, counts: Counter, stamp: Hashable) -> None:
+        """
+        Заменяет все счётчики и запоминает отметку хранилища
+        """
+        def fill(connection: sqlite3.Connection) -> None:
+            connection.execute("DELETE FROM counts")
+            connection.executemany(
+                "INSERT INTO counts (facet, key, count) VALUES (?, ?, ?)",
+                ((facet, key, count) for (facet, key), count in counts.items() if count > 0),
+            )
+
+        self._write(stamp, fill)
+
+    def apply(self, deltas: Counter, stamp: Hashable) -> None:
+        """
+        Прибавляет к счётчикам изменения и запоминает новую отметку хранилища.
+        Счётчики, дошедшие до нуля, удаляются.
+        """
+        def update(connection: sqlite3.Connection) -> None:
+            for (facet, key), delta in deltas.items():
+                if delta == 0:
+                    continue
+                connection.execute(
+                    "INSERT INTO counts (facet, key, count) VALUES (?, ?, ?) "
+                    "ON CONFLICT (facet, key) DO UPDATE SET count = count + excluded.count",
+                    (facet, key, delta),
+                )
+                if delta < 0:
+                    connection.execute(
+                        "DELETE FROM counts WHERE facet = ? AND key = ? AND count <= 0", (facet, key)
+                    )
+
+        self._write(stamp, update)
+
+    def restamp(self, old_stamp: Hashable, stamp: Hashable) -> None:
+        """
+        Переносит счётчики на новую отметку хранилища, если они соответствовали
+        прежней: содержимое хранилища не изменилось, изменилось только представление
+        """
+        if self.is_current(old_stamp):
+            self._write(stamp)
+
+    def counts(self, facet: str, limit: int | None = None) -> dict:
+        """
+        Возвращает счётчики среза по убыванию числа книг
+        """
+        rows = self._execute(
+            "SELECT key, count FROM counts WHERE facet = ? ORDER BY count DESC, key LIMIT ?",
+            (facet, -1 if limit is None else limit),
+        )
+        return dict(rows)
+
+    def _write(self, stamp: Hashable, action: Callable[[sqlite3.Connection], None] | None = None) -> None:
+        """
+        Выполняет изменение счётчиков и запись отметки в одной транзакции
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                if action is not None:
+                    action(connection)
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('stamp', ?)", (json.dumps(stamp),)
+                )
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка записи в базу данных {self.file_path}: {e}")
+
+    def _execute(self, query: str, params: tuple) -> list[tuple]:
+        try:
+            return self._connect().execute(query, params).fetchall()
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка чтения из базы данных {self.file_path}: {e}")
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Возвращает соединение, при первом обращении открывая базу и создавая схему
+        """
+        if self._connection is None:
+            try:
+                # Соединение может использоваться из потоков сервера, доступ к нему сериализует вызывающий
+                self._connection = sqlite3.connect(self.file_path, check_same_thread=False)
+                self._connection.executescript(SCHEMA)
+            except sqlite3.Error as e:
+                raise RuntimeError(f"Ошибка открытия базы данных {self.file_path}: {e}")
+        return self._connection
@@ -0,0 +1,69 @@
+import csv
+import json
+from typing import Iterator, TextIO
+
+from src.models import Book, BookStatus, Change, ChangeType
+
+
+def read_books(file: TextIO, file_format: str) -> Iterator[Book]:
+    """
+    Читает книги из CSV с заголовком или из JSONL.
+    Обязательные поля: title, author, year; необязательные: status, id.
+    """
+    if file_format == "csv":
+        records, parse = csv.DictReader(file), dict
+    elif file_format == "jsonl":
+        records, parse = (line for line in file if line.strip()), json.loads
+    else:
+        raise ValueError(f"Неизвестный формат: {file_format}")
+
+    for number, record in enumerate(records, start=1):
+        try:
+            book = book_from_record(parse(record))
+        except (KeyError, ValueError, TypeError) as e:
+            raise ValueError(f"Запись {number}: {e}")
+        yield book
+
+
+def book_from_record(record: dict) -> Book:
+    """
+    Создает книгу из записи импорта
+    """
+    title, author, year = record["title"], record["author"], int(record["year"])
+    status = BookStatus.from_str(record["status"]) if record.get("status") else BookStatus.AVAILABLE
+    if record.get("id"):
+        return Book(title, author, year, status, record["id"])
+    return Book(title, author, year, status)
+
+
+def read_changes(file: TextIO) -> Iterator[Change]:
+    """
+    Читает поток команд изменения в формате JSONL:
+
+    {"op": "add", "title": ..., "author": ..., "year": ...}
+    {"op": "remove", "id": ...}
+    {"op": "update", "id": ..., "status": "выдана"}
+    """
+    for line_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            change = change_from_command(json.loads(line))
+        except (KeyError, ValueError, TypeError) as e:
+            raise ValueError(f"Строка {line_number}: {e}")
+        yield change
+
+
+def change_from_command(command: dict) -> Change:
+    """
+    Создает изменение каталога из команды пакета
+    """
+    op = command["op"]
+    if op == "add":
+        book = book_from_record(command)
+        return Change(ChangeType.ADD, book.id, book=book)
+    if op == "remove":
+        return Change(ChangeType.REMOVE, command["id"])
+    if op == "update":
+        return Change(ChangeType.STATUS, command["id"], status=BookStatus.from_str(command["status"]))
+    raise ValueError(f"неизвестная команда {op}")
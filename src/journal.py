@@ -0,0 +1,209 @@
+import fcntl
+import json
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, ContextManager, Iterable, Iterator
+
+from src.models import Book, Change
+from src.storage import lock_file, write_atomic
+
+
+class JournalStorage:
+    """
+    Хранилище книг в виде снимка и журнала изменений.
+
+    Снимок имеет тот же формат, что и books.json, поэтому существующий файл
+    можно использовать без миграции. Добавление, удаление и смена статуса
+    дописываются в журнал отдельными строками, а компактирование сворачивает
+    журнал обратно в снимок.
+
+    Хранилище не держит книги в памяти: каталог восстанавливается при чтении,
+    а для записи снимка используется список книг вызывающего.
+    """
+
+    def __init__(self, file_path: str, compact_threshold: int = 10_000) -> None:
+        """
+        Конструктор класса JournalStorage.
+        Принимает на вход путь к файлу снимка; журнал хранится рядом с ним.
+        После compact_threshold записей журнал компактируется автоматически.
+        """
+        self.file_path = Path(file_path)
+        self.journal_path = self.file_path.with_name(self.file_path.name + ".journal")
+        self.compact_threshold = compact_threshold
+        if not self.file_path.exists():
+            self.file_path.write_text("[]", encoding="utf-8")
+
+        self._snapshot_stat: tuple[int, int, int] | None = None
+        self._journal_offset = 0
+        self._journal_records = 0
+
+    def save_books(self, books: Iterable[Book], changes: list[Change] | None = None) -> None:
+        """
+        Сохраняет изменения каталога.
+        Если список изменений передан, он дописывается в журнал,
+        иначе список книг записывается как новый снимок.
+        Книги читаются, только если нужно записать снимок.
+        """
+        with self._locked_journal() as journal:
+            if changes is None:
+                self._write_snapshot(books)
+                return
+
+            in_sync = self._sync(journal)
+            if self._journal_records + len(changes) >= self.compact_threshold:
+                # Журнал всё равно пришлось бы сразу свернуть: пишем снимок без него
+                if not in_sync:
+                    # Журнал дописан другим процессом, и книги вызывающего устарели
+                    state = self._read_state()
+                    for change in changes:
+                        change.apply(state)
+                    books = state.values()
+                self._write_snapshot(books)
+                return
+
+            data = "".join(
+                json.dumps(change.to_dict(), ensure_ascii=False) + "\n" for change in changes
+            ).encode("utf-8")
+            try:
+                journal.write(data)
+                journal.flush()
+                os.fsync(journal.fileno())
+            except IOError as e:
+                # Отменяем частично записанные изменения, пока журнал заблокирован
+                journal.truncate(self._journal_offset)
+                raise RuntimeError(f"Ошибка записи в файл {self.journal_path}: {e}")
+
+            self._journal_offset += len(data)
+            self._journal_records += len(changes)
+
+    def load_books(self) -> list[Book]:
+        """
+        Восстанавливает список книг из снимка и журнала и возвращает его
+        """
+        return list(self._read_state().values())
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Возвращает итератор по книгам.
+        Журнал нельзя применить без полного состояния, поэтому оно восстанавливается целиком.
+        """
+        return iter(self.load_books())
+
+    def compact(self) -> None:
+        """
+        Сворачивает журнал в новый снимок и очищает журнал
+        """
+        with self._locked_journal():
+            self._write_snapshot(self._read_state().values())
+
+    def lock(self) -> ContextManager[None]:
+        """
+        Возвращает блокировку хранилища для последовательности чтение-изменение-запись
+        между процессами
+        """
+        return lock_file(self.file_path.with_name(self.file_path.name + ".lock"))
+
+    def stamp(self) -> tuple:
+        """
+        Возвращает отметку состояния снимка и журнала
+        """
+        journal_size = self.journal_path.stat().st_size if self.journal_path.exists() else 0
+        return self._stat(self.file_path), journal_size
+
+    @contextmanager
+    def _locked_journal(self) -> Iterator[BinaryIO]:
+        """
+        Открывает журнал на дозапись под исключительной блокировкой,
+        чтобы записи разных процессов не перемешивались
+        """
+        try:
+            file = self.journal_path.open("a+b")
+        except IOError as e:
+            raise RuntimeError(f"Ошибка открытия файла {self.journal_path}: {e}")
+        with file:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield file
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+    def _sync(self, journal: BinaryIO) -> bool:
+        """
+        Сверяет счётчики журнала с файлом под блокировкой записи.
+        Отрезает незавершённую строку, оставшуюся от прерванной записи.
+        Возвращает False, если снимок или журнал изменил другой процесс.
+        """
+        size = journal.seek(0, os.SEEK_END)
+        snapshot_stat = self._stat(self.file_path)
+        if snapshot_stat == self._snapshot_stat and size == self._journal_offset:
+            return True
+
+        journal.seek(0)
+        data = journal.read()
+        complete = data[: data.rfind(b"\n") + 1]
+        if len(complete) < len(data):
+            journal.truncate(len(complete))
+        self._snapshot_stat = snapshot_stat
+        self._journal_offset = len(complete)
+        self._journal_records = complete.count(b"\n")
+        return False
+
+    def _write_snapshot(self, books: Iterable[Book]) -> None:
+        """
+        Атомарно записывает снимок и очищает журнал.
+        Повторное применение журнала к новому снимку безопасно,
+        поэтому сбой между двумя шагами не портит данные.
+        """
+        try:
+            write_atomic(
+                self.file_path,
+                json.dumps([book.to_dict() for book in books], ensure_ascii=False),
+            )
+            os.truncate(self.journal_path, 0)
+        except IOError as e:
+            raise RuntimeError(f"Ошибка записи в файл {self.file_path}: {e}")
+
+        self._snapshot_stat = self._stat(self.file_path)
+        self._journal_offset = 0
+        self._journal_records = 0
+
+    def _read_state(self) -> dict[str, Book]:
+        """
+        Читает снимок и применяет к нему журнал.
+        Незавершённая последняя строка журнала пропускается, но не удаляется:
+        её может дописывать другой процесс.
+        """
+        while True:
+            try:
+                with self.file_path.open("r", encoding="utf-8") as file:
+                    snapshot_stat = self._stat(file.fileno())
+                    books = {book["id"]: Book.from_dict(book) for book in json.load(file)}
+                data = self.journal_path.read_bytes() if self.journal_path.exists() else b""
+            except IOError as e:
+                raise RuntimeError(f"Ошибка чтения из файла {self.file_path}: {e}")
+            except json.JSONDecodeError as e:
+                raise RuntimeError(f"Ошибка декодирования JSON из файла {self.file_path}: {e}")
+            # Если снимок заменили, пока читался журнал, записи могли уйти в новый снимок
+            if self._stat(self.file_path) == snapshot_stat:
+                break
+
+        complete = data[: data.rfind(b"\n") + 1]
+        records = 0
+        try:
+            for line in complete.splitlines():
+                if line:
+                    Change.from_dict(json.loads(line)).apply(books)
+                    records += 1
+        except (json.JSONDecodeError, KeyError, ValueError) as e:
+            raise RuntimeError(f"Ошибка декодирования журнала {self.journal_path}: {e}")
+
+        self._snapshot_stat = snapshot_stat
+        self._journal_offset = len(complete)
+        self._journal_records = records
+        return books
+
+    @staticmethod
+    def _stat(path: Path | int) -> tuple[int, int, int]:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
@@ -1,17 +1,87 @@
-from src.services import LibraryService
-from src.storage import Storage
-from src.cli import execute_command, setup_parser
+from __future__ import annotations
 
+import os
+import sys
+from typing import TYPE_CHECKING
 
-def main() -> None:
-    storage = Storage("data/books.json")
-    library_service = LibraryService(storage)
+from src import profiling
+from src.cli import LOCAL_COMMANDS, execute_command, setup_parser
+
+if TYPE_CHECKING:
+    from src.services import LibraryService
+    from src.storage import BookStorage
+
+# Модули хранилищ, сервиса и клиента импортируются в функциях ниже: команде нужен
+# только один тип хранилища, а --help и convert не используют сервис вовсе
+DATA_FILES = {
+    "json": "data/books.json",
+    "journal": "data/books.json",
+    "sqlite": "data/books.db",
+    "sharded": "data/books.shards",
+    "binary": "data/books.bin",
+}
+
+
+def create_storage(kind: str, file_path: str) -> BookStorage:
+    """
+    Создает хранилище указанного типа
+    """
+    if kind == "journal":
+        from src.journal import JournalStorage
+        return JournalStorage(file_path)
+    if kind == "sqlite":
+        from src.sqlite_storage import SQLiteStorage
+        return SQLiteStorage(file_path)
+    if kind == "sharded":
+        from src.sharded_storage import ShardedStorage
+        return ShardedStorage(file_path)
+    if kind == "binary":
+        from src.binary_storage import BinaryStorage
+        return BinaryStorage(file_path)
+    from src.storage import Storage
+    return Storage(file_path)
 
+
+def create_service(kind: str) -> LibraryService:
+    """
+    Создает сервис библиотеки поверх хранилища указанного типа
+    """
+    from src.circulation import Circulation
+    from src.facets import FacetStore
+    from src.services import LibraryService
+
+    data_file = DATA_FILES[kind]
+    return LibraryService(
+        create_storage(kind, data_file),
+        search_index_path=f"{data_file}.search",
+        circulation=Circulation(f"{data_file}.loans"),
+        facet_store=FacetStore(f"{data_file}.facets"),
+    )
+
+
+def main() -> None:
     parser = setup_parser()
     args = parser.parse_args()
 
-    if args.command:
-        execute_command(args, library_service)
+    if args.command == "serve":
+        from src.server import serve
+        serve(create_service(args.storage), args.host, args.port)
+    elif args.command:
+        try:
+            with profiling.session(args.command, args.storage, args.stats, args.profile):
+                if args.command in LOCAL_COMMANDS:
+                    library_service = None
+                elif args.server:
+                    from src.client import RemoteLibraryService
+                    library_service = RemoteLibraryService(args.server)
+                else:
+                    with profiling.recorder.timer("service.create"):
+                        library_service = create_service(args.storage)
+                execute_command(args, library_service)
+        except BrokenPipeError:
+            # Читатель вывода закрыл канал раньше времени, например `list | head`
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+            sys.exit(1)
     else:
         parser.print_help()
 
@@ -1,4 +1,4 @@
-import uuid
+import sys
 from dataclasses import field, dataclass
 from enum import Enum
 
@@ -18,22 +18,36 @@ class BookStatus(Enum):
         """
         Преобразует строку в объект BookStatus.
         """
-        for status in BookStatus:
-            if status.value == value:
-                return status
-        raise ValueError("Неверный статус книги")
+        status = STATUS_BY_VALUE.get(value)
+        if status is None:
+            raise ValueError("Неверный статус книги")
+        return status
 
 
-@dataclass
+STATUS_BY_VALUE = {status.value: status for status in BookStatus}
+
+
+def new_book_id() -> str:
+    """
+    Создаёт id новой книги. Модуль uuid (13 мс импорта вместе с platform)
+    загружается при первом создании книги, а не при запуске клиента.
+    """
+    import uuid
+    return str(uuid.uuid4())
+
+
+@dataclass(slots=True)
 class Book:
     """
     Класс для представления книги.
+    Экземпляры не имеют __dict__, а одинаковые имена авторов
+    при чтении из хранилища разделяют одну строку.
     """
     title: str
     author: str
     year: int
     status: BookStatus = BookStatus.AVAILABLE
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = field(default_factory=new_book_id)
 
     def to_dict(self) -> dict:
         """
@@ -53,9 +67,95 @@ class Book:
         Создает объект книги из словаря.
         """
         return Book(
-            id=data["id"],
-            title=data["title"],
-            author=data["author"],
-            year=data["year"],
-            status=BookStatus(data["status"]),
+            data["title"],
+            sys.intern(data["author"]),
+            data["year"],
+            STATUS_BY_VALUE[data["status"]],
+            data["id"],
         )
+
+
+@dataclass
+class BookFilter:
+    """
+    Критерии отбора книг.
+    Название и автор сравниваются по подстроке без учёта регистра,
+    год — точно или в диапазоне [year_from, year_to].
+    """
+    title: str | None = None
+    author: str | None = None
+    year: int | None = None
+    year_from: int | None = None
+    year_to: int | None = None
+    status: BookStatus | None = None
+
+    def __post_init__(self) -> None:
+        self.title = self.title.lower() if self.title else None
+        self.author = self.author.lower() if self.author else None
+
+    def __call__(self, book: Book) -> bool:
+        """
+        Проверяет, соответствует ли книга всем заданным критериям
+        """
+        return (
+            (self.year is None or book.year == self.year)
+            and (self.year_from is None or book.year >= self.year_from)
+            and (self.year_to is None or book.year <= self.year_to)
+            and (self.status is None or book.status is self.status)
+            and (self.title is None or self.title in book.title.lower())
+            and (self.author is None or self.author in book.author.lower())
+        )
+
+
+class ChangeType(Enum):
+    """
+    Тип изменения каталога.
+    """
+    ADD = "add"
+    REMOVE = "remove"
+    STATUS = "status"
+
+
+@dataclass
+class Change:
+    """
+    Класс для представления одного изменения каталога.
+    """
+    type: ChangeType
+    book_id: str
+    book: Book | None = None
+    status: BookStatus | None = None
+
+    def apply(self, books: dict[str, Book]) -> None:
+        """
+        Применяет изменение к словарю книг по id.
+        """
+        if self.type is ChangeType.ADD:
+            books[self.book_id] = self.book
+        elif self.type is ChangeType.REMOVE:
+            books.pop(self.book_id, None)
+        elif self.book_id in books:
+            books[self.book_id].status = self.status
+
+    def to_dict(self) -> dict:
+        """
+        Преобразует изменение в словарь.
+        """
+        if self.type is ChangeType.ADD:
+            return {"op": self.type.value, "book": self.book.to_dict()}
+        if self.type is ChangeType.STATUS:
+            return {"op": self.type.value, "id": self.book_id, "status": str(self.status)}
+        return {"op": self.type.value, "id": self.book_id}
+
+    @staticmethod
+    def from_dict(data: dict) -> "Change":
+        """
+        Создает изменение из словаря.
+        """
+        change_type = ChangeType(data["op"])
+        if change_type is ChangeType.ADD:
+            book = Book.from_dict(data["book"])
+            return Change(change_type, book.id, book=book)
+        if change_type is ChangeType.STATUS:
+            return Change(change_type, data["id"], status=BookStatus(data["status"]))
+        return Change(change_type, data["id"])
@@ -0,0 +1,125 @@
+"""
+Постраничная выдача книг в заданном порядке.
+
+Порядок задаётся полем title, author или year, а с минусом впереди
+(например, "-year") — по убыванию. Книги с одинаковым значением поля
+упорядочиваются по id, поэтому порядок полный, и каждая страница
+начинается с книги, следующей за последней книгой предыдущей (keyset
+pagination). Курсор хранит порядок и ключ этой книги, а не номер страницы:
+добавления и удаления книг не сдвигают следующие страницы, а хранилищу
+с индексом по ключу не нужно пропускать книги предыдущих страниц.
+"""
+import base64
+import binascii
+import heapq
+import json
+from typing import Iterable, NamedTuple
+
+from src.models import Book
+
+ORDER_FIELDS = ["title", "author", "year"]
+PAGE_SIZE = 20
+
+SortKey = tuple[str | int, str]
+
+
+class Order(NamedTuple):
+    """
+    Порядок книг: поле и направление
+    """
+    field: str
+    descending: bool = False
+
+    def __str__(self) -> str:
+        return f"-{self.field}" if self.descending else self.field
+
+    @staticmethod
+    def parse(order_by: str) -> "Order":
+        """
+        Разбирает порядок вида "title" или "-title"
+        """
+        field = order_by.removeprefix("-")
+        if field not in ORDER_FIELDS:
+            raise ValueError(f"Неизвестный порядок: {order_by}. Допустимые поля: {', '.join(ORDER_FIELDS)}")
+        return Order(field, order_by.startswith("-"))
+
+    def key(self, book: Book) -> SortKey:
+        """
+        Возвращает ключ книги для сортировки по возрастанию.
+        Строки сравниваются без учёта регистра, как в индексах SQLite.
+        """
+        if self.field == "year":
+            return book.year, book.id
+        if self.field == "author":
+            return book.author.lower(), book.id
+        return book.title.lower(), book.id
+
+    def follows(self, key: SortKey, after: SortKey) -> bool:
+        """
+        Проверяет, идёт ли книга с ключом key после книги с ключом after
+        """
+        return key < after if self.descending else key > after
+
+
+class Page(NamedTuple):
+    """
+    Страница книг и курсор следующей страницы (None, если страница последняя)
+    """
+    books: list[Book]
+    cursor: str | None
+
+    @staticmethod
+    def of(books: list[Book], order: Order, limit: int | None) -> "Page":
+        """
+        Составляет страницу из первых limit книг. Чтобы без лишнего запроса
+        узнать, есть ли следующая страница, передаётся до limit + 1 книг.
+        """
+        if limit is None or len(books) <= limit:
+            return Page(books, None)
+        return Page(books[:limit], encode_cursor(order, order.key(books[limit - 1])))
+
+    def to_dict(self) -> dict:
+        return {"books": [book.to_dict() for book in self.books], "cursor": self.cursor}
+
+    @staticmethod
+    def from_dict(data: dict) -> "Page":
+        return Page([Book.from_dict(book) for book in data["books"]], data["cursor"])
+
+
+def encode_cursor(order: Order, key: SortKey) -> str:
+    """
+    Кодирует порядок и ключ последней книги страницы в строку для URL и командной строки
+    """
+    data = json.dumps([str(order), *key], ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, order: Order) -> SortKey:
+    """
+    Возвращает ключ книги из курсора, полученного для того же порядка
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        order_by, value, book_id = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(f"Неверный курсор страницы: {cursor}")
+    if order_by != str(order):
+        raise ValueError(f"Курсор получен для другого порядка: {order_by}")
+    value_type = int if order.field == "year" else str
+    if type(value) is not value_type or not isinstance(book_id, str):
+        raise ValueError(f"Неверный курсор страницы: {cursor}")
+    return value, book_id
+
+
+def first_books(books: Iterable[Book], order: Order, after: SortKey | None, limit: int | None) -> list[Book]:
+    """
+    Возвращает до limit книг, идущих в порядке order после ключа after.
+    Для хранилищ без индекса по ключу: книги отбираются одним проходом
+    кучей размера limit, без сортировки всех найденных книг.
+    """
+    if after is not None:
+        books = (book for book in books if order.follows(order.key(book), after))
+    if limit is None:
+        return sorted(books, key=order.key, reverse=order.descending)
+    select = heapq.nlargest if order.descending else heapq.nsmallest
+    return select(limit, books, key=order.key)
@@ -0,0 +1,189 @@
+"""
+Замеры фаз выполнения команд.
+
+По умолчанию активен пустой регистратор: его таймеры возвращают один
+и тот же пустой контекст, а счётчики ничего не делают. Точки замера стоят
+на уровне операций (чтение файла, разбор, построение каталога, вывод),
+а не отдельных книг, поэтому без --stats и --profile они не влияют
+на время работы.
+
+Отчёты дописываются строками JSON и сводятся командой
+
+    python -m src.profiling stats.jsonl
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+STATS_ENV = "LIBRARY_STATS"
+PROFILE_ENV = "LIBRARY_PROFILE"
+
+
+class NullRecorder:
+    """
+    Регистратор, который ничего не записывает
+    """
+
+    enabled = False
+    _timer = nullcontext()
+
+    def timer(self, name: str) -> ContextManager[None]:
+        return self._timer
+
+    def add(self, name: str, value: int = 1) -> None:
+        pass
+
+    def counted(self, items: Iterable[T], name: str) -> Iterable[T]:
+        return items
+
+
+class Recorder:
+    """
+    Регистратор времени фаз и счётчиков записей и байтов.
+    Вложенные фазы учитываются и в себе, и во внешней фазе.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.timers: dict[str, list] = {}
+        self.counters: dict[str, int] = {}
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            timer = self.timers.setdefault(name, [0, 0.0])
+            timer[0] += 1
+            timer[1] += time.perf_counter() - start
+
+    def add(self, name: str, value: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def counted(self, items: Iterable[T], name: str) -> Iterator[T]:
+        """
+        Пропускает элементы через себя и по окончании добавляет их число к счётчику
+        """
+        count = 0
+        try:
+            for count, item in enumerate(items, 1):
+                yield item
+        finally:
+            self.add(name, count)
+
+    def report(self) -> dict:
+        """
+        Возвращает замеры в виде словаря для JSON
+        """
+        return {
+            "timers": {
+                name: {"calls": calls, "seconds": round(seconds, 6)}
+                for name, (calls, seconds) in sorted(self.timers.items())
+            },
+            "counters": dict(sorted(self.counters.items())),
+        }
+
+
+recorder: NullRecorder | Recorder = NullRecorder()
+
+
+@contextmanager
+def session(command: str, storage: str, stats: str | None, profile: str | None) -> Iterator[None]:
+    """
+    Замеряет выполнение команды.
+    При stats дописывает отчёт строкой JSON в файл или выводит его в stderr,
+    если stats равен "-"; при profile сохраняет статистику cProfile в файл
+    для pstats или snakeviz. Без обоих параметров ничего не делает.
+    """
+    global recorder
+    if stats is None and profile is None:
+        yield
+        return
+
+    import cProfile
+    import json
+    from datetime import datetime, timezone
+
+    recorder = Recorder()
+    profiler = cProfile.Profile() if profile else None
+    started = datetime.now(timezone.utc)
+    try:
+        if profiler is not None:
+            profiler.enable()
+        with recorder.timer("command"):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile)
+        if stats is not None:
+            report = {
+                "command": command,
+                "storage": storage,
+                "started": started.isoformat(timespec="milliseconds"),
+                "pid": os.getpid(),
+                **recorder.report(),
+            }
+            line = json.dumps(report, ensure_ascii=False) + "\n"
+            if stats == "-":
+                sys.stderr.write(line)
+            else:
+                with open(stats, "a", encoding="utf-8") as file:
+                    file.write(line)
+        recorder = NullRecorder()
+
+
+def summarize(lines: Iterable[str]) -> dict:
+    """
+    Сводит отчёты нескольких запусков: для каждой команды число запусков,
+    суммарное и среднее время фаз и суммы счётчиков
+    """
+    import json
+
+    summary: dict[str, dict] = {}
+    for line in lines:
+        if not line.strip():
+            continue
+        report = json.loads(line)
+        entry = summary.setdefault(report["command"], {"runs": 0, "timers": {}, "counters": {}})
+        entry["runs"] += 1
+        for name, timer in report["timers"].items():
+            total = entry["timers"].setdefault(name, {"calls": 0, "seconds": 0.0})
+            total["calls"] += timer["calls"]
+            total["seconds"] += timer["seconds"]
+        for name, value in report["counters"].items():
+            entry["counters"][name] = entry["counters"].get(name, 0) + value
+
+    for entry in summary.values():
+        for timer in entry["timers"].values():
+            timer["seconds"] = round(timer["seconds"], 6)
+            timer["mean"] = round(timer["seconds"] / entry["runs"], 6)
+    return summary
+
+
+def main() -> None:
+    import json
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Сводка отчётов --stats по командам")
+    parser.add_argument("path", help="Файл с отчётами в формате JSONL")
+    args = parser.parse_args()
+
+    try:
+        with open(args.path, encoding="utf-8") as file:
+            summary = summarize(file)
+    except FileNotFoundError:
+        sys.exit(f"Файл {args.path} не найден")
+    except (ValueError, KeyError, TypeError) as e:
+        sys.exit(f"Неверный формат файла отчётов {args.path}: {e}")
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+import heapq
+import json
+import math
+import os
+import re
+import tempfile
+from bisect import bisect_left, insort
+from collections import Counter
+from pathlib import Path
+from typing import Hashable, Iterable, Iterator
+
+from src.models import Book
+
+INDEX_VERSION = 2
+TOKEN_RE = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """
+    Приводит текст к виду для поиска: casefold и замена «ё» на «е»
+    """
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    Разбивает текст на нормализованные слова
+    """
+    return TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(token: str) -> set[str]:
+    """
+    Возвращает множество триграмм слова
+    """
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+class SearchIndex:
+    """
+    Полнотекстовый индекс по названию и автору книги.
+
+    Слова хранятся в инвертированном индексе, а словарь слов — в триграммном
+    индексе, через который запрос расширяется до слов, содержащих его как
+    подстроку или похожих на него. Результаты ранжируются по BM25.
+
+    Для слов, которые уже встречались в запросах, книги дополнительно хранятся
+    упорядоченными по вкладу в релевантность, и поиск останавливается, как только
+    непросмотренные книги уже не могут попасть в первые limit результатов.
+
+    Сохранённый индекс дополняется журналом изменений (см. record): после записи
+    в хранилище индекс читается из файла и догоняется по журналу, а не строится заново.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    MIN_SIMILARITY = 0.4
+    # Слово запроса расширяется не больше чем до стольких слов словаря с наибольшими весами:
+    # короткое слово может входить в тысячи слов, и каждое добавило бы в поиск свой список книг
+    MAX_EXPANSIONS = 8
+
+    def __init__(self, books: Iterable[Book] = ()) -> None:
+        self._postings: dict[str, dict[str, int]] = {}
+        self._trigrams: dict[str, set[str]] = {}
+        self._lengths: dict[str, int] = {}
+        self._total_length = 0
+        # Оценка сверху числа слов в книге; при удалении не уменьшается
+        self._max_length = 0
+        # слово -> число вхождений -> отсортированные пары (длина книги, id)
+        self._impacts: dict[str, dict[int, list[tuple[int, str]]]] = {}
+        # Число изменений, прочитанных из журнала при загрузке
+        self.replayed = 0
+
+        for book in books:
+            self.add(book)
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, book: Book) -> None:
+        """
+        Добавляет книгу в индекс
+        """
+        tokens = tokenize(f"{book.title} {book.author}")
+        for token, count in Counter(tokens).items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                for trigram in trigrams(token):
+                    self._trigrams.setdefault(trigram, set()).add(token)
+            postings[book.id] = count
+            groups = self._impacts.get(token)
+            if groups is not None:
+                insort(groups.setdefault(count, []), (len(tokens), book.id))
+
+        self._lengths[book.id] = len(tokens)
+        self._total_length += len(tokens)
+        self._max_length = max(self._max_length, len(tokens))
+
+    def remove(self, book: Book) -> None:
+        """
+        Удаляет книгу из индекса
+        """
+        length = self._lengths.pop(book.id, None)
+        if length is None:
+            return
+
+        self._total_length -= length
+        for token in set(tokenize(f"{book.title} {book.author}")):
+            postings = self._postings[token]
+            count = postings.pop(book.id)
+            groups = self._impacts.get(token)
+            if groups is not None:
+                group = groups[count]
+                del group[bisect_left(group, (length, book.id))]
+                if not group:
+                    del groups[count]
+            if not postings:
+                del self._postings[token]
+                self._impacts.pop(token, None)
+                for trigram in trigrams(token):
+                    self._trigrams[trigram].discard(token)
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, float]]:
+        """
+        Возвращает до limit пар (id книги, релевантность) по убыванию релевантности.
+
+        Книги каждого слова перебираются по очереди по убыванию вклада,
+        а найденная книга сразу оценивается целиком.
+        Перебор заканчивается, когда худший из limit результатов не меньше
+        оценки сверху для любой непросмотренной книги.
+        """
+        if not self._lengths or limit <= 0:
+            return []
+
+        weights: dict[str, float] = {}
+        for term in set(tokenize(query)):
+            for token, weight in self._expand(term):
+                weights[token] = weights.get(token, 0.0) + weight
+
+        average_length = self._total_length / len(self._lengths) or 1
+        terms = []
+        for token, weight in weights.items():
+            postings = self._postings[token]
+            idf = math.log(1 + (len(self._lengths) - len(postings) + 0.5) / (len(postings) + 0.5))
+            terms.append((weight * idf, postings, self._iter_impacts(token, average_length)))
+
+        top: list[tuple[float, str]] = []
+        seen: set[str] = set()
+        bounds = [weight * (self.K1 + 1) for weight, _, _ in terms]
+        active = set(range(len(terms)))
+        while active:
+            for i in list(active):
+                item = next(terms[i][2], None)
+                if item is None:
+                    bounds[i] = 0.0
+                    active.discard(i)
+                    continue
+
+                impact, book_id = item
+                bounds[i] = -impact * terms[i][0]
+                if book_id in seen:
+                    continue
+                seen.add(book_id)
+
+                # В исчерпанных списках книги нет: иначе она уже встретилась бы
+                length = self._lengths[book_id]
+                score = sum(
+                    terms[j][0] * self._impact(terms[j][1][book_id], length, average_length)
+                    for j in active
+                    if book_id in terms[j][1]
+                )
+                if len(top) < limit:
+                    heapq.heappush(top, (score, book_id))
+                elif score > top[0][0]:
+                    heapq.heapreplace(top, (score, book_id))
+
+            # Книга содержит не больше max_length разных слов, поэтому непросмотренная
+            # книга набирает не больше суммы стольких наибольших текущих оценок
+            if len(top) == limit and top[0][0] >= max(bounds):
+                if top[0][0] >= sum(heapq.nlargest(self._max_length, bounds)):
+                    break
+
+        return [(book_id, score) for score, book_id in sorted(top, reverse=True)]
+
+    def _impact(self, count: int, length: int, average_length: float) -> float:
+        """
+        Вклад слова в релевантность книги без учёта idf
+        """
+        norm = self.K1 * (1 - self.B + self.B * length / average_length)
+        return count * (self.K1 + 1) / (count + norm)
+
+    def _iter_impacts(self, token: str, average_length: float) -> Iterator[tuple[float, str]]:
+        """
+        Перебирает книги со словом по убыванию вклада, возвращая пары (-вклад, id).
+        При равном числе вхождений вклад убывает с длиной книги при любой средней длине,
+        поэтому книги хранятся по группам числа вхождений, отсортированными по длине,
+        а группы сливаются при переборе.
+        """
+        groups = self._impacts.get(token)
+        if groups is None:
+            # Группы публикуются только целиком: параллельные читатели не видят неполных списков
+            groups = {}
+            for book_id, count in self._postings[token].items():
+                groups.setdefault(count, []).append((self._lengths[book_id], book_id))
+            for group in groups.values():
+                group.sort()
+            self._impacts[token] = groups
+
+        return heapq.merge(
+            *(self._iter_group(count, group, average_length) for count, group in groups.items())
+        )
+
+    def _iter_group(
+        self, count: int, group: list[tuple[int, str]], average_length: float
+    ) -> Iterator[tuple[float, str]]:
+        for length, book_id in group:
+            yield -self._impact(count, length, average_length), book_id
+
+    def _expand(self, term: str) -> list[tuple[str, float]]:
+        """
+        Расширяет слово запроса до MAX_EXPANSIONS слов словаря с весами:
+        точное совпадение, вхождение подстрокой, затем похожие слова
+        """
+        if len(term) < 3:
+            return [(term, 1.0)] if term in self._postings else []
+
+        term_trigrams = trigrams(term)
+        candidate_sets = sorted(
+            (self._trigrams.get(trigram, set()) for trigram in term_trigrams), key=len
+        )
+        matches = [
+            (token, 1.0 if token == term else len(term) / len(token))
+            for token in candidate_sets[0].intersection(*candidate_sets[1:])
+            if term in token
+        ]
+        if matches:
+            return self._strongest(matches)
+
+        shared = Counter(
+            token for trigram in term_trigrams for token in self._trigrams.get(trigram, ())
+        )
+        similar = []
+        for token, count in shared.items():
+            similarity = count / (len(term_trigrams) + len(trigrams(token)) - count)
+            if similarity >= self.MIN_SIMILARITY:
+                similar.append((token, similarity))
+        return self._strongest(similar)
+
+    def _strongest(self, expansions: list[tuple[str, float]]) -> list[tuple[str, float]]:
+        # Слова с равным весом упорядочиваются по алфавиту, чтобы выдача не зависела от порядка множеств
+        return sorted(expansions, key=lambda item: (-item[1], item[0]))[:self.MAX_EXPANSIONS]
+
+    def save(self, path: Path, stamp: Hashable) -> None:
+        """
+        Сохраняет индекс в JSON-файл вместе с отметкой состояния данных.
+        Книги в файле пронумерованы, а списки вхождений хранятся как пары (номер, количество).
+        """
+        numbers = {book_id: number for number, book_id in enumerate(self._lengths)}
+        data = {
+            "version": INDEX_VERSION,
+            "stamp": stamp,
+            "ids": list(self._lengths),
+            "lengths": list(self._lengths.values()),
+            "postings": {
+                token: [value for book_id, count in postings.items() for value in (numbers[book_id], count)]
+                for token, postings in self._postings.items()
+            },
+        }
+        # У каждого писателя свой временный файл, поэтому параллельные сохранения не смешиваются
+        temp_name = None
+        try:
+            fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temp_name, path)
+            # Журнал относился к прежнему файлу индекса
+            journal_path(path).unlink(missing_ok=True)
+        except IOError as e:
+            if temp_name is not None:
+                Path(temp_name).unlink(missing_ok=True)
+            raise RuntimeError(f"Ошибка записи в файл {path}: {e}")
+
+    @staticmethod
+    def load(path: Path, stamp: Hashable) -> "SearchIndex | None":
+        """
+        Читает индекс из файла.
+        Возвращает None, если файла нет, он повреждён или построен для других данных.
+        """
+        try:
+            with path.open("r", encoding="utf-8") as file:
+                data = json.load(file)
+            # Отметка сравнивается в том виде, в каком она прошла через JSON
+            if data["version"] != INDEX_VERSION:
+                return None
+
+            ids = data["ids"]
+            stamp = json.loads(json.dumps(stamp))
+            entries = [] if data["stamp"] == stamp else _journal_entries(path, data["stamp"], stamp)
+            if entries is None:
+                return None
+            index = SearchIndex()
+            index._lengths = dict(zip(ids, data["lengths"]))
+            for token, values in data["postings"].items():
+                index._postings[token] = dict(zip(map(ids.__getitem__, values[::2]), values[1::2]))
+                for trigram in trigrams(token):
+                    index._trigrams.setdefault(trigram, set()).add(token)
+            index._total_length = sum(index._lengths.values())
+            index._max_length = max(index._lengths.values(), default=0)
+            for entry in entries:
+                for added, book_id, title, author in entry["changes"]:
+                    book = Book(title, author, 0, id=book_id)
+                    if added:
+                        index.add(book)
+                    else:
+                        index.remove(book)
+                    index.replayed += 1
+        except (IOError, UnicodeDecodeError, ValueError, KeyError, TypeError, IndexError):
+            return None
+        return index
+
+    @staticmethod
+    def record(path: Path, before: Hashable, after: Hashable, changes: list[tuple[bool, Book]]) -> None:
+        """
+        Дописывает в журнал сохранённого индекса добавления (True) и удаления (False)
+        книг одной записи в хранилище, переведшей его из отметки before в after.
+        Запись без изменений текста (например, смена статуса) тоже попадает
+        в журнал: по отметкам записей load проверяет, что журнал непрерывен.
+        """
+        entry = {
+            "before": before,
+            "after": after,
+            "changes": [[added, book.id, book.title, book.author] for added, book in changes],
+        }
+        try:
+            with journal_path(path).open("a", encoding="utf-8") as file:
+                file.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+        except IOError as e:
+            raise RuntimeError(f"Ошибка записи в файл {journal_path(path)}: {e}")
+
+
+def journal_path(path: Path) -> Path:
+    return path.with_name(path.name + ".changes")
+
+
+def _journal_entries(path: Path, start: Hashable, stamp: Hashable) -> list[dict] | None:
+    """
+    Возвращает записи журнала, переводящие индекс из отметки start в stamp,
+    или None, если такой непрерывной цепочки нет: хранилище менялось
+    в обход сервиса или журнал неполон
+    """
+    entries = []
+    current = start
+    try:
+        with journal_path(path).open("r", encoding="utf-8") as file:
+            for line in file:
+                if current == stamp:
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # Недописанная строка параллельной записи
+                    break
+                if entry["before"] == current:
+                    entries.append(entry)
+                    current = entry["after"]
+    except FileNotFoundError:
+        return None
+    return entries if current == stamp else None
@@ -0,0 +1,208 @@
+import json
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from src.models import Book, Change
+from src.services import LibraryService
+
+SEARCH_PARAMS = {
+    "title": str,
+    "author": str,
+    "year": int,
+    "year_from": int,
+    "year_to": int,
+    "status": str,
+}
+
+
+def search_params(query: dict) -> dict:
+    """
+    Возвращает критерии поиска из параметров запроса
+    """
+    return {name: convert(query[name][0]) for name, convert in SEARCH_PARAMS.items() if name in query}
+
+
+class LibraryRequestHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик HTTP-запросов к библиотеке.
+
+    GET    /books?title=&author=&year=&year_from=&year_to=&status=&order_by=
+    GET    /page?order_by=&cursor=&limit=&title=&author=&year=&year_from=&year_to=&status=
+    GET    /find?query=&limit=
+    GET    /books/<id>/history?limit=
+    GET    /overdue?limit=
+    GET    /top?days=&limit=
+    GET    /duplicates?title=&author=&year=
+    GET    /dedupe?fuzzy=&threshold=
+    GET    /facets?year_step=&authors=
+    POST   /books            {"title": ..., "author": ..., "year": ..., "merge": ...}
+    PATCH  /books/<id>       {"status": ..., "borrower": ..., "days": ...}
+    DELETE /books/<id>
+    POST   /changes          [{"op": ...}, ...]
+    POST   /compact
+    POST   /migrate          {"books": [...]}
+    """
+
+    protocol_version = "HTTP/1.1"
+    library_service: LibraryService
+    lock: threading.Lock
+
+    def do_GET(self) -> None:
+        self._dispatch(self._get)
+
+    def do_POST(self) -> None:
+        self._dispatch(self._post)
+
+    def do_PATCH(self) -> None:
+        self._dispatch(self._patch)
+
+    def do_DELETE(self) -> None:
+        self._dispatch(self._delete)
+
+    def log_message(self, format: str, *args) -> None:
+        """
+        Отключает журнал запросов в stderr
+        """
+
+    def _get(self, path: list[str], query: dict) -> object:
+        if path == ["books"]:
+            books = self.library_service.search_books(
+                **search_params(query), order_by=query.get("order_by", [None])[0]
+            )
+            return [book.to_dict() for book in books]
+        if path == ["page"]:
+            limit = int(query["limit"][0]) if "limit" in query else None
+            page = self.library_service.page_books(
+                query.get("order_by", ["title"])[0], query.get("cursor", [None])[0], limit, **search_params(query)
+            )
+            return page.to_dict()
+        if path == ["find"]:
+            books = self.library_service.find_books(
+                query.get("query", [""])[0], int(query.get("limit", ["10"])[0])
+            )
+            return [book.to_dict() for book in books]
+        if len(path) == 3 and path[0] == "books" and path[2] == "history":
+            limit = int(query["limit"][0]) if "limit" in query else None
+            return [event.to_dict() for event in self.library_service.book_history(path[1], limit)]
+        if path == ["overdue"]:
+            limit = int(query["limit"][0]) if "limit" in query else None
+            loans = self.library_service.overdue_loans(limit)
+            return [{"book": book.to_dict(), "loan": loan.to_dict()} for book, loan in loans]
+        if path == ["top"]:
+            days = int(query["days"][0]) if "days" in query else None
+            books = self.library_service.top_books(days, int(query.get("limit", ["10"])[0]))
+            return [{"book": book.to_dict(), "count": count} for book, count in books]
+        if path == ["duplicates"]:
+            books = self.library_service.find_duplicates(
+                query["title"][0], query["author"][0], int(query["year"][0])
+            )
+            return [book.to_dict() for book in books]
+        if path == ["dedupe"]:
+            groups = self.library_service.duplicate_groups(
+                query.get("fuzzy", [""])[0] == "1", float(query.get("threshold", ["0.8"])[0])
+            )
+            return [[book.to_dict() for book in group] for group in groups]
+        if path == ["facets"]:
+            authors = int(query["authors"][0]) if "authors" in query else None
+            facets = self.library_service.facets(int(query.get("year_step", ["10"])[0]), authors)
+            return facets.to_dict()
+        return None
+
+    def _post(self, path: list[str], query: dict) -> object:
+        body = self._read_body()
+        if path == ["books"]:
+            book = self.library_service.add_book(
+                body["title"], body["author"], int(body["year"]), bool(body.get("merge"))
+            )
+            return book.to_dict()
+        if path == ["changes"]:
+            count = self.library_service.apply_changes(Change.from_dict(data) for data in body)
+            return {"count": count}
+        if path == ["compact"]:
+            self.library_service.compact_storage()
+            return {}
+        if path == ["migrate"]:
+            books = [Book.from_dict(data) for data in body["books"]]
+            return {"count": self.library_service.replace_books(books)}
+        return None
+
+    def _patch(self, path: list[str], query: dict) -> object:
+        if len(path) == 2 and path[0] == "books":
+            body = self._read_body()
+            self.library_service.update_book_status(
+                path[1], body["status"], body.get("borrower"), body.get("days")
+            )
+            return {}
+        return None
+
+    def _delete(self, path: list[str], query: dict) -> object:
+        if len(path) == 2 and path[0] == "books":
+            self.library_service.remove_book(path[1])
+            return {}
+        return None
+
+    def _dispatch(self, handler) -> None:
+        """
+        Вызывает обработчик метода и отправляет его результат в формате JSON.
+        Ошибки данных превращаются в ответ 400, RuntimeError — в ответ 500.
+        """
+        url = urlsplit(self.path)
+        path = [unquote(part) for part in url.path.split("/") if part]
+        try:
+            with self.lock:
+                result = handler(path, parse_qs(url.query))
+            if result is None:
+                self._send(HTTPStatus.NOT_FOUND, {"error": "Неизвестный запрос"})
+            else:
+                self._send(HTTPStatus.OK, result)
+        except (ValueError, KeyError, TypeError) as e:
+            message = str(e) if isinstance(e, ValueError) else f"Неверный запрос: {e}"
+            self._send(HTTPStatus.BAD_REQUEST, {"error": message})
+        except RuntimeError as e:
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)})
+
+    def _read_body(self) -> object:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send(self, status: HTTPStatus, data: object) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(library_service: LibraryService, host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Создает HTTP-сервер, обслуживающий запросы к переданному сервису.
+    Каждое соединение обслуживается в своём потоке, чтобы постоянные
+    соединения клиентов не блокировали друг друга, а обращения к сервису
+    выполняются по одному под общей блокировкой.
+    """
+    handler = type(
+        "Handler",
+        (LibraryRequestHandler,),
+        {"library_service": library_service, "lock": threading.Lock()},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(library_service: LibraryService, host: str, port: int) -> None:
+    """
+    Загружает каталог и обслуживает запросы, пока процесс не будет остановлен
+    """
+    library_service.preload()
+    server = create_server(library_service, host, port)
+    print(f"Сервер библиотеки запущен на http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
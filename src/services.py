@@ -1,5 +1,33 @@
-from src.storage import Storage
-from src.models import Book, BookStatus
+from __future__ import annotations
+
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from dataclasses import replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Hashable, Iterable, Iterator
+
+from src import profiling
+from src.storage import BookStorage, IndexedStorage, Storage
+from src.models import Book, BookFilter, BookStatus, Change, ChangeType
+
+# Каталог в памяти, полнотекстовый индекс, журнал выдач и счётчики по срезам
+# нужны не каждой команде и импортируются при первом обращении к ним
+if TYPE_CHECKING:
+    from src.catalogue import Catalogue
+    from src.circulation import Circulation, Loan, LoanEvent
+    from src.facets import FacetCounts, FacetStore
+    from src.paging import Order, Page, SortKey
+    from src.search import SearchIndex
+
+# Пакеты крупнее этого не переносятся в счётчики по срезам поштучно:
+# счётчики помечаются устаревшими и пересчитываются одним проходом при запросе
+FACETS_DELTA_LIMIT = 10_000
+# Пакеты крупнее этого не вставляются в порядки книг каталога поштучно:
+# порядки отбрасываются и сортируются заново при следующем запросе страницы
+ORDERS_UPDATE_LIMIT = 10_000
+# Пакеты крупнее этого не записываются в журнал сохранённого полнотекстового индекса:
+# индекс строится заново при следующем поиске. Журнал длиннее этого сворачивается в файл индекса.
+SEARCH_JOURNAL_LIMIT = 10_000
 
 
 class LibraryService:
@@ -7,72 +35,645 @@ class LibraryService:
     Класс, предоставляющий методы для работы с библиотекой
     """
 
-    def __init__(self, storage: Storage) -> None:
+    def __init__(
+        self,
+        storage: BookStorage,
+        search_index_path: str | None = None,
+        circulation: Circulation | None = None,
+        facet_store: FacetStore | None = None,
+    ) -> None:
+        """
+        Принимает хранилище, необязательный путь к файлу полнотекстового индекса,
+        необязательный журнал выдач и необязательное хранилище счётчиков по срезам.
+        Без пути индекс строится в памяти при первом поиске.
+        С журналом выдач каждая смена статуса записывается в него как выдача или возврат.
+        Со счётчиками по срезам каждое изменение переносится и в них,
+        а без них сводка facets() считается по всем книгам.
+
+        Для файловых хранилищ каталог загружается в память и индексируется,
+        а хранилища с собственными индексами (IndexedStorage) выполняют
+        поиск и изменения сами.
+        """
         self.storage = storage
+        self.search_index_path = Path(search_index_path) if search_index_path else None
+        self.circulation = circulation
+        self.facet_store = facet_store
+        self._indexed = isinstance(storage, IndexedStorage)
+        self._catalogue: Catalogue | None = None
+        self._search_index: SearchIndex | None = None
+        # Отметка хранилища, для которой загружены каталог и полнотекстовый индекс
+        self._stamp: Hashable = None
 
-    def add_book(self, title: str, author: str, year: int) -> None:
+    def add_book(self, title: str, author: str, year: int, merge_duplicates: bool = False) -> Book:
         """
-        Добавляет новую книгу в библиотеку
+        Добавляет новую книгу в библиотеку и возвращает её.
+        С merge_duplicates книга не добавляется, если в библиотеке уже есть
+        книга с тем же названием, автором и годом, и возвращается первая из них.
         """
-        books = self.storage.load_books()
         new_book = Book(title=title, author=author, year=year)
-        books.append(new_book)
-        self.storage.save_books(books)
+        with self._writing():
+            if merge_duplicates:
+                duplicates = self._find_duplicates(title, author, year)
+                if duplicates:
+                    return duplicates[0]
+            self._commit([Change(ChangeType.ADD, new_book.id, book=new_book)])
+        return new_book
+
+    def add_books(self, books: Iterable[Book]) -> int:
+        """
+        Добавляет книги одним сохранением и возвращает их количество
+        """
+        return self.apply_changes(Change(ChangeType.ADD, book.id, book=book) for book in books)
+
+    def remove_books(self, book_ids: Iterable[str]) -> int:
+        """
+        Удаляет книги по id одним сохранением и возвращает их количество.
+        Если хотя бы одна книга не найдена, ничего не удаляется.
+        """
+        return self.apply_changes(Change(ChangeType.REMOVE, book_id) for book_id in book_ids)
+
+    def update_statuses(self, updates: Iterable[tuple[str, str]]) -> int:
+        """
+        Обновляет статусы книг по парам (id, статус) одним сохранением
+        и возвращает их количество.
+        Если хотя бы одна книга не найдена, ничего не меняется.
+        """
+        return self.apply_changes(
+            Change(ChangeType.STATUS, book_id, status=BookStatus.from_str(status))
+            for book_id, status in updates
+        )
+
+    def apply_changes(self, changes: Iterable[Change]) -> int:
+        """
+        Проверяет и применяет пакет изменений одним сохранением
+        и возвращает число изменений.
+        Изменения применяются по порядку, поэтому пакет может удалить
+        или изменить книгу, добавленную в нём же.
+        """
+        changes = list(changes)
+        if not changes:
+            return 0
+
+        with self._writing():
+            added: set[str] = set()
+            removed: set[str] = set()
+            for change in changes:
+                if change.type is ChangeType.ADD:
+                    added.add(change.book_id)
+                    removed.discard(change.book_id)
+                    continue
+                if change.book_id not in added and (
+                    change.book_id in removed or self._get_book(change.book_id) is None
+                ):
+                    raise ValueError(f"Книга не найдена: {change.book_id}")
+                if change.type is ChangeType.REMOVE:
+                    removed.add(change.book_id)
+                    added.discard(change.book_id)
+
+            self._commit(changes)
+        return len(changes)
 
     def remove_book(self, book_id: str) -> None:
         """
         Удаляет книгу по её id
         """
-        books = self.storage.load_books()
-        filtered_books = [book for book in books if book.id != book_id]
-
-        if len(books) == len(filtered_books):
-            raise ValueError("Книга не найдена")
+        with self._writing():
+            if self._get_book(book_id) is None:
+                raise ValueError("Книга не найдена")
 
-        self.storage.save_books(filtered_books)
+            self._commit([Change(ChangeType.REMOVE, book_id)])
 
     def search_books(
         self,
         title: str | None = None,
         author: str | None = None,
         year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: str | None = None,
+        order_by: str | None = None,
     ) -> list[Book]:
         """
-        Возвращает список книг, отфильтрованных по названию, автору и/или году издания
+        Возвращает список книг, отфильтрованных по названию, автору, году издания,
+        диапазону лет и/или статусу, в порядке добавления
+        или в порядке order_by (см. page_books)
+        """
+        if order_by is not None:
+            return self.page_books(order_by, None, None, title, author, year, year_from, year_to, status).books
+
+        book_status = BookStatus.from_str(status) if status else None
+        self._refresh()
+        if self._indexed:
+            with profiling.recorder.timer("service.search"):
+                books = self.storage.search_books(title, author, year, year_from, year_to, book_status)
+        else:
+            catalogue = self._get_catalogue()
+            with profiling.recorder.timer("service.search"):
+                books = catalogue.search(title, author, year, year_from, year_to, book_status)
+        profiling.recorder.add("service.results", len(books))
+        return books
+
+    def page_books(
+        self,
+        order_by: str = "title",
+        cursor: str | None = None,
+        limit: int | None = 20,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: str | None = None,
+    ) -> Page:
+        """
+        Возвращает страницу из limit найденных книг в порядке order_by
+        ("title", "author", "year", с минусом впереди — по убыванию)
+        и курсор следующей страницы. Курсор передаётся в следующий вызов
+        с тем же порядком; страница начинается сразу после последней книги
+        предыдущей, поэтому добавления и удаления книг её не сдвигают.
+        С limit=None возвращаются все книги после курсора.
         """
-        books = self.storage.load_books()
+        from src.paging import Order, Page, decode_cursor
+
+        if limit is not None and limit < 1:
+            raise ValueError("Размер страницы должен быть положительным")
+        order = Order.parse(order_by)
+        after = decode_cursor(cursor, order) if cursor else None
+        book_filter = BookFilter(
+            title=title,
+            author=author,
+            year=year,
+            year_from=year_from,
+            year_to=year_to,
+            status=BookStatus.from_str(status) if status else None,
+        )
+        self._refresh()
+        with profiling.recorder.timer("service.page"):
+            # Лишняя книга показывает, есть ли следующая страница
+            books = self._ordered_books(order, after, None if limit is None else limit + 1, book_filter)
+        page = Page.of(books, order, limit)
+        profiling.recorder.add("service.results", len(page.books))
+        return page
 
-        def matches(book: Book) -> bool:
-            """
-            Проверяет, соответствует ли книга всем переданным критериям.
-            """
-            return all(
-                [
-                    title.lower() in book.title.lower() if title else True,
-                    author.lower() in book.author.lower() if author else True,
-                    year == book.year if year else True,
-                ]
+    def iter_search_books(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: str | None = None,
+    ) -> Iterator[Book]:
+        """
+        Возвращает итератор по найденным книгам.
+        Если каталог ещё не загружен, книги читаются из хранилища потоком
+        и фильтруются по одной, не занимая память под весь каталог.
+        """
+        self._refresh()
+        if self._indexed or self._catalogue is not None:
+            return iter(self.search_books(title, author, year, year_from, year_to, status))
+
+        book_filter = BookFilter(
+            title=title,
+            author=author,
+            year=year,
+            year_from=year_from,
+            year_to=year_to,
+            status=BookStatus.from_str(status) if status else None,
+        )
+        return filter(book_filter, self.storage.iter_books())
+
+    def find_books(self, query: str, limit: int = 10) -> list[Book]:
+        """
+        Полнотекстовый поиск по названию и автору.
+        Возвращает до limit книг, упорядоченных по релевантности.
+        """
+        self._refresh()
+        search_index = self._get_search_index()
+        with profiling.recorder.timer("search_index.query"):
+            results = search_index.search(query, limit)
+        books = (self._get_book(book_id) for book_id, _ in results)
+        return [book for book in books if book is not None]
+
+    def find_duplicates(self, title: str, author: str, year: int) -> list[Book]:
+        """
+        Возвращает книги с теми же названием, автором и годом без учёта регистра,
+        пунктуации и лишних пробелов
+        """
+        self._refresh()
+        return self._find_duplicates(title, author, year)
+
+    def duplicate_groups(self, fuzzy: bool = False, threshold: float = 0.8) -> list[list[Book]]:
+        """
+        Возвращает группы книг-дубликатов, в каждой книги в порядке добавления.
+        С fuzzy в группы объединяются и книги одного года с похожими
+        названиями и авторами (см. src.dedupe.duplicate_groups).
+        """
+        from src.dedupe import duplicate_groups
+
+        self._refresh()
+        books = self._catalogue if self._catalogue is not None else self.storage.iter_books()
+        with profiling.recorder.timer("service.dedupe"):
+            return duplicate_groups(books, fuzzy, threshold)
+
+    def facets(self, year_step: int = 10, authors: int | None = 10) -> FacetCounts:
+        """
+        Возвращает число книг по статусам, годам, диапазонам лет длиной year_step
+        и до authors авторов с наибольшим числом книг (None — все авторы).
+        Счётчики читаются из хранилища счётчиков, а если оно устарело,
+        пересчитываются одним проходом по книгам и сохраняются.
+        """
+        from src.facets import AUTHOR, STATUS, YEAR, FacetCounts, count_facets
+
+        self._refresh()
+        recorder = profiling.recorder
+
+        def books() -> Iterable[Book]:
+            # Книги читаются только для пересчёта: у журнала чтение — это воспроизведение всех записей
+            return self._catalogue if self._catalogue is not None else self.storage.iter_books()
+
+        if self.facet_store is None:
+            with recorder.timer("facets.count"):
+                counts = count_facets(books())
+            by_facet: dict[str, dict] = {STATUS: {}, YEAR: {}, AUTHOR: {}}
+            for (facet, key), count in counts.items():
+                by_facet[facet][key] = count
+            # Тот же порядок, что и у счётчиков из хранилища: по убыванию числа книг, затем по имени
+            author_counts = dict(sorted(by_facet[AUTHOR].items(), key=lambda item: (-item[1], item[0]))[:authors])
+            return FacetCounts.from_counts(by_facet[STATUS], by_facet[YEAR], author_counts, year_step)
+
+        stamp = self.storage.stamp()
+        if not self.facet_store.is_current(stamp):
+            with recorder.timer("facets.count"):
+                counts = count_facets(books())
+            with recorder.timer("facets.save"):
+                self.facet_store.replace(counts, stamp)
+        with recorder.timer("facets.read"):
+            return FacetCounts.from_counts(
+                self.facet_store.counts(STATUS),
+                self.facet_store.counts(YEAR),
+                self.facet_store.counts(AUTHOR, authors),
+                year_step,
             )
 
-        return list(filter(matches, books))
+    def get_all_books(self, order_by: str | None = None) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке добавления или в порядке order_by
+        """
+        if order_by is not None:
+            return self.page_books(order_by, None, None).books
+
+        self._refresh()
+        if self._indexed:
+            return self.storage.load_books()
+        return self._get_catalogue().books()
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Возвращает итератор по всем книгам.
+        Если каталог ещё не загружен, книги читаются из хранилища потоком.
+        """
+        self._refresh()
+        if self._catalogue is not None:
+            return iter(self._catalogue.books())
+        return self.storage.iter_books()
+
+    def preload(self) -> None:
+        """
+        Заранее загружает каталог в память, чтобы первый запрос не ждал чтения хранилища
+        """
+        if not self._indexed:
+            self._get_catalogue()
+
+    def compact_storage(self) -> None:
+        """
+        Сворачивает журнал изменений хранилища в снимок
+        """
+        compact = getattr(self.storage, "compact", None)
+        if compact is None:
+            raise ValueError("Хранилище не поддерживает компактирование")
+        with self._writing():
+            old_stamp = self.storage.stamp()
+            compact()
+            # Содержимое не изменилось, меняется только его представление
+            self._stamp = self.storage.stamp()
+            if self.facet_store is not None:
+                self.facet_store.restamp(old_stamp, self._stamp)
 
-    def get_all_books(self) -> list[Book]:
+    def migrate_from_json(self, file_path: str) -> int:
         """
-        Возвращает список всех книг
+        Заменяет содержимое хранилища книгами из JSON-файла
+        и возвращает их количество
         """
-        return self.storage.load_books()
+        if not Path(file_path).exists():
+            raise ValueError(f"Файл {file_path} не найден")
+
+        return self.replace_books(Storage(file_path).load_books())
 
-    def update_book_status(self, book_id: str, status: str) -> None:
+    def replace_books(self, books: list[Book]) -> int:
+        """
+        Заменяет содержимое хранилища переданными книгами и возвращает их количество
+        """
+        with self._writing():
+            self.storage.save_books(books)
+            self._catalogue = None
+            self._search_index = None
+        return len(books)
+
+    def update_book_status(
+        self,
+        book_id: str,
+        status: str,
+        borrower: str | None = None,
+        days: int | None = None,
+    ) -> None:
         """
-        Обновляет статус книги по её id
+        Обновляет статус книги по её id.
+        Выдача записывается в журнал выдач с читателем и сроком в днях,
+        если они переданы.
 
         :status: ("в наличии", "выдана")
         """
-        books = self.storage.load_books()
-        for book in books:
-            if book.id == book_id:
-                book.status = BookStatus.from_str(status)
-                self.storage.save_books(books)
-                break
+        book_status = BookStatus.from_str(status)
+        with self._writing():
+            if self._get_book(book_id) is None:
+                raise ValueError("Книга не найдена")
+
+            self._commit([Change(ChangeType.STATUS, book_id, status=book_status)], borrower, days)
+
+    def book_history(self, book_id: str, limit: int | None = None) -> list[LoanEvent]:
+        """
+        Возвращает выдачи и возвраты книги, начиная с последнего события
+        """
+        return self._get_circulation().history(book_id, limit)
+
+    def overdue_loans(self, limit: int | None = None) -> list[tuple[Book, Loan]]:
+        """
+        Возвращает книги с просроченными выдачами, начиная с самой давней.
+        Выдачи удалённых книг пропускаются.
+        """
+        loans = self._get_circulation().overdue(limit=limit)
+        self._refresh()
+        pairs = ((self._get_book(loan.book_id), loan) for loan in loans)
+        return [(book, loan) for book, loan in pairs if book is not None]
+
+    def top_books(self, days: int | None = None, limit: int = 10) -> list[tuple[Book, int]]:
+        """
+        Возвращает самые часто выдаваемые книги и число их выдач
+        за последние days дней или за всё время
+        """
+        from src.circulation import DAY
+
+        circulation = self._get_circulation()
+        since = None if days is None else int(circulation.clock()) - days * DAY
+        counts = circulation.top(since, limit)
+        self._refresh()
+        pairs = ((self._get_book(book_id), count) for book_id, count in counts)
+        return [(book, count) for book, count in pairs if book is not None]
+
+    def _get_book(self, book_id: str) -> Book | None:
+        """
+        Возвращает книгу по её id или None
+        """
+        if self._indexed:
+            return self.storage.get_book(book_id)
+        return self._get_catalogue().get(book_id)
+
+    def _ordered_books(
+        self, order: Order, after: SortKey | None, limit: int | None, book_filter: BookFilter
+    ) -> list[Book]:
+        """
+        Возвращает до limit книг, удовлетворяющих фильтру и идущих в порядке
+        order после ключа after. Загруженный каталог и хранилища с методом
+        page_books находят начало страницы по порядку книг или индексу;
+        остальные хранилища и чтение потоком, пока каталог не загружен,
+        отбирают книги одним проходом кучей размера limit.
+        """
+        from src.paging import first_books
+
+        page_books = getattr(self.storage, "page_books", None)
+        if page_books is not None:
+            return page_books(order, after, limit, book_filter)
+        if self._indexed:
+            books = self.storage.search_books(**vars(book_filter))
+        elif self._catalogue is not None:
+            return self._catalogue.page(order, after, limit, book_filter)
         else:
-            raise ValueError("Книга не найдена")
+            books = filter(book_filter, self.storage.iter_books())
+        return first_books(books, order, after, limit)
+
+    def _find_duplicates(self, title: str, author: str, year: int) -> list[Book]:
+        """
+        Ищет дубликаты по индексу отпечатков каталога, а в хранилищах
+        с собственными индексами — среди книг того же года
+        """
+        if not self._indexed:
+            return self._get_catalogue().find_duplicates(title, author, year)
+
+        from src.dedupe import book_fingerprint, fingerprint
+
+        key = fingerprint(title, author, year)
+        return [book for book in self.storage.search_books(year=year) if book_fingerprint(book) == key]
+
+    def _get_circulation(self) -> Circulation:
+        if self.circulation is None:
+            raise ValueError("Журнал выдач не подключён")
+        return self.circulation
+
+    def _get_catalogue(self) -> Catalogue:
+        """
+        Возвращает каталог, при первом обращении загружая его из хранилища
+        """
+        if self._catalogue is None:
+            from src.catalogue import Catalogue
+
+            self._mark_loaded()
+            with profiling.recorder.timer("catalogue.load"):
+                books = self.storage.load_books()
+            with profiling.recorder.timer("catalogue.index"):
+                self._catalogue = Catalogue(books)
+        return self._catalogue
+
+    def _get_search_index(self) -> SearchIndex:
+        """
+        Возвращает полнотекстовый индекс.
+        Сохранённый индекс используется, если данные с тех пор не менялись
+        или все изменения есть в его журнале, иначе индекс строится заново и сохраняется.
+        """
+        if self._search_index is not None:
+            return self._search_index
+
+        from src.search import SearchIndex
+
+        self._mark_loaded()
+        stamp = self.storage.stamp()
+        search_index = None
+        if self.search_index_path:
+            with profiling.recorder.timer("search_index.load"):
+                search_index = SearchIndex.load(self.search_index_path, stamp)
+        if search_index is None:
+            books = self.storage.load_books() if self._indexed else iter(self._get_catalogue())
+            with profiling.recorder.timer("search_index.build"):
+                search_index = SearchIndex(books)
+            if self.search_index_path:
+                with profiling.recorder.timer("search_index.save"):
+                    search_index.save(self.search_index_path, stamp)
+        elif search_index.replayed > SEARCH_JOURNAL_LIMIT:
+            # Длинный журнал замедляет каждую загрузку: индекс сохраняется целиком, журнал удаляется
+            with profiling.recorder.timer("search_index.save"):
+                search_index.save(self.search_index_path, stamp)
+        self._search_index = search_index
+        return search_index
+
+    def _mark_loaded(self) -> None:
+        """
+        Запоминает отметку хранилища перед загрузкой первого из представлений в памяти
+        """
+        if self._catalogue is None and self._search_index is None:
+            self._stamp = self.storage.stamp()
+
+    def _refresh(self) -> None:
+        """
+        Сбрасывает каталог и полнотекстовый индекс, если с момента их загрузки
+        хранилище изменил другой процесс
+        """
+        if self._catalogue is None and self._search_index is None:
+            return
+        if self.storage.stamp() != self._stamp:
+            self._catalogue = None
+            self._search_index = None
+
+    @contextmanager
+    def _writing(self) -> Iterator[None]:
+        """
+        Выполняет изменение под блокировкой хранилища, если оно её поддерживает.
+        Под блокировкой каталог сверяется с хранилищем, поэтому запись
+        не затирает изменения, сделанные другим процессом после загрузки.
+        """
+        lock = getattr(self.storage, "lock", None)
+        with lock() if lock is not None else nullcontext():
+            self._refresh()
+            yield
+
+    def _commit(self, changes: list[Change], borrower: str | None = None, days: int | None = None) -> None:
+        """
+        Применяет изменения к каталогу и полнотекстовому индексу и сохраняет их,
+        а смены статуса после сохранения записывает в журнал выдач.
+        Если полнотекстовый индекс сохранён в файл, изменения названий и авторов
+        дописываются в журнал индекса.
+        При ошибке записи каталог будет перечитан при следующем обращении.
+        """
+        recorder = profiling.recorder
+        recorder.add("service.changes", len(changes))
+        journal = (
+            self.search_index_path is not None
+            and len(changes) <= SEARCH_JOURNAL_LIMIT
+            and self.search_index_path.exists()
+        )
+        before = self.storage.stamp() if journal else None
+        try:
+            facet_deltas = self._facet_deltas(changes)
+            search_changes = self._update_search_index(changes, journal)
+            if self._indexed:
+                with recorder.timer("service.save"):
+                    self.storage.apply_changes(changes)
+            else:
+                catalogue = self._get_catalogue()
+                if len(changes) > ORDERS_UPDATE_LIMIT:
+                    catalogue.reset_orders()
+                with recorder.timer("catalogue.update"):
+                    for change in changes:
+                        if change.type is ChangeType.ADD:
+                            catalogue.add(change.book)
+                        elif change.type is ChangeType.REMOVE:
+                            catalogue.remove(change.book_id)
+                        else:
+                            catalogue.set_status(change.book_id, change.status)
+                # Книги передаются итератором: хранилище с журналом читает их только для снимка
+                with recorder.timer("service.save"):
+                    self.storage.save_books(iter(catalogue), changes)
+        except Exception:
+            self._catalogue = None
+            self._search_index = None
+            raise
+        # Собственная запись не делает каталог в памяти устаревшим
+        self._stamp = self.storage.stamp()
+        if journal:
+            from src.search import SearchIndex
+
+            with recorder.timer("search_index.record"):
+                SearchIndex.record(self.search_index_path, before, self._stamp, search_changes)
+        if facet_deltas is not None:
+            with recorder.timer("facets.update"):
+                self.facet_store.apply(facet_deltas, self._stamp)
+        if self.circulation is not None:
+            with recorder.timer("circulation.record"):
+                self.circulation.record(changes, borrower, days)
+
+    def _facet_deltas(self, changes: list[Change]) -> Counter | None:
+        """
+        Возвращает изменения счётчиков по срезам для пакета или None,
+        если счётчиков нет, они уже устарели или пакет слишком велик.
+        Вызывается до изменения каталога; прежние версии книг берутся
+        так же, как для полнотекстового индекса.
+        """
+        if self.facet_store is None or len(changes) > FACETS_DELTA_LIMIT:
+            return None
+        if not self.facet_store.is_current(self.storage.stamp()):
+            return None
+
+        from src.facets import book_facets
+
+        deltas: Counter = Counter()
+        pending: dict[str, Book | None] = {}
+        for change in changes:
+            if change.book_id in pending:
+                book = pending[change.book_id]
+            else:
+                book = self._get_book(change.book_id)
+            if book is not None:
+                deltas.subtract(book_facets(book))
+            if change.type is ChangeType.ADD:
+                book = change.book
+            elif change.type is ChangeType.REMOVE:
+                book = None
+            elif book is not None:
+                book = replace(book, status=change.status)
+            if book is not None:
+                deltas.update(book_facets(book))
+            pending[change.book_id] = book
+        return deltas
+
+    def _update_search_index(self, changes: list[Change], journal: bool = False) -> list[tuple[bool, Book]]:
+        """
+        Переносит добавления и удаления книг в полнотекстовый индекс, если он загружен,
+        и возвращает их парами (добавлена ли, книга) для журнала сохранённого индекса.
+        Без загруженного индекса и без журнала книги не ищутся.
+        Вызывается до изменения каталога, поэтому прежние версии книг берутся
+        из каталога или хранилища, а книги, изменённые раньше в том же пакете, —
+        из самого пакета. Добавление с существующим id заменяет прежнюю книгу.
+        """
+        if self._search_index is None and not journal:
+            return []
+
+        search_changes = []
+        pending: dict[str, Book | None] = {}
+        for change in changes:
+            if change.type is ChangeType.STATUS:
+                continue
+            if change.book_id in pending:
+                book = pending[change.book_id]
+            else:
+                book = self._get_book(change.book_id)
+            if book is not None:
+                search_changes.append((False, book))
+            if change.type is ChangeType.ADD:
+                search_changes.append((True, change.book))
+            pending[change.book_id] = change.book
+        if self._search_index is not None:
+            for added, book in search_changes:
+                if added:
+                    self._search_index.add(book)
+                else:
+                    self._search_index.remove(book)
+        return search_changes
@@ -0,0 +1,240 @@
+import heapq
+import json
+import multiprocessing
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice, repeat
+from pathlib import Path
+from typing import Callable, ContextManager, Iterable, Iterator
+
+from src.models import Book, BookFilter, BookStatus, Change
+from src.paging import Order, SortKey, first_books
+from src.storage import Storage, lock_file, write_atomic
+
+MANIFEST_FILE = "shards.json"
+SHARD_FILE = "shard-{:03d}.json"
+
+
+def shard_of(book_id: str, shards: int) -> int:
+    """
+    Возвращает номер сегмента книги.
+    Используется crc32, а не hash(): номер не должен зависеть от процесса.
+    """
+    return zlib.crc32(book_id.encode("utf-8")) % shards
+
+
+# Функции для процессов пула: получают путь к сегменту и работают с ним целиком
+
+def _read_shard(path: Path) -> list[Book]:
+    return Storage(str(path), cache=False).load_books()
+
+
+def _search_shard(path: Path, book_filter: BookFilter) -> list[Book]:
+    return list(filter(book_filter, Storage(str(path), cache=False).load_books()))
+
+
+def _page_shard(
+    path: Path, book_filter: BookFilter, order: Order, after: SortKey | None, limit: int | None
+) -> list[Book]:
+    books = filter(book_filter, Storage(str(path), cache=False).load_books())
+    return first_books(books, order, after, limit)
+
+
+def _apply_to_shard(path: Path, changes: list[Change]) -> None:
+    storage = Storage(str(path), cache=False)
+    books = {book.id: book for book in storage.load_books()}
+    for change in changes:
+        change.apply(books)
+    storage.save_books(books.values())
+
+
+class ShardedStorage:
+    """
+    Хранилище книг, разделённое на сегменты по хешу id.
+
+    Каждый сегмент — файл в формате books.json. Поиск и пакеты изменений,
+    затрагивающие несколько сегментов, выполняются параллельно в пуле процессов:
+    каждый процесс сам читает, фильтрует или изменяет и записывает свой сегмент,
+    а между процессами передаются только критерии, изменения и найденные книги.
+    Полный каталог читается и пишется в текущем процессе: передача всех книг
+    между процессами обходится дороже разбора JSON. Операции с одной книгой
+    читают и пишут только её сегмент.
+
+    Каждый сегмент записывается атомарно, но пакет, затрагивающий
+    несколько сегментов, при сбое может примениться частично.
+    """
+
+    def __init__(self, directory: str, shards: int = 8, workers: int | None = None) -> None:
+        """
+        Конструктор класса ShardedStorage.
+        Принимает на вход каталог сегментов и их число для нового хранилища;
+        у существующего хранилища число сегментов читается из shards.json.
+        workers — число процессов пула, по умолчанию не больше числа ядер;
+        при workers=1 сегменты обрабатываются в текущем процессе.
+        """
+        self.directory = Path(directory)
+        manifest = self.directory / MANIFEST_FILE
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if manifest.exists():
+                shards = json.loads(manifest.read_text(encoding="utf-8"))["shards"]
+            else:
+                write_atomic(manifest, json.dumps({"shards": shards}))
+        except IOError as e:
+            raise RuntimeError(f"Ошибка открытия хранилища {self.directory}: {e}")
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise RuntimeError(f"Ошибка декодирования JSON из файла {manifest}: {e}")
+
+        self.shards = shards
+        self.workers = workers or min(shards, os.cpu_count() or 1)
+        # Прочитанные сегменты кешируются здесь же, в словарях по id
+        self._storages = [
+            Storage(str(self.directory / SHARD_FILE.format(i)), cache=False) for i in range(shards)
+        ]
+        self._executor: ProcessPoolExecutor | None = None
+        # Номер сегмента -> (отметка файла, книги по id) для сегментов, прочитанных в этом процессе
+        self._cache: dict[int, tuple[tuple[int, int, int], dict[str, Book]]] = {}
+
+    def close(self) -> None:
+        """
+        Останавливает пул процессов
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def load_books(self) -> list[Book]:
+        """
+        Читает все сегменты и возвращает список книг
+        """
+        return list(self.iter_books())
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Возвращает книги по сегментам, читая следующий сегмент только после предыдущего
+        """
+        return chain.from_iterable(map(_read_shard, self._paths()))
+
+    def save_books(self, books: Iterable[Book], changes: list[Change] | None = None) -> None:
+        """
+        Сохраняет изменения каталога.
+        Если список изменений передан, переписывает только затронутые сегменты,
+        иначе распределяет книги по сегментам и переписывает все.
+        """
+        if changes is not None:
+            self.apply_changes(changes)
+            return
+
+        parts: list[list[Book]] = [[] for _ in range(self.shards)]
+        for book in books:
+            parts[shard_of(book.id, self.shards)].append(book)
+        self._cache.clear()
+        for storage, part in zip(self._storages, parts):
+            storage.save_books(part)
+
+    def apply_changes(self, changes: list[Change]) -> None:
+        """
+        Применяет изменения, переписывая только сегменты затронутых книг.
+        Несколько сегментов обрабатываются параллельно в пуле процессов.
+        """
+        groups: dict[int, list[Change]] = {}
+        for change in changes:
+            groups.setdefault(shard_of(change.book_id, self.shards), []).append(change)
+
+        if len(groups) == 1 or self.workers == 1:
+            for shard, group in groups.items():
+                self._apply_local(shard, group)
+            return
+
+        for shard in groups:
+            self._cache.pop(shard, None)
+        list(self._map(_apply_to_shard, [self._storages[shard].file_path for shard in groups], groups.values()))
+
+    def get_book(self, book_id: str) -> Book | None:
+        """
+        Возвращает книгу по её id или None, читая только её сегмент
+        """
+        return self._shard_books(shard_of(book_id, self.shards)).get(book_id)
+
+    def search_books(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: BookStatus | None = None,
+    ) -> list[Book]:
+        """
+        Возвращает книги, удовлетворяющие всем переданным критериям.
+        Сегменты фильтруются параллельно, результаты идут в порядке сегментов.
+        """
+        book_filter = BookFilter(title, author, year, year_from, year_to, status)
+        return list(chain.from_iterable(self._map(_search_shard, self._paths(), repeat(book_filter))))
+
+    def page_books(
+        self, order: Order, after: SortKey | None, limit: int | None, book_filter: BookFilter
+    ) -> list[Book]:
+        """
+        Возвращает до limit книг, удовлетворяющих фильтру и идущих в порядке order
+        после ключа after. Каждый сегмент параллельно отбирает свои первые limit книг,
+        а из процессов возвращаются только они и сливаются по порядку.
+        """
+        pages = self._map(_page_shard, self._paths(), repeat(book_filter), repeat(order), repeat(after), repeat(limit))
+        return list(islice(heapq.merge(*pages, key=order.key, reverse=order.descending), limit))
+
+    def lock(self) -> ContextManager[None]:
+        """
+        Возвращает блокировку хранилища для последовательности чтение-изменение-запись
+        между процессами
+        """
+        return lock_file(self.directory / ".lock")
+
+    def stamp(self) -> tuple[tuple[int, int, int], ...]:
+        """
+        Возвращает отметку состояния: отметки файлов всех сегментов
+        """
+        return tuple(storage.stamp() for storage in self._storages)
+
+    def _paths(self) -> list[Path]:
+        return [storage.file_path for storage in self._storages]
+
+    def _map(self, function: Callable, *iterables: Iterable) -> Iterator:
+        """
+        Применяет функцию к сегментам в пуле процессов или, при одном процессе, здесь же
+        """
+        if self.workers == 1:
+            return map(function, *iterables)
+        if self._executor is None:
+            # Процессы пула запускаются из forkserver, а не копией текущего процесса:
+            # пул создаётся под блокировкой хранилища, и копии унаследовали бы её файл
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("forkserver")
+            )
+        return self._executor.map(function, *iterables)
+
+    def _shard_books(self, shard: int) -> dict[str, Book]:
+        """
+        Возвращает книги сегмента по id, перечитывая сегмент, если файл изменился
+        """
+        storage = self._storages[shard]
+        stamp = storage.stamp()
+        cached = self._cache.get(shard)
+        if cached is None or cached[0] != stamp:
+            cached = self._cache[shard] = (stamp, {book.id: book for book in storage.load_books()})
+        return cached[1]
+
+    def _apply_local(self, shard: int, changes: list[Change]) -> None:
+        """
+        Применяет изменения к сегменту в текущем процессе
+        """
+        books = self._shard_books(shard)
+        try:
+            for change in changes:
+                change.apply(books)
+            self._storages[shard].save_books(books.values())
+        except Exception:
+            self._cache.pop(shard, None)
+            raise
+        self._cache[shard] = (self._storages[shard].stamp(), books)
@@ -0,0 +1,310 @@
+"""
+Снимки каталога для резервного копирования и обмена данными.
+
+Снимок — каталог с фрагментами по CHUNK_SIZE книг в формате JSONL или CSV,
+сжатыми gzip, lzma или zstd, и файлом manifest.json с числом книг, размером
+и контрольной суммой SHA-256 каждого фрагмента. Фрагменты кодируются
+и сжимаются в пуле процессов, а главный процесс только читает книги
+из хранилища и раздаёт их блоками; число блоков в работе ограничено,
+поэтому память не зависит от размера каталога. При восстановлении
+фрагменты так же параллельно проверяются и разбираются.
+
+Распакованный фрагмент JSONL можно загрузить и командой import.
+"""
+import csv
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from itertools import islice
+from json.encoder import encode_basestring
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from src.codec import JSONL_TEMPLATE
+from src.models import Book, BookStatus
+from src.storage import write_atomic
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CHUNK_FILE = "chunk-{:05d}.{}{}"
+CHUNK_SIZE = 100_000
+FIELDS = ["id", "title", "author", "year", "status"]
+FORMATS = ["jsonl", "csv"]
+# Расширения файлов и уровни сжатия по умолчанию: быстрые уровни, потому что
+# снимок пишется целиком при каждом резервном копировании
+COMPRESSIONS = {"gzip": ".gz", "lzma": ".xz", "zstd": ".zst", "none": ""}
+DEFAULT_LEVELS = {"gzip": 1, "lzma": 0, "zstd": 3, "none": 0}
+
+Row = tuple[str, str, str, int, str]
+
+
+class ChunkInfo(NamedTuple):
+    """
+    Описание фрагмента снимка в manifest.json
+    """
+    file: str
+    books: int
+    bytes: int
+    sha256: str
+
+    def to_dict(self) -> dict:
+        return self._asdict()
+
+    @staticmethod
+    def from_dict(data: dict) -> "ChunkInfo":
+        return ChunkInfo(data["file"], data["books"], data["bytes"], data["sha256"])
+
+
+def compress(data: bytes, compression: str, level: int) -> bytes:
+    """
+    Сжимает данные выбранным способом
+    """
+    if compression == "gzip":
+        # mtime=0: одинаковые книги дают одинаковые файлы и контрольные суммы
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if compression == "lzma":
+        return lzma.compress(data, preset=level)
+    if compression == "zstd":
+        return zstd_module().ZstdCompressor(level=level).compress(data)
+    return data
+
+
+def decompress(data: bytes, compression: str) -> bytes:
+    """
+    Распаковывает данные, сжатые compress
+    """
+    if compression == "gzip":
+        return gzip.decompress(data)
+    if compression == "lzma":
+        return lzma.decompress(data)
+    if compression == "zstd":
+        return zstd_module().ZstdDecompressor().decompress(data)
+    return data
+
+
+def zstd_module():
+    if zstandard is None:
+        raise ValueError("Сжатие zstd недоступно: не установлен модуль zstandard")
+    return zstandard
+
+
+def encode_rows(rows: list[Row], file_format: str) -> bytes:
+    """
+    Сериализует строки книг в JSONL, совпадающий с encode_jsonl, или в CSV с заголовком
+    """
+    if file_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(FIELDS)
+        writer.writerows(rows)
+        return buffer.getvalue().encode("utf-8")
+    return "".join(
+        [
+            JSONL_TEMPLATE.format(
+                encode_basestring(book_id),
+                encode_basestring(title),
+                encode_basestring(author),
+                year,
+                encode_basestring(status),
+            )
+            for book_id, title, author, year, status in rows
+        ]
+    ).encode("utf-8")
+
+
+def decode_rows(data: bytes, file_format: str) -> list[Row]:
+    """
+    Разбирает фрагмент, записанный encode_rows
+    """
+    text = data.decode("utf-8")
+    if file_format == "csv":
+        reader = csv.reader(io.StringIO(text))
+        if next(reader, None) != FIELDS:
+            raise ValueError("неверный заголовок CSV")
+        return [(book_id, title, author, int(year), status) for book_id, title, author, year, status in reader]
+    records = map(json.loads, text.splitlines())
+    return [
+        (record["id"], record["title"], record["author"], int(record["year"]), record["status"])
+        for record in records
+    ]
+
+
+def write_chunk(path: Path, rows: list[Row], file_format: str, compression: str, level: int) -> ChunkInfo:
+    """
+    Кодирует, сжимает и записывает фрагмент. Выполняется в процессе пула.
+    """
+    data = compress(encode_rows(rows, file_format), compression, level)
+    with open(path, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    return ChunkInfo(path.name, len(rows), len(data), hashlib.sha256(data).hexdigest())
+
+
+def read_chunk(path: Path, chunk: ChunkInfo, file_format: str, compression: str) -> list[Row]:
+    """
+    Читает фрагмент, сверяет размер, контрольную сумму и число книг
+    и возвращает строки книг. Выполняется в процессе пула.
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        raise ValueError(f"Фрагмент снимка не найден: {chunk.file}")
+    except OSError as e:
+        raise RuntimeError(f"Ошибка чтения фрагмента снимка {path}: {e}")
+    if len(data) != chunk.bytes or hashlib.sha256(data).hexdigest() != chunk.sha256:
+        raise ValueError(f"Контрольная сумма фрагмента {chunk.file} не совпадает")
+    try:
+        rows = decode_rows(decompress(data, compression), file_format)
+    except (OSError, EOFError, lzma.LZMAError, ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Неверный формат фрагмента {chunk.file}: {e}")
+    if len(rows) != chunk.books:
+        raise ValueError(f"Во фрагменте {chunk.file} {len(rows)} книг вместо {chunk.books}")
+    return rows
+
+
+def write_snapshot(
+    books: Iterable[Book],
+    directory: str,
+    file_format: str = "jsonl",
+    compression: str = "gzip",
+    level: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+    workers: int | None = None,
+) -> dict:
+    """
+    Записывает книги снимком в новый или пустой каталог и возвращает манифест.
+    Манифест записывается последним, поэтому прерванная запись не оставляет
+    снимка, который выглядит целым. При workers=1 фрагменты пишутся в этом процессе.
+    """
+    if file_format not in FORMATS:
+        raise ValueError(f"Неизвестный формат: {file_format}")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Неизвестный способ сжатия: {compression}")
+    if compression == "zstd":
+        zstd_module()
+    level = DEFAULT_LEVELS[compression] if level is None else level
+    target = Path(directory)
+    if target.exists() and any(target.iterdir()):
+        raise ValueError(f"Каталог {directory} не пуст")
+    try:
+        target.mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        raise RuntimeError(f"Ошибка создания каталога {directory}: {e}")
+
+    workers = workers or os.cpu_count() or 1
+    suffix = COMPRESSIONS[compression]
+    books = iter(books)
+    chunks: list[ChunkInfo] = []
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # Фрагменты в работе: при их ограниченном числе книги читаются не быстрее, чем пишутся
+    pending: deque[Future | ChunkInfo] = deque()
+    limit = 2 * workers if executor is not None else 0
+    try:
+        number = 0
+        while rows := [
+            (book.id, book.title, book.author, book.year, book.status.value)
+            for book in islice(books, chunk_size)
+        ]:
+            path = target / CHUNK_FILE.format(number, file_format, suffix)
+            pending.append(_submit(executor, write_chunk, path, rows, file_format, compression, level))
+            number += 1
+            while len(pending) > limit:
+                chunks.append(_result(pending.popleft()))
+        while pending:
+            chunks.append(_result(pending.popleft()))
+    except OSError as e:
+        raise RuntimeError(f"Ошибка записи снимка в {directory}: {e}")
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    manifest = {
+        "version": SNAPSHOT_VERSION,
+        "format": file_format,
+        "compression": compression,
+        "books": sum(chunk.books for chunk in chunks),
+        "chunks": [chunk.to_dict() for chunk in chunks],
+    }
+    write_atomic(target / MANIFEST_FILE, json.dumps(manifest, ensure_ascii=False, indent=2))
+    return manifest
+
+
+def read_manifest(directory: str) -> dict:
+    """
+    Читает и проверяет манифест снимка
+    """
+    path = Path(directory) / MANIFEST_FILE
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise ValueError(f"Снимок не найден: нет файла {path}")
+    except OSError as e:
+        raise RuntimeError(f"Ошибка чтения файла {path}: {e}")
+    except ValueError as e:
+        raise ValueError(f"Неверный формат файла {path}: {e}")
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Неподдерживаемая версия снимка: {manifest.get('version')}")
+    if manifest.get("format") not in FORMATS or manifest.get("compression") not in COMPRESSIONS:
+        raise ValueError(f"Неверный формат файла {path}")
+    return manifest
+
+
+def read_snapshot(directory: str, workers: int | None = None) -> Iterator[Book]:
+    """
+    Читает книги снимка по порядку. Фрагменты проверяются и разбираются
+    в пуле процессов; при несовпадении контрольной суммы или числа книг
+    выбрасывается ValueError.
+    """
+    manifest = read_manifest(directory)
+    file_format, compression = manifest["format"], manifest["compression"]
+    if compression == "zstd":
+        zstd_module()
+    chunks = [ChunkInfo.from_dict(chunk) for chunk in manifest["chunks"]]
+    workers = workers or os.cpu_count() or 1
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 and len(chunks) > 1 else None
+    pending: deque[Future | list[Row]] = deque()
+    limit = 2 * workers if executor is not None else 0
+    try:
+        for chunk in chunks:
+            pending.append(
+                _submit(executor, read_chunk, Path(directory) / chunk.file, chunk, file_format, compression)
+            )
+            if len(pending) > limit:
+                yield from _books(_result(pending.popleft()))
+        while pending:
+            yield from _books(_result(pending.popleft()))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _books(rows: list[Row]) -> Iterator[Book]:
+    statuses = {status.value: status for status in BookStatus}
+    for book_id, title, author, year, status in rows:
+        if status not in statuses:
+            raise ValueError(f"Неизвестный статус книги {book_id}: {status}")
+        yield Book(title, author, year, statuses[status], book_id)
+
+
+def _submit(executor: Executor | None, function, *args) -> Future | object:
+    """
+    Отправляет задачу в пул или, без пула, сразу выполняет её здесь же
+    """
+    if executor is None:
+        return function(*args)
+    return executor.submit(function, *args)
+
+
+def _result(task: Future | object) -> object:
+    return task.result() if isinstance(task, Future) else task
@@ -0,0 +1,239 @@
+import sqlite3
+from itertools import groupby
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from src.models import Book, BookFilter, BookStatus, Change, ChangeType
+from src.paging import Order, SortKey
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    title_lower TEXT NOT NULL,
+    author_lower TEXT NOT NULL
+);
+"""
+# Индексы таблицы books: имя и столбцы. Индексы порядков (ключ, id) нужны
+# для постраничной выдачи по курсору
+INDEXES = {
+    "books_author": "author_lower",
+    "books_year": "year",
+    "books_status": "status",
+    "books_title_order": "title_lower, id",
+    "books_author_order": "author_lower, id",
+    "books_year_order": "year, id",
+}
+
+COLUMNS = "id, title, author, year, status"
+# Столбцы ключей порядков из src.paging; по каждому ключу вместе с id есть индекс
+ORDER_COLUMNS = {"title": "title_lower", "author": "author_lower", "year": "year"}
+
+
+class SQLiteStorage:
+    """
+    Хранилище книг в базе SQLite.
+    Поиск и изменения выполняются SQL-запросами по индексам,
+    а не перезаписью всего каталога.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        """
+        Конструктор класса SQLiteStorage.
+        Принимает на вход путь к файлу базы данных и создает схему, если её нет.
+        """
+        self.file_path = Path(file_path)
+        try:
+            # Соединение может использоваться из потоков сервера, доступ к нему сериализует вызывающий
+            self._connection = sqlite3.connect(self.file_path, check_same_thread=False)
+            self._connection.executescript(SCHEMA)
+            self._create_indexes()
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка открытия базы данных {self.file_path}: {e}")
+
+    def close(self) -> None:
+        """
+        Закрывает соединение с базой данных
+        """
+        self._connection.close()
+
+    def load_books(self) -> list[Book]:
+        """
+        Возвращает список всех книг в порядке добавления
+        """
+        return self._select("ORDER BY seq")
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Возвращает книги по одной, читая их курсором в порядке добавления
+        """
+        return self._iter_select("ORDER BY seq")
+
+    def save_books(self, books: Iterable[Book], changes: list[Change] | None = None) -> None:
+        """
+        Сохраняет изменения каталога.
+        Если список изменений передан, применяет только его,
+        иначе заменяет содержимое таблицы переданным списком книг.
+        """
+        if changes is not None:
+            self.apply_changes(changes)
+            return
+
+        try:
+            with self._connection:
+                # Индексы строятся заново после вставки: это быстрее, чем вставлять
+                # в них строки по одной в случайном порядке ключей
+                for name in INDEXES:
+                    self._connection.execute(f"DROP INDEX IF EXISTS {name}")
+                self._connection.execute("DELETE FROM books")
+                self._connection.executemany(
+                    "INSERT INTO books (id, title, author, year, status, title_lower, author_lower) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self._row(book) for book in books),
+                )
+                self._create_indexes()
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка записи в базу данных {self.file_path}: {e}")
+
+    def apply_changes(self, changes: list[Change]) -> None:
+        """
+        Применяет изменения каталога одной транзакцией.
+        Подряд идущие изменения одного типа выполняются одним executemany.
+        """
+        try:
+            with self._connection:
+                for change_type, group in groupby(changes, key=lambda change: change.type):
+                    if change_type is ChangeType.ADD:
+                        self._connection.executemany(
+                            "INSERT OR REPLACE INTO books "
+                            "(id, title, author, year, status, title_lower, author_lower) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (self._row(change.book) for change in group),
+                        )
+                    elif change_type is ChangeType.REMOVE:
+                        self._connection.executemany(
+                            "DELETE FROM books WHERE id = ?",
+                            ((change.book_id,) for change in group),
+                        )
+                    else:
+                        self._connection.executemany(
+                            "UPDATE books SET status = ? WHERE id = ?",
+                            ((str(change.status), change.book_id) for change in group),
+                        )
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка записи в базу данных {self.file_path}: {e}")
+
+    def get_book(self, book_id: str) -> Book | None:
+        """
+        Возвращает книгу по её id или None
+        """
+        books = self._select("WHERE id = ?", (book_id,))
+        return books[0] if books else None
+
+    def search_books(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: BookStatus | None = None,
+    ) -> list[Book]:
+        """
+        Возвращает книги, удовлетворяющие всем переданным критериям.
+        Фильтрация выполняется в SQL по индексам и нормализованным столбцам.
+        """
+        conditions, params = self._conditions(BookFilter(title, author, year, year_from, year_to, status))
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        return self._select(f"{where}ORDER BY seq", tuple(params))
+
+    def page_books(
+        self, order: Order, after: SortKey | None, limit: int | None, book_filter: BookFilter
+    ) -> list[Book]:
+        """
+        Возвращает до limit книг, удовлетворяющих фильтру и идущих в порядке order
+        после ключа after. Страница читается по индексу ключа с условием
+        (ключ, id) > (?, ?), без пропуска книг предыдущих страниц.
+        """
+        conditions, params = self._conditions(book_filter)
+        column = ORDER_COLUMNS[order.field]
+        direction = "DESC" if order.descending else "ASC"
+        if after is not None:
+            conditions.append(f"({column}, id) {'<' if order.descending else '>'} (?, ?)")
+            params.extend(after)
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        params.append(-1 if limit is None else limit)
+        return self._select(f"{where}ORDER BY {column} {direction}, id {direction} LIMIT ?", tuple(params))
+
+    def stamp(self) -> tuple[int, int, int]:
+        """
+        Возвращает отметку состояния файла базы данных
+        """
+        stat = self.file_path.stat()
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _create_indexes(self) -> None:
+        for name, columns in INDEXES.items():
+            self._connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON books ({columns})")
+
+    @staticmethod
+    def _conditions(book_filter: BookFilter) -> tuple[list[str], list]:
+        """
+        Возвращает условия SQL и их параметры для критериев отбора
+        """
+        conditions = []
+        params: list = []
+        if book_filter.title:
+            conditions.append("instr(title_lower, ?) > 0")
+            params.append(book_filter.title)
+        if book_filter.author:
+            conditions.append("instr(author_lower, ?) > 0")
+            params.append(book_filter.author)
+        if book_filter.year is not None:
+            conditions.append("year = ?")
+            params.append(book_filter.year)
+        if book_filter.year_from is not None:
+            conditions.append("year >= ?")
+            params.append(book_filter.year_from)
+        if book_filter.year_to is not None:
+            conditions.append("year <= ?")
+            params.append(book_filter.year_to)
+        if book_filter.status is not None:
+            conditions.append("status = ?")
+            params.append(str(book_filter.status))
+        return conditions, params
+
+    def _select(self, clause: str, params: tuple = ()) -> list[Book]:
+        """
+        Выполняет выборку книг с переданным условием
+        """
+        return list(self._iter_select(clause, params))
+
+    def _iter_select(self, clause: str, params: tuple = ()) -> Iterator[Book]:
+        """
+        Выполняет выборку книг с переданным условием, возвращая их по одной
+        """
+        try:
+            rows = self._connection.execute(f"SELECT {COLUMNS} FROM books {clause}", params)
+            for book_id, title, author, year, status in rows:
+                yield Book(
+                    id=book_id, title=title, author=author, year=year, status=BookStatus(status)
+                )
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка чтения из базы данных {self.file_path}: {e}")
+
+    @staticmethod
+    def _row(book: Book) -> tuple:
+        return (
+            book.id,
+            book.title,
+            book.author,
+            book.year,
+            str(book.status),
+            book.title.lower(),
+            book.author.lower(),
+        )
@@ -1,42 +1,258 @@
+import fcntl
 import json
+import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
+from typing import ContextManager, Hashable, Iterable, Iterator, NamedTuple, Protocol, runtime_checkable
 
-from src.models import Book
+from src import profiling
+from src.codec import encode_books
+from src.models import Book, BookStatus, Change
+
+
+CHUNK_SIZE = 1 << 16
+SEPARATORS = " \t\r\n,"
+
+
+@contextmanager
+def lock_file(path: Path) -> Iterator[None]:
+    """
+    Удерживает исключительную рекомендательную блокировку (flock) файла.
+    Блокировка снимается явно при выходе из блока: дочерние процессы,
+    созданные под ней, наследуют описание файла и иначе удерживали бы её дальше.
+    """
+    try:
+        file = path.open("a+b")
+    except IOError as e:
+        raise RuntimeError(f"Ошибка открытия файла блокировки {path}: {e}")
+    with file:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+def write_atomic(path: Path, data: str | bytes) -> None:
+    """
+    Записывает текст или байты во временный файл рядом с path и заменяет им path.
+    Читатели видят либо прежний, либо новый файл целиком, а сбой во время
+    записи не портит существующие данные.
+    """
+    fd, temp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data.encode("utf-8") if isinstance(data, str) else data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_name, path)
+    except BaseException:
+        Path(temp_name).unlink(missing_ok=True)
+        raise
+
+
+@runtime_checkable
+class BookStorage(Protocol):
+    """
+    Общий интерфейс хранилищ книг
+    """
+
+    def load_books(self) -> list[Book]: ...
+
+    def iter_books(self) -> Iterator[Book]: ...
+
+    def save_books(self, books: Iterable[Book], changes: list[Change] | None = None) -> None: ...
+
+    def stamp(self) -> Hashable: ...
+
+
+@runtime_checkable
+class IndexedStorage(BookStorage, Protocol):
+    """
+    Хранилище с собственными индексами.
+    Поиск и изменения выполняются в нём напрямую, без загрузки каталога в память.
+    """
+
+    def get_book(self, book_id: str) -> Book | None: ...
+
+    def search_books(
+        self,
+        title: str | None = None,
+        author: str | None = None,
+        year: int | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        status: BookStatus | None = None,
+    ) -> list[Book]: ...
+
+    def apply_changes(self, changes: list[Change]) -> None: ...
+
+
+class CacheInfo(NamedTuple):
+    """
+    Статистика кеша чтения: число обращений без разбора файла и с разбором
+    """
+    hits: int
+    misses: int
 
 
 class Storage:
-    def __init__(self, file_path: str) -> None:
+    def __init__(self, file_path: str, cache: bool = True) -> None:
         """
         Конструктор класса Storage.
         Принимает на вход путь к файлу, в котором будут храниться книги.
         Создает файл, если его нет.
+
+        При cache=True прочитанный каталог хранится в памяти и используется повторно,
+        пока отметка файла (время изменения, размер, inode) не изменилась.
         """
         self.file_path = Path(file_path)
         if not self.file_path.exists():
             self.file_path.write_text("[]", encoding="utf-8")
 
-    def save_books(self, books: list[Book]) -> None:
+        self.cache = cache
+        self._cached: tuple[tuple[int, int, int], list[Book]] | None = None
+        self._hits = 0
+        self._misses = 0
+
+    def save_books(self, books: Iterable[Book], changes: list[Change] | None = None) -> None:
         """
-        Принимает на вход список книг и сохраняет его в файл
+        Принимает на вход книги и атомарно сохраняет их в файл.
+        Список изменений игнорируется: файл всегда перезаписывается целиком.
         """
+        self._cached = None
+        recorder = profiling.recorder
+        with recorder.timer("storage.encode"):
+            data = encode_books(recorder.counted(books, "storage.books_written")).encode("utf-8")
         try:
-            with self.file_path.open("w", encoding="utf-8") as file:
-                json.dump(
-                    [book.to_dict() for book in books],
-                    file,
-                    ensure_ascii=False,
-                    indent=4,
-                )
+            with recorder.timer("storage.write"):
+                write_atomic(self.file_path, data)
+            recorder.add("storage.bytes_written", len(data))
         except IOError as e:
             raise RuntimeError(f"Ошибка записи в файл {self.file_path}: {e}")
 
+    def lock(self) -> ContextManager[None]:
+        """
+        Возвращает блокировку хранилища для последовательности чтение-изменение-запись
+        между процессами
+        """
+        return lock_file(self.file_path.with_name(self.file_path.name + ".lock"))
+
+    def cache_info(self) -> CacheInfo:
+        """
+        Возвращает число чтений каталога из кеша и с разбором файла
+        """
+        return CacheInfo(self._hits, self._misses)
+
     def load_books(self) -> list[Book]:
         """
-        Чмтает список книг из файла и возвращает его
+        Чмтает список книг из файла и возвращает его.
+        Если файл не менялся с прошлого чтения, книги берутся из кеша.
+        """
+        cached = self._get_cached()
+        if cached is not None:
+            return [self._copy(book) for book in cached]
+
+        stamp = self.stamp() if self.cache else None
+        books = self._read_books()
+        if self.cache:
+            self._cached = (stamp, books)
+            return [self._copy(book) for book in books]
+        return books
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Читает книги из файла по одной, не загружая весь файл в память.
+        Если файл не менялся с прошлого чтения, книги берутся из кеша.
+        """
+        cached = self._get_cached()
+        if cached is not None:
+            return map(self._copy, cached)
+        return profiling.recorder.counted(self._iter_file(), "storage.books_read")
+
+    def stamp(self) -> tuple[int, int, int]:
+        """
+        Возвращает отметку состояния файла: время изменения, размер и inode
+        """
+        stat = self.file_path.stat()
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _get_cached(self) -> list[Book] | None:
+        """
+        Возвращает книги из кеша, если он соответствует текущему файлу, иначе None.
+        Книги кеша не отдаются наружу: вызывающие получают их копии.
+        """
+        if not self.cache:
+            return None
+        if self._cached is None or self._cached[0] != self.stamp():
+            self._misses += 1
+            return None
+        self._hits += 1
+        profiling.recorder.add("storage.cache_hits")
+        return self._cached[1]
+
+    @staticmethod
+    def _copy(book: Book) -> Book:
+        return Book(book.title, book.author, book.year, book.status, book.id)
+
+    def _read_books(self) -> list[Book]:
         """
+        Разбирает файл целиком и возвращает список книг
+        """
+        recorder = profiling.recorder
+        try:
+            with recorder.timer("storage.read"):
+                data = self.file_path.read_bytes()
+            recorder.add("storage.bytes_read", len(data))
+            with recorder.timer("storage.decode"):
+                records = json.loads(data)
+            with recorder.timer("storage.build"):
+                books = [Book.from_dict(book) for book in records]
+            recorder.add("storage.books_read", len(books))
+            return books
+        except IOError as e:
+            raise RuntimeError(f"Ошибка чтения из файла {self.file_path}: {e}")
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Ошибка декодирования JSON из файла {self.file_path}: {e}")
+
+    def _iter_file(self) -> Iterator[Book]:
+        """
+        Разбирает файл по одной книге
+        """
+        decoder = json.JSONDecoder()
         try:
             with self.file_path.open("r", encoding="utf-8") as file:
-                return [Book.from_dict(book) for book in json.load(file)]
+                buffer, pos, started = "", 0, False
+                while True:
+                    while pos < len(buffer) and buffer[pos] in SEPARATORS:
+                        pos += 1
+                    if pos == len(buffer):
+                        buffer, pos = file.read(CHUNK_SIZE), 0
+                        if not buffer:
+                            raise json.JSONDecodeError("Неожиданный конец файла", "", 0)
+                        continue
+
+                    if not started:
+                        if buffer[pos] != "[":
+                            raise json.JSONDecodeError("Ожидался список книг", buffer, pos)
+                        started = True
+                        pos += 1
+                        continue
+                    if buffer[pos] == "]":
+                        profiling.recorder.add("storage.bytes_read", file.buffer.tell())
+                        return
+
+                    try:
+                        data, pos = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        # Объект разрезан границей блока: дочитываем следующий
+                        chunk = file.read(CHUNK_SIZE)
+                        if not chunk:
+                            raise
+                        buffer, pos = buffer[pos:] + chunk, 0
+                        continue
+                    yield Book.from_dict(data)
         except IOError as e:
             raise RuntimeError(f"Ошибка чтения из файла {self.file_path}: {e}")
         except json.JSONDecodeError as e:
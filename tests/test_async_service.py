@@ -0,0 +1,75 @@
+import asyncio
+import tempfile
+from pathlib import Path
+from unittest import IsolatedAsyncioTestCase
+
+from src.async_service import AsyncLibraryService, ReadWriteLock
+from src.services import LibraryService
+from src.storage import Storage
+
+
+class TestReadWriteLock(IsolatedAsyncioTestCase):
+    async def test_readers_share_writer_excludes(self) -> None:
+        """
+        Проверяет, что читатели работают одновременно, а писатель ждёт их завершения
+        """
+        lock = ReadWriteLock()
+        events = []
+        release = asyncio.Event()
+
+        async def reader(name: str) -> None:
+            async with lock.read():
+                events.append(f"{name} start")
+                await release.wait()
+                events.append(f"{name} end")
+
+        async def writer() -> None:
+            async with lock.write():
+                events.append("writer")
+
+        readers = [asyncio.create_task(reader("r1")), asyncio.create_task(reader("r2"))]
+        await asyncio.sleep(0)
+        writer_task = asyncio.create_task(writer())
+        late_reader = asyncio.create_task(reader("r3"))
+        await asyncio.sleep(0)
+
+        self.assertEqual(events, ["r1 start", "r2 start"])
+        release.set()
+        await asyncio.gather(*readers, writer_task, late_reader)
+
+        self.assertEqual(events[2:], ["r1 end", "r2 end", "writer", "r3 start", "r3 end"])
+
+
+class TestAsyncLibraryService(IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = Storage(str(Path(self.temp_dir.name) / "books.json"))
+        self.service = AsyncLibraryService(LibraryService(self.storage))
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    async def test_concurrent_writes_and_reads(self) -> None:
+        """
+        Проверяет, что параллельные добавления не теряются, а чтения видят сохранённые книги
+        """
+        books = await asyncio.gather(
+            *(self.service.add_book(f"Book {i}", "Author", 2000 + i) for i in range(20))
+        )
+        results = await asyncio.gather(
+            self.service.get_all_books(),
+            self.service.search_books(year_from=2010),
+            self.service.find_books("book", limit=50),
+        )
+
+        self.assertEqual(len(self.storage.load_books()), 20)
+        self.assertEqual(len(results[0]), 20)
+        self.assertEqual(len(results[1]), 10)
+        self.assertEqual({book.id for book in results[2]}, {book.id for book in books})
+
+    async def test_errors_are_propagated(self) -> None:
+        """
+        Проверяет, что ошибки сервиса передаются вызывающему
+        """
+        with self.assertRaises(ValueError):
+            await self.service.remove_book("none_existent_id")
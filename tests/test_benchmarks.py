@@ -0,0 +1,80 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from benchmarks.compare import compare, load_results
+from benchmarks.generator import generate_books, parse_size, write_catalogue
+from benchmarks.run import total_import_time
+from src.storage import Storage
+
+
+class TestGenerator(TestCase):
+    def test_deterministic(self) -> None:
+        """
+        Проверяет, что один seed даёт те же книги, а другой — другие
+        """
+        self.assertEqual(list(generate_books(50, seed=1)), list(generate_books(50, seed=1)))
+        self.assertNotEqual(list(generate_books(50, seed=1)), list(generate_books(50, seed=2)))
+
+    def test_write_catalogue(self) -> None:
+        """
+        Проверяет, что каталог читается хранилищем и id книг уникальны
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "data" / "books.json"
+            write_catalogue(path, 200)
+
+            books = Storage(str(path)).load_books()
+            self.assertEqual(books, list(generate_books(200)))
+            self.assertEqual(len({book.id for book in books}), 200)
+
+    def test_parse_size(self) -> None:
+        """
+        Проверяет разбор обозначений размера каталога
+        """
+        self.assertEqual(parse_size("100K"), 100_000)
+        self.assertEqual(parse_size("1m"), 1_000_000)
+        self.assertEqual(parse_size("500"), 500)
+
+
+class TestCompare(TestCase):
+    def test_compare(self) -> None:
+        """
+        Проверяет сопоставление сценариев и отношение медиан
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "results.json"
+            path.write_text(json.dumps({"results": [
+                {"scenario": "service.load", "storage": "json", "size": 10, "median": 0.5},
+                {"scenario": "service.find", "storage": "json", "size": 10, "median": 0.1},
+            ]}))
+            before = load_results(path)
+
+        after = {("service.load", "json", 10): 1.0, ("service.add_book", "json", 10): 0.1}
+        [comparison] = compare(before, after)
+
+        self.assertEqual(comparison.key, ("service.load", "json", 10))
+        self.assertEqual(comparison.ratio, 2.0)
+
+    def test_load_missing_file(self) -> None:
+        """
+        Проверяет ошибку для несуществующего файла результатов
+        """
+        with self.assertRaises(ValueError):
+            load_results(Path("missing.json"))
+
+
+class TestImportTime(TestCase):
+    def test_total_import_time(self) -> None:
+        """
+        Проверяет, что суммируется только время импортов верхнего уровня
+        """
+        report = "\n".join([
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |   _io",
+            "import time:       200 |        300 | io",
+            "import time:      1000 |       1500 | src.cli",
+            "Система управления библиотекой",
+        ])
+        self.assertAlmostEqual(total_import_time(report), 0.0018)
@@ -0,0 +1,245 @@
+import tempfile
+from array import array
+from pathlib import Path
+from unittest import TestCase
+
+from src.binary_storage import HEADERS, MAGIC, STATUS_CODES, BinaryStorage, _strings, _to_bytes, convert
+from src.models import Book, BookStatus, Change, ChangeType
+from src.services import LibraryService
+from src.storage import IndexedStorage, Storage
+
+
+class TestBinaryStorage(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.bin"
+        self.storage = BinaryStorage(str(self.file_path))
+        self.books = [
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+            Book(title="Python Basics", author="John Smith", year=2020, status=BookStatus.ISSUED),
+            Book(title="Анна Каренина", author="Лев Толстой", year=1877, id="custom-id"),
+            Book(title="", author="Аноним", year=-500),
+        ]
+        self.storage.save_books(self.books)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_is_indexed_storage(self) -> None:
+        """
+        Проверяет, что хранилище реализует интерфейс IndexedStorage
+        """
+        self.assertIsInstance(self.storage, IndexedStorage)
+
+    def test_save_and_load_books(self) -> None:
+        """
+        Проверяет, что книги читаются в порядке записи без потерь
+        """
+        self.assertEqual(self.storage.load_books(), self.books)
+        self.assertEqual(BinaryStorage(str(self.file_path)).load_books(), self.books)
+
+    def test_close(self) -> None:
+        """
+        Проверяет, что закрытие освобождает отображение, а хранилище открывает файл заново
+        """
+        self.assertEqual(self.storage.get_book("custom-id"), self.books[2])
+        self.storage.close()
+        self.storage.close()
+        self.assertIsNone(self.storage._catalogue)
+        self.assertEqual(self.storage.get_book("custom-id"), self.books[2])
+        self.storage.close()
+
+    def test_empty_catalogue(self) -> None:
+        """
+        Проверяет новый пустой каталог
+        """
+        storage = BinaryStorage(str(Path(self.temp_dir.name) / "empty.bin"))
+
+        self.assertEqual(storage.load_books(), [])
+        self.assertIsNone(storage.get_book("missing"))
+
+    def test_get_book(self) -> None:
+        """
+        Проверяет поиск по id, включая id не в формате UUID
+        """
+        for book in self.books:
+            self.assertEqual(self.storage.get_book(book.id), book)
+        self.assertIsNone(self.storage.get_book("missing"))
+        self.assertIsNone(self.storage.get_book("custom"))
+
+    def test_packed_ids(self) -> None:
+        """
+        Проверяет, что id в каноническом виде UUID занимают 16 байт,
+        а id в другом виде сохраняются строкой без изменений
+        """
+        books = [
+            Book("Канонический", "А", 1, id="0f8fad5b-d9cb-469f-a165-70867728950e"),
+            Book("Заглавные", "А", 2, id="0F8FAD5B-D9CB-469F-A165-70867728950E"),
+            Book("Нулевой", "А", 3, id="00000000-0000-0000-0000-000000000000"),
+            Book("Пробел", "А", 4, id="0f8fad5b-d9cb-469f-a165-7086772895 e"),
+            Book("Пустой", "А", 5, id=""),
+            Book("Свой", "А", 6, id="custom-id"),
+            Book("Ещё канонический", "А", 7, id="00000000-0000-0000-0000-000000000001"),
+        ]
+        self.storage.save_books(books)
+
+        self.assertEqual(self.storage.load_books(), books)
+        for book in books:
+            self.assertEqual(self.storage.get_book(book.id), book)
+        self.assertIsNone(self.storage.get_book("0f8fad5b-d9cb-469f-a165-70867728950f"))
+
+        canonical = [Book("Книга", "Автор", 2000) for _ in range(100)]
+        self.storage.save_books(canonical)
+        packed_size = self.file_path.stat().st_size
+        self.storage.save_books([Book(book.title, book.author, book.year, id=book.id.upper()) for book in canonical])
+        # Строкой записываются все 36 символов, а место в столбце UUID остаётся нулевым
+        self.assertEqual(self.file_path.stat().st_size - packed_size, 100 * 36)
+
+    def test_reads_version_1(self) -> None:
+        """
+        Проверяет чтение файла версии 1, где все id хранятся строками
+        """
+        ids = [book.id.encode("utf-8") for book in self.books]
+        sections = [
+            *_strings(ids),
+            *_strings([book.title.encode("utf-8") for book in self.books]),
+            *_strings([book.author.encode("utf-8") for book in self.books]),
+            _to_bytes(array("i", (book.year for book in self.books))),
+            bytes(STATUS_CODES[book.status] for book in self.books),
+            _to_bytes(array("I", sorted(range(len(self.books)), key=ids.__getitem__))),
+        ]
+        parts, offsets, position = [], [], HEADERS[1].size
+        for section in sections:
+            parts.append(b"\x00" * (-position % 8))
+            position += -position % 8
+            offsets.append(position)
+            parts.append(section)
+            position += len(section)
+        self.file_path.write_bytes(HEADERS[1].pack(MAGIC, 1, len(self.books), *offsets) + b"".join(parts))
+
+        storage = BinaryStorage(str(self.file_path))
+        self.assertEqual(storage.load_books(), self.books)
+        for book in self.books:
+            self.assertEqual(storage.get_book(book.id), book)
+        storage.apply_changes([Change(ChangeType.STATUS, "custom-id", status=BookStatus.ISSUED)])
+        self.assertEqual(storage.get_book("custom-id").status, BookStatus.ISSUED)
+
+    def test_search_books(self) -> None:
+        """
+        Проверяет фильтры по столбцам и по строкам
+        """
+        self.assertEqual(self.storage.search_books(author="толстой", year_from=1870), [self.books[2]])
+        self.assertEqual(self.storage.search_books(status=BookStatus.ISSUED), [self.books[1]])
+        self.assertEqual(self.storage.search_books(year=1869, year_to=1800), [])
+        self.assertEqual(self.storage.search_books(title="МИР"), [self.books[0]])
+
+    def test_count_by_status(self) -> None:
+        self.assertEqual(
+            self.storage.count_by_status(), {BookStatus.AVAILABLE: 3, BookStatus.ISSUED: 1}
+        )
+
+    def test_apply_changes(self) -> None:
+        """
+        Проверяет, что изменения видны после замены файла
+        """
+        self.storage.get_book(self.books[0].id)
+        book = Book(title="Мёртвые души", author="Николай Гоголь", year=1842)
+        self.storage.apply_changes(
+            [
+                Change(ChangeType.ADD, book.id, book=book),
+                Change(ChangeType.REMOVE, self.books[0].id),
+                Change(ChangeType.STATUS, self.books[1].id, status=BookStatus.AVAILABLE),
+            ]
+        )
+
+        self.assertIsNone(self.storage.get_book(self.books[0].id))
+        self.assertEqual(self.storage.get_book(book.id), book)
+        self.assertEqual(self.storage.get_book(self.books[1].id).status, BookStatus.AVAILABLE)
+
+    def test_status_changes_in_place(self) -> None:
+        """
+        Проверяет, что смена статусов не переписывает файл
+        """
+        self.storage.get_book(self.books[0].id)
+        inode = self.file_path.stat().st_ino
+        self.storage.apply_changes(
+            [
+                Change(ChangeType.STATUS, self.books[0].id, status=BookStatus.ISSUED),
+                Change(ChangeType.STATUS, "custom-id", status=BookStatus.ISSUED),
+                Change(ChangeType.STATUS, "unknown", status=BookStatus.ISSUED),
+            ]
+        )
+
+        self.assertEqual(self.file_path.stat().st_ino, inode)
+        self.assertFalse(self.storage.patch_path.exists())
+        self.assertEqual(self.storage.get_book(self.books[0].id).status, BookStatus.ISSUED)
+        self.assertEqual(
+            [book.status for book in BinaryStorage(str(self.file_path)).load_books()],
+            [BookStatus.ISSUED, BookStatus.ISSUED, BookStatus.ISSUED, BookStatus.AVAILABLE],
+        )
+
+    def test_recover_patch(self) -> None:
+        """
+        Проверяет, что пакет статусов, прерванный сбоем, дописывается при открытии,
+        а исправления для заменённого файла отбрасываются
+        """
+        catalogue = self.storage._open()
+        patches = [[catalogue.status_offset + 2, 1], [catalogue.status_offset + 3, 1]]
+        inode = self.file_path.stat().st_ino
+        self.storage.patch_path.write_text(f'{{"inode": {inode}, "patches": {patches}}}', encoding="utf-8")
+
+        storage = BinaryStorage(str(self.file_path))
+        self.assertFalse(storage.patch_path.exists())
+        self.assertEqual(storage.get_book("custom-id").status, BookStatus.ISSUED)
+        self.assertEqual(storage.get_book(self.books[3].id).status, BookStatus.ISSUED)
+
+        storage.patch_path.write_text(f'{{"inode": {inode + 1}, "patches": {patches[:1]}}}', encoding="utf-8")
+        storage.apply_changes([Change(ChangeType.STATUS, "custom-id", status=BookStatus.AVAILABLE)])
+        self.assertFalse(storage.patch_path.exists())
+        self.assertEqual(storage.get_book("custom-id").status, BookStatus.AVAILABLE)
+
+    def test_damaged_file(self) -> None:
+        """
+        Проверяет ошибку для файла другого формата
+        """
+        self.file_path.write_text("[]", encoding="utf-8")
+        with self.assertRaises(RuntimeError):
+            self.storage.load_books()
+
+    def test_service(self) -> None:
+        """
+        Проверяет работу сервиса поверх двоичного хранилища
+        """
+        service = LibraryService(self.storage)
+        service.update_book_status(self.books[0].id, "выдана")
+
+        found = service.search_books(status="выдана", author="Толстой")
+        self.assertEqual([book.id for book in found], [self.books[0].id])
+        self.assertEqual(service.find_books("каренина"), [self.books[2]])
+
+
+class TestConvert(TestCase):
+    def test_round_trip(self) -> None:
+        """
+        Проверяет преобразование JSON -> двоичный формат -> JSON
+        """
+        books = [
+            Book(title='Кавычки " и \\ слэш', author="Лев Толстой", year=1869),
+            Book(title="Test", author="Author", year=1999, status=BookStatus.ISSUED),
+        ]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source = Path(temp_dir) / "books.json"
+            Storage(str(source)).save_books(books)
+
+            self.assertEqual(convert(str(source), str(Path(temp_dir) / "books.bin")), 2)
+            self.assertEqual(convert(str(Path(temp_dir) / "books.bin"), str(Path(temp_dir) / "copy.json")), 2)
+
+            self.assertEqual(BinaryStorage(str(Path(temp_dir) / "books.bin")).load_books(), books)
+            self.assertEqual(
+                (Path(temp_dir) / "copy.json").read_text(encoding="utf-8"),
+                source.read_text(encoding="utf-8"),
+            )
+
+    def test_missing_source(self) -> None:
+        with self.assertRaises(ValueError):
+            convert("missing.json", "books.bin")
@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+from src.catalogue import Catalogue
+from src.models import Book, BookFilter, BookStatus
+from src.paging import Order
+
+
+class TestCatalogue(TestCase):
+    def setUp(self) -> None:
+        self.books = [
+            Book(title="Python Basics", author="John Smith", year=2020),
+            Book(title="Advanced Python", author="Margo", year=2021),
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+            Book(title="Анна Каренина", author="Лев Толстой", year=1877),
+        ]
+        self.catalogue = Catalogue(self.books)
+
+    def test_get_by_id(self) -> None:
+        """
+        Проверяет поиск книги по id
+        """
+        self.assertIs(self.catalogue.get(self.books[2].id), self.books[2])
+        self.assertIsNone(self.catalogue.get("none_existent_id"))
+
+    def test_search_by_author_is_case_insensitive_substring(self) -> None:
+        """
+        Проверяет поиск по подстроке автора без учёта регистра
+        """
+        result = self.catalogue.search(author="толст")
+        self.assertEqual(result, [self.books[2], self.books[3]])
+
+    def test_search_by_year_range(self) -> None:
+        """
+        Проверяет поиск по диапазону лет
+        """
+        self.assertEqual(
+            self.catalogue.search(year_from=1870, year_to=2020), [self.books[0], self.books[3]]
+        )
+        self.assertEqual(self.catalogue.search(year_from=2021), [self.books[1]])
+        self.assertEqual(self.catalogue.search(year_to=1869), [self.books[2]])
+
+    def test_search_combined_filters(self) -> None:
+        """
+        Проверяет пересечение нескольких критериев
+        """
+        result = self.catalogue.search(title="python", year=2021)
+        self.assertEqual(result, [self.books[1]])
+
+    def test_remove_updates_indexes(self) -> None:
+        """
+        Проверяет, что удалённая книга пропадает из всех индексов
+        """
+        removed = self.catalogue.remove(self.books[2].id)
+
+        self.assertIs(removed, self.books[2])
+        self.assertEqual(len(self.catalogue), 3)
+        self.assertEqual(self.catalogue.search(year=1869), [])
+        self.assertEqual(self.catalogue.search(year_to=1900), [self.books[3]])
+        self.assertEqual(self.catalogue.search(author="Лев"), [self.books[3]])
+        self.assertIsNone(self.catalogue.remove(self.books[2].id))
+
+    def test_set_status_updates_index(self) -> None:
+        """
+        Проверяет, что смена статуса отражается в индексе статусов
+        """
+        self.catalogue.set_status(self.books[0].id, BookStatus.ISSUED)
+
+        self.assertEqual(self.catalogue.search(status=BookStatus.ISSUED), [self.books[0]])
+        self.assertEqual(len(self.catalogue.search(status=BookStatus.AVAILABLE)), 3)
+
+    def test_page_follows_changes(self) -> None:
+        """
+        Проверяет, что страница начинается после ключа и порядок следует за изменениями
+        """
+        order = Order("title")
+        self.assertEqual(self.catalogue.page(order, None, 2, BookFilter()), [self.books[1], self.books[0]])
+        after = order.key(self.books[0])
+        self.assertEqual(self.catalogue.page(order, after, None, BookFilter()), [self.books[3], self.books[2]])
+
+        new_book = Book(title="Бесы", author="Фёдор Достоевский", year=1872)
+        self.catalogue.add(new_book)
+        self.catalogue.remove(self.books[3].id)
+        self.assertEqual(self.catalogue.page(order, after, None, BookFilter()), [new_book, self.books[2]])
+        self.assertEqual(
+            self.catalogue.page(Order("year", True), None, 2, BookFilter(year_to=2000)), [new_book, self.books[2]]
+        )
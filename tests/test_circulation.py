@@ -0,0 +1,165 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from src.circulation import DAY, Circulation, Loan, LoanEvent, LoanEventType
+from src.models import Book, BookStatus, Change, ChangeType
+from src.services import LibraryService
+from src.storage import Storage
+
+
+def status(book_id: str, book_status: BookStatus) -> Change:
+    return Change(ChangeType.STATUS, book_id, status=book_status)
+
+
+class TestCirculation(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = 1_700_000_000
+        self.circulation = Circulation(
+            str(Path(self.temp_dir.name) / "books.json.loans"), clock=lambda: self.now
+        )
+
+    def tearDown(self) -> None:
+        self.circulation.close()
+        self.temp_dir.cleanup()
+
+    def test_history(self) -> None:
+        """
+        Проверяет, что выдачи и возвраты записываются по книге, начиная с последнего
+        """
+        self.circulation.record([status("a", BookStatus.ISSUED)], borrower="Иванов")
+        self.now += DAY
+        self.circulation.record([status("a", BookStatus.AVAILABLE), status("b", BookStatus.ISSUED)])
+
+        self.assertEqual(
+            self.circulation.history("a"),
+            [
+                LoanEvent("a", LoanEventType.RETURN, self.now, "Иванов"),
+                LoanEvent("a", LoanEventType.ISSUE, self.now - DAY, "Иванов"),
+            ],
+        )
+        self.assertEqual(len(self.circulation.history("a", limit=1)), 1)
+        self.assertEqual(self.circulation.history("unknown"), [])
+
+    def test_repeated_status_is_not_an_event(self) -> None:
+        """
+        Проверяет, что повторная выдача и возврат без выдачи не попадают в журнал
+        """
+        changes = [
+            status("a", BookStatus.AVAILABLE),
+            status("a", BookStatus.ISSUED),
+            status("a", BookStatus.ISSUED),
+        ]
+        self.assertEqual(self.circulation.record(changes), 1)
+        self.assertEqual([event.type for event in self.circulation.history("a")], [LoanEventType.ISSUE])
+
+    def test_overdue(self) -> None:
+        """
+        Проверяет, что просроченные выдачи выбираются по сроку возврата,
+        а возврат и удаление книги закрывают выдачу
+        """
+        self.circulation.record([status("a", BookStatus.ISSUED)], days=1)
+        self.circulation.record([status("b", BookStatus.ISSUED), status("c", BookStatus.ISSUED)])
+        self.circulation.record([status("d", BookStatus.ISSUED)], days=30)
+        self.assertEqual(self.circulation.overdue(), [])
+
+        self.now += 20 * DAY
+        self.assertEqual(
+            self.circulation.overdue(),
+            [
+                Loan("a", None, self.now - 20 * DAY, self.now - 19 * DAY),
+                Loan("b", None, self.now - 20 * DAY, self.now - 6 * DAY),
+                Loan("c", None, self.now - 20 * DAY, self.now - 6 * DAY),
+            ],
+        )
+        self.assertEqual(len(self.circulation.overdue(limit=2)), 2)
+
+        self.circulation.record([status("a", BookStatus.AVAILABLE), Change(ChangeType.REMOVE, "b")])
+        self.assertEqual([loan.book_id for loan in self.circulation.overdue()], ["c"])
+
+    def test_top(self) -> None:
+        """
+        Проверяет счётчики выдач за всё время и за период
+        """
+        for _ in range(3):
+            self.circulation.record([status("a", BookStatus.ISSUED)])
+            self.circulation.record([status("a", BookStatus.AVAILABLE)])
+        self.now += 10 * DAY
+        for book_id in ("b", "b", "c"):
+            self.circulation.record([status(book_id, BookStatus.ISSUED)])
+            self.circulation.record([status(book_id, BookStatus.AVAILABLE)])
+
+        self.assertEqual(self.circulation.top(), [("a", 3), ("b", 2), ("c", 1)])
+        self.assertEqual(self.circulation.top(limit=1), [("a", 3)])
+        self.assertEqual(self.circulation.top(since=self.now - DAY), [("b", 2), ("c", 1)])
+
+    def test_persistence(self) -> None:
+        """
+        Проверяет, что журнал сохраняется между открытиями
+        """
+        self.circulation.record([status("a", BookStatus.ISSUED)])
+        self.circulation.close()
+
+        reopened = Circulation(str(self.circulation.file_path))
+        self.assertEqual([loan.book_id for loan in reopened.overdue(now=self.now + 30 * DAY)], ["a"])
+        reopened.close()
+
+
+class TestServiceCirculation(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.now = 1_700_000_000
+        self.circulation = Circulation(
+            str(Path(self.temp_dir.name) / "books.json.loans"), clock=lambda: self.now
+        )
+        self.service = LibraryService(
+            Storage(str(Path(self.temp_dir.name) / "books.json")), circulation=self.circulation
+        )
+        self.books = [Book("Война и мир", "Лев Толстой", 1869), Book("Python Basics", "John", 2020)]
+        self.service.add_books(self.books)
+
+    def tearDown(self) -> None:
+        self.circulation.close()
+        self.temp_dir.cleanup()
+
+    def test_status_changes_are_recorded(self) -> None:
+        """
+        Проверяет, что смены статуса через сервис попадают в журнал выдач
+        """
+        self.service.update_book_status(self.books[0].id, "выдана", borrower="Иванов", days=7)
+        self.service.update_statuses([(self.books[1].id, "выдана")])
+        self.now += 10 * DAY
+
+        overdue = self.service.overdue_loans()
+        self.assertEqual([(book.id, loan.borrower) for book, loan in overdue], [(self.books[0].id, "Иванов")])
+
+        self.service.update_book_status(self.books[0].id, "в наличии")
+        self.assertEqual(
+            [event.type for event in self.service.book_history(self.books[0].id)],
+            [LoanEventType.RETURN, LoanEventType.ISSUE],
+        )
+        self.assertEqual(
+            sorted((book.id, count) for book, count in self.service.top_books(days=30)),
+            sorted([(self.books[0].id, 1), (self.books[1].id, 1)]),
+        )
+
+        self.service.remove_book(self.books[1].id)
+        self.now += 30 * DAY
+        self.assertEqual(self.service.overdue_loans(), [])
+
+    def test_failed_change_is_not_recorded(self) -> None:
+        """
+        Проверяет, что отклонённый пакет изменений не попадает в журнал выдач
+        """
+        with self.assertRaises(ValueError):
+            self.service.update_statuses([(self.books[0].id, "выдана"), ("unknown", "выдана")])
+        self.assertEqual(self.service.book_history(self.books[0].id), [])
+
+    def test_without_circulation(self) -> None:
+        """
+        Проверяет ошибку запросов к журналу выдач, если он не подключён
+        """
+        service = LibraryService(self.service.storage)
+        with self.assertRaises(ValueError):
+            service.top_books()
@@ -1,8 +1,17 @@
+import io
+import json
+import os
+import tempfile
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+from src.circulation import Loan, LoanEvent, LoanEventType
+from src.facets import FacetCounts
+from src.importer import read_books
+from src.models import Book, BookStatus
+from src.paging import Page
 from src.services import LibraryService
-from src.cli import setup_parser, execute_command
+from src.cli import setup_parser, execute_command, print_books, print_books_table
 
 
 class TestSetupParser(TestCase):
@@ -29,10 +38,51 @@ class TestSetupParser(TestCase):
         self.assertEqual(args.title, "Book")
         self.assertIsNone(args.author)
         self.assertIsNone(args.year)
+        self.assertIsNone(args.year_from)
+        self.assertIsNone(args.year_to)
+        self.assertIsNone(args.status)
+
+    def test_search_command_with_range(self) -> None:
+        args = self.parser.parse_args(
+            ["search", "--year-from", "1990", "--year-to", "2000", "--status", "выдана"]
+        )
+        self.assertEqual(args.year_from, 1990)
+        self.assertEqual(args.year_to, 2000)
+        self.assertEqual(args.status, "выдана")
+
+    def test_find_command(self) -> None:
+        args = self.parser.parse_args(["find", "война мир", "--limit", "5"])
+        self.assertEqual(args.command, "find")
+        self.assertEqual(args.query, "война мир")
+        self.assertEqual(args.limit, 5)
+
+    def test_import_command(self) -> None:
+        args = self.parser.parse_args(["import", "-", "--format", "csv"])
+        self.assertEqual(args.command, "import")
+        self.assertEqual(args.path, "-")
+        self.assertEqual(args.format, "csv")
+
+    def test_batch_command(self) -> None:
+        args = self.parser.parse_args(["batch"])
+        self.assertEqual(args.command, "batch")
+        self.assertEqual(args.path, "-")
 
     def test_list_command(self) -> None:
         args = self.parser.parse_args(["list"])
         self.assertEqual(args.command, "list")
+        self.assertIsNone(args.limit)
+        self.assertEqual(args.offset, 0)
+        self.assertEqual(args.format, "table")
+
+    def test_list_command_with_pages(self) -> None:
+        args = self.parser.parse_args(["list", "--limit", "20", "--offset", "40", "--format", "jsonl"])
+        self.assertEqual(args.limit, 20)
+        self.assertEqual(args.offset, 40)
+        self.assertEqual(args.format, "jsonl")
+
+    def test_negative_offset(self) -> None:
+        with patch("sys.stderr", io.StringIO()), self.assertRaises(SystemExit):
+            self.parser.parse_args(["list", "--offset", "-1"])
 
     def test_update_command(self) -> None:
         args = self.parser.parse_args(
@@ -41,6 +91,43 @@ class TestSetupParser(TestCase):
         self.assertEqual(args.command, "update")
         self.assertEqual(args.id, "12345")
         self.assertEqual(args.status, "в наличии")
+        self.assertIsNone(args.borrower)
+
+    def test_circulation_commands(self) -> None:
+        args = self.parser.parse_args(
+            ["update", "--id", "1", "--status", "выдана", "--borrower", "Иванов", "--days", "7"]
+        )
+        self.assertEqual((args.borrower, args.days), ("Иванов", 7))
+        args = self.parser.parse_args(["history", "--id", "1"])
+        self.assertEqual((args.command, args.limit), ("history", 20))
+        args = self.parser.parse_args(["top", "--days", "30"])
+        self.assertEqual((args.command, args.days, args.limit), ("top", 30, 10))
+
+    def test_dedupe_options(self) -> None:
+        args = self.parser.parse_args(["dedupe", "--fuzzy", "--threshold", "0.5"])
+        self.assertEqual((args.fuzzy, args.remove, args.threshold), (True, False, 0.5))
+        with patch("sys.stderr", new_callable=io.StringIO), self.assertRaises(SystemExit):
+            self.parser.parse_args(["dedupe", "--fuzzy", "--remove"])
+        with patch("sys.stderr", new_callable=io.StringIO), self.assertRaises(SystemExit):
+            self.parser.parse_args(["dedupe", "--threshold", "2"])
+
+    def test_stats_command_options(self) -> None:
+        args = self.parser.parse_args(["--stats", "stats", "--year-step", "100", "--authors", "5"])
+        self.assertEqual((args.stats, args.command), ("-", "stats"))
+        self.assertEqual((args.year_step, args.authors, args.format), (100, 5, "table"))
+        with patch("sys.stderr", new_callable=io.StringIO), self.assertRaises(SystemExit):
+            self.parser.parse_args(["stats", "--year-step", "0"])
+
+    def test_stats_options(self) -> None:
+        args = self.parser.parse_args(["--stats", "list"])
+        self.assertEqual((args.stats, args.command), ("-", "list"))
+        args = self.parser.parse_args(["--stats-file", "stats.jsonl", "--profile", "list.prof", "list"])
+        self.assertEqual((args.stats, args.profile), ("stats.jsonl", "list.prof"))
+
+    def test_storage_option(self) -> None:
+        args = self.parser.parse_args(["--storage", "journal", "compact"])
+        self.assertEqual(args.storage, "journal")
+        self.assertEqual(args.command, "compact")
 
 
 class TestExecuteCommand(TestCase):
@@ -53,10 +140,74 @@ class TestExecuteCommand(TestCase):
         args.title = "Book"
         args.author = "Author"
         args.year = 1999
+        args.duplicates = "add"
 
         execute_command(args, self.library_service)
 
         self.library_service.add_book.assert_called_once_with("Book", "Author", 1999)
+        self.library_service.find_duplicates.assert_not_called()
+
+    def test_add_duplicates(self) -> None:
+        """
+        Проверяет предупреждение о дубликате и отказ от добавления при merge
+        """
+        existing = Book("Book", "Author", 1999)
+        self.library_service.find_duplicates.return_value = [existing]
+        self.library_service.add_book.return_value = Book("Book", "Author", 1999)
+        args = self.parser_args("add", "--title", "book", "--author", "Author", "--year", "1999", "--duplicates", "warn")
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            execute_command(args, self.library_service)
+        self.assertIn(f"Внимание: такая книга уже есть в библиотеке: {existing.id}", output.getvalue())
+
+        self.library_service.add_book.return_value = existing
+        args.duplicates = "merge"
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            execute_command(args, self.library_service)
+        self.library_service.add_book.assert_called_with("book", "Author", 1999, merge_duplicates=True)
+        self.assertEqual(output.getvalue(), f"Книга уже есть в библиотеке: {existing.id}.\n")
+
+    def test_dedupe_command(self) -> None:
+        """
+        Проверяет вывод групп дубликатов и удаление лишних книг
+        """
+        first, second = Book("Book", "Author", 1999), Book("book", "author", 1999)
+        self.library_service.duplicate_groups.return_value = [[first, second]]
+        self.library_service.remove_books.return_value = 1
+        args = self.parser_args("dedupe")
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            execute_command(args, self.library_service)
+        self.library_service.duplicate_groups.assert_called_once_with(False, 0.8)
+        self.assertIn(second.id, output.getvalue())
+        self.assertIn("Групп дубликатов: 1, лишних книг: 1.", output.getvalue())
+        self.library_service.remove_books.assert_not_called()
+
+        args = self.parser_args("dedupe", "--remove")
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            execute_command(args, self.library_service)
+        self.library_service.remove_books.assert_called_once_with([second.id])
+        self.assertIn("Удалено дубликатов: 1.", output.getvalue())
+
+    def test_stats_command(self) -> None:
+        """
+        Проверяет вывод сводки таблицами и в JSON
+        """
+        self.library_service.facets.return_value = FacetCounts.from_counts(
+            {"в наличии": 2, "выдана": 1}, {1869: 2, 1877: 1}, {"Лев Толстой": 3}
+        )
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            execute_command(self.parser_args("stats"), self.library_service)
+        self.library_service.facets.assert_called_once_with(10, 10)
+        self.assertIn("Всего книг: 3", output.getvalue())
+        self.assertIn("| 1860–1869   | 2         |", output.getvalue())
+        self.assertIn("| Лев Толстой", output.getvalue())
+
+        with patch("sys.stdout", new_callable=io.StringIO) as output:
+            execute_command(self.parser_args("stats", "--format", "json"), self.library_service)
+        self.assertEqual(json.loads(output.getvalue())["year_ranges"], {"1860": 2, "1870": 1})
+
+    @staticmethod
+    def parser_args(*argv: str):
+        return setup_parser().parse_args(argv)
 
     def test_remove_command(self) -> None:
         args = MagicMock()
@@ -73,27 +224,274 @@ class TestExecuteCommand(TestCase):
         args.title = "Book"
         args.author = None
         args.year = None
+        args.year_from = None
+        args.year_to = None
+        args.status = None
+        args.limit = None
+        args.offset = 0
+        args.order_by = None
+        args.desc = False
+        args.after = None
+        args.format = "table"
+
+        execute_command(args, self.library_service)
+
+        self.library_service.iter_search_books.assert_called_once_with(
+            "Book", None, None, year_from=None, year_to=None, status=None
+        )
+
+    def test_find_command(self) -> None:
+        args = MagicMock()
+        args.command = "find"
+        args.query = "Book"
+        args.limit = 10
+        args.offset = 0
+        args.format = "table"
+
+        execute_command(args, self.library_service)
+
+        self.library_service.find_books.assert_called_once_with("Book", 10)
+
+    def test_find_command_with_offset(self) -> None:
+        args = MagicMock()
+        args.command = "find"
+        args.query = "Book"
+        args.limit = 2
+        args.offset = 1
+        args.format = "jsonl"
+        books = [Book(title=f"Book {i}", author="Author", year=2000) for i in range(3)]
+        self.library_service.find_books.return_value = books
+
+        with patch("sys.stdout", io.StringIO()) as stdout:
+            execute_command(args, self.library_service)
+
+        self.library_service.find_books.assert_called_once_with("Book", 3)
+        self.assertEqual(
+            [json.loads(line)["id"] for line in stdout.getvalue().splitlines()],
+            [books[1].id, books[2].id],
+        )
+
+    def test_migrate_command(self) -> None:
+        args = MagicMock()
+        args.command = "migrate"
+        args.source = "data/books.json"
+        self.library_service.migrate_from_json.return_value = 3
 
         execute_command(args, self.library_service)
 
-        self.library_service.search_books.assert_called_once_with("Book", None, None)
+        self.library_service.migrate_from_json.assert_called_once_with("data/books.json")
+
+    def test_import_command(self) -> None:
+        args = MagicMock()
+        args.command = "import"
+        args.format = None
+        self.library_service.add_books.side_effect = lambda books: len(list(books))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            args.path = os.path.join(temp_dir, "books.csv")
+            with open(args.path, "w", encoding="utf-8") as file:
+                file.write("title,author,year\nBook,Author,1999\n")
+
+            execute_command(args, self.library_service)
+
+        self.library_service.add_books.assert_called_once()
 
     def test_list_command(self) -> None:
         args = MagicMock()
         args.command = "list"
+        args.limit = None
+        args.offset = 0
+        args.order_by = None
+        args.desc = False
+        args.after = None
+        args.format = "table"
 
         execute_command(args, self.library_service)
 
-        self.library_service.get_all_books.assert_called_once()
+        self.library_service.iter_books.assert_called_once()
+
+    def test_list_command_with_pages(self) -> None:
+        """
+        Проверяет, что list выводит только страницу и не читает книги после неё
+        """
+        args = MagicMock()
+        args.command = "list"
+        args.limit = 2
+        args.offset = 1
+        args.order_by = None
+        args.desc = False
+        args.after = None
+        args.format = "csv"
+        books = [Book(title=f"Book {i}", author="Author", year=2000) for i in range(5)]
+        iterator = iter(books)
+        self.library_service.iter_books.return_value = iterator
+
+        with patch("sys.stdout", io.StringIO()) as stdout:
+            execute_command(args, self.library_service)
+
+        output = stdout.getvalue()
+        self.assertEqual([book.id for book in read_books(io.StringIO(output), "csv")], [books[1].id, books[2].id])
+        self.assertEqual(next(iterator), books[3])
 
     def test_update_command(self) -> None:
         args = MagicMock()
         args.command = "update"
         args.id = "12345"
         args.status = "в наличии"
+        args.borrower = None
+        args.days = None
 
         execute_command(args, self.library_service)
 
         self.library_service.update_book_status.assert_called_once_with(
-            "12345", "в наличии"
+            "12345", "в наличии", None, None
+        )
+
+    def test_history_command(self) -> None:
+        args = MagicMock()
+        args.command = "history"
+        args.id = "12345"
+        args.limit = 20
+        self.library_service.book_history.return_value = [
+            LoanEvent("12345", LoanEventType.ISSUE, 1_700_000_000, "Иванов")
+        ]
+
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            execute_command(args, self.library_service)
+
+        self.library_service.book_history.assert_called_once_with("12345", 20)
+        self.assertIn("| выдача   | Иванов", output.getvalue())
+
+    def test_overdue_and_top_commands(self) -> None:
+        book = Book("Война и мир", "Лев Толстой", 1869, BookStatus.ISSUED)
+        self.library_service.overdue_loans.return_value = [(book, Loan(book.id, None, 0, 0))]
+        self.library_service.top_books.return_value = [(book, 3)]
+
+        args = MagicMock()
+        args.command = "overdue"
+        args.limit = None
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            execute_command(args, self.library_service)
+        self.assertIn(f"| {book.id} | Война и мир", output.getvalue())
+
+        args = MagicMock()
+        args.command = "top"
+        args.days = 30
+        args.limit = 5
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            execute_command(args, self.library_service)
+        self.library_service.top_books.assert_called_once_with(30, 5)
+        self.assertIn("| Лев Толстой          | 3       |", output.getvalue())
+
+    def test_export_and_restore_commands(self) -> None:
+        """
+        Проверяет, что снимок из export восстанавливается командой restore
+        """
+        books = [Book("Book 1", "Author", 1999), Book("Book 2", "Author", 2000)]
+        self.library_service.iter_books.return_value = iter(books)
+        self.library_service.replace_books.side_effect = len
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "backup")
+            with patch("sys.stdout", new=io.StringIO()) as output:
+                execute_command(self.parser_args("export", path, "--workers", "1"), self.library_service)
+                execute_command(self.parser_args("restore", path, "--check", "--workers", "1"), self.library_service)
+                execute_command(self.parser_args("restore", path, "--workers", "1"), self.library_service)
+
+        self.library_service.replace_books.assert_called_once_with(books)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("Экспортировано книг: 2, фрагментов: 1 за "))
+        self.assertEqual(lines[1], "Снимок цел, книг: 2.")
+        self.assertTrue(lines[2].startswith("Восстановлено книг: 2 за "))
+
+    def test_ordered_pages(self) -> None:
+        """
+        Проверяет вывод страницы в порядке --order-by и курсор следующей страницы в stderr
+        """
+        books = [Book("Book 1", "Author", 1999), Book("Book 2", "Author", 2000)]
+        self.library_service.page_books.return_value = Page(books, "cursor-2")
+        with patch("sys.stdout", new=io.StringIO()) as output, patch("sys.stderr", new=io.StringIO()) as errors:
+            args = self.parser_args(
+                "search", "--author", "auth", "--order-by", "year", "--desc",
+                "--limit", "1", "--offset", "1", "--after", "cursor-1", "--format", "csv",
+            )
+            execute_command(args, self.library_service)
+        self.library_service.page_books.assert_called_once_with(
+            "-year", "cursor-1", 2, title=None, author="auth", year=None, year_from=None, year_to=None, status=None
+        )
+        self.assertEqual(output.getvalue().splitlines()[1:], [f"{books[1].id},Book 2,Author,2000,в наличии"])
+        self.assertEqual(errors.getvalue(), "Следующая страница: --after cursor-2\n")
+
+        with patch("sys.stdout", new=io.StringIO()) as output:
+            execute_command(self.parser_args("list", "--after", "cursor-2"), self.library_service)
+        self.assertEqual(output.getvalue(), "Ошибка: --desc и --after используются вместе с --order-by\n")
+
+    def test_ordered_zero_limit(self) -> None:
+        """
+        Проверяет, что --limit 0 с --order-by, как и без него, даёт пустую выдачу
+        """
+        self.library_service.page_books.side_effect = ValueError("Размер страницы должен быть положительным")
+        for order in ([], ["--order-by", "title"]):
+            with self.subTest(order=order), patch("sys.stdout", new=io.StringIO()) as output:
+                execute_command(self.parser_args("list", *order, "--limit", "0"), self.library_service)
+                self.assertEqual(output.getvalue(), "Нет книг для отображения.\n")
+        self.library_service.page_books.assert_not_called()
+
+    def test_compact_command(self) -> None:
+        args = MagicMock()
+        args.command = "compact"
+
+        execute_command(args, self.library_service)
+
+        self.library_service.compact_storage.assert_called_once()
+
+
+class TestPrintBooks(TestCase):
+    def setUp(self) -> None:
+        self.books = [
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+            Book(
+                title="Очень длинное название книги, которое не помещается в столбец",
+                author='Автор с "кавычками", запятой',
+                year=2020,
+                status=BookStatus.ISSUED,
+            ),
+        ]
+
+    def test_table(self) -> None:
+        """
+        Проверяет выравнивание столбцов и обрезку длинных значений многоточием
+        """
+        output = io.StringIO()
+        print_books_table(self.books, output)
+        lines = output.getvalue().splitlines()
+
+        self.assertEqual(len(lines), 6)
+        self.assertEqual(len({len(line) for line in lines}), 1)
+        self.assertIn("| Война и мир                    | Лев Толстой          | 1869   | в наличии  |", lines[3])
+        self.assertIn("| Очень длинное название книги…  | Автор с \"кавычками…  | 2020   | выдана     |", lines[4])
+
+    def test_empty_table(self) -> None:
+        output = io.StringIO()
+        print_books_table([], output)
+        self.assertEqual(output.getvalue(), "Нет книг для отображения.\n")
+
+    def test_jsonl(self) -> None:
+        """
+        Проверяет, что строки JSONL совпадают с json.dumps словаря книги
+        """
+        output = io.StringIO()
+        print_books(self.books, "jsonl", output)
+
+        self.assertEqual(
+            output.getvalue().splitlines(),
+            [json.dumps(book.to_dict(), ensure_ascii=False) for book in self.books],
         )
+
+    def test_csv_round_trip(self) -> None:
+        """
+        Проверяет, что вывод CSV читается импортом без потерь
+        """
+        output = io.StringIO()
+        print_books(self.books, "csv", output)
+
+        self.assertEqual(list(read_books(io.StringIO(output.getvalue()), "csv")), self.books)
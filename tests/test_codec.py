@@ -0,0 +1,20 @@
+import json
+from unittest import TestCase
+
+from src.codec import encode_books
+from src.models import Book, BookStatus
+
+
+class TestEncodeBooks(TestCase):
+    def test_matches_json_dump(self) -> None:
+        """
+        Проверяет, что быстрая сериализация совпадает с json.dumps(..., indent=4)
+        """
+        books = [
+            Book(title='Кавычки " и \\\\ слэш', author="Лев Толстой", year=1869),
+            Book(title="Test\\tBook", author="Author", year=1999, status=BookStatus.ISSUED),
+        ]
+        expected = json.dumps([book.to_dict() for book in books], ensure_ascii=False, indent=4)
+
+        self.assertEqual(encode_books(books), expected)
+        self.assertEqual(encode_books([]), "[]")
@@ -0,0 +1,90 @@
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+from src.catalogue import Catalogue
+from src.columnar import VECTORIZED, ColumnStore
+from src.models import Book, BookStatus
+
+
+class TestColumnStore(TestCase):
+    def setUp(self) -> None:
+        self.books = [
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+            Book(title="Анна Каренина", author="Лев Толстой", year=1877, status=BookStatus.ISSUED),
+            Book(title="Мёртвые души", author="Николай Гоголь", year=1842),
+            Book(title="Python Basics", author="John Smith", year=2020),
+            Book(title="Война и мир", author="Другой автор", year=1869),
+        ]
+        self.store = ColumnStore(self.books)
+
+    def test_counts(self) -> None:
+        """
+        Проверяет подсчёт книг по статусам, годам и авторам
+        """
+        self.assertEqual(self.store.count_by_status(), {BookStatus.AVAILABLE: 4, BookStatus.ISSUED: 1})
+        self.assertEqual(self.store.count_by_year(), {1842: 1, 1869: 2, 1877: 1, 2020: 1})
+        self.assertEqual(list(self.store.count_by_author().items())[0], ("Лев Толстой", 2))
+
+    def test_counts_skip_removed(self) -> None:
+        """
+        Проверяет, что удалённые и изменённые книги учитываются в подсчётах
+        """
+        self.store.remove(self.books[0].id)
+        self.store.set_status(self.books[3].id, BookStatus.ISSUED)
+
+        self.assertEqual(self.store.count_by_status(), {BookStatus.AVAILABLE: 2, BookStatus.ISSUED: 2})
+        self.assertEqual(self.store.count_by_year(), {1842: 1, 1869: 1, 1877: 1, 2020: 1})
+        self.assertEqual(self.store.count_by_author()["Лев Толстой"], 1)
+
+    def test_compaction_keeps_order(self) -> None:
+        """
+        Проверяет, что после вычистки удалённых строк порядок строк сохраняется
+        """
+        for book in self.books[:3]:
+            self.store.remove(book.id)
+
+        self.assertEqual(len(self.store), 2)
+        self.assertLess(self.store.row(self.books[3].id), self.store.row(self.books[4].id))
+        self.assertEqual(self.store.count_by_year(), {1869: 1, 2020: 1})
+
+    @skipUnless(VECTORIZED, "нужен NumPy")
+    def test_select(self) -> None:
+        """
+        Проверяет фильтры по маскам в порядке добавления
+        """
+        self.assertEqual(self.store.select(title="МИР"), [self.books[0], self.books[4]])
+        self.assertEqual(self.store.select(author="толстой", year_from=1870), [self.books[1]])
+        self.assertEqual(self.store.select(status=BookStatus.ISSUED), [self.books[1]])
+        self.assertEqual(self.store.select(year=1869, author="другой"), [self.books[4]])
+        self.assertEqual(self.store.select(author="нет такого"), [])
+        self.assertEqual(ColumnStore().select(year=1869), [])
+
+
+class TestCatalogueSearchPaths(TestCase):
+    def test_paths_agree(self) -> None:
+        """
+        Проверяет, что поиск по индексам и по маскам даёт одинаковый результат
+        """
+        books = [
+            Book(title=f"Книга {i}", author=f"Автор {i % 7}", year=1900 + i % 50,
+                 status=BookStatus.ISSUED if i % 3 == 0 else BookStatus.AVAILABLE)
+            for i in range(300)
+        ]
+        catalogue = Catalogue(books)
+        for book in books[::5]:
+            catalogue.remove(book.id)
+        catalogue.add(books[0])
+
+        queries = [
+            {"author": "автор 3"},
+            {"year_from": 1910, "year_to": 1920, "status": BookStatus.ISSUED},
+            {"title": "книга 1", "year": 1911},
+            {},
+        ]
+        paths = [False, True] if VECTORIZED else [False]
+        for query in queries:
+            results = []
+            for vectorized in paths:
+                with patch("src.catalogue.VECTORIZED", vectorized):
+                    results.append([book.id for book in catalogue.search(**query)])
+            self.assertEqual(results[0], results[-1], query)
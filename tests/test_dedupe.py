@@ -0,0 +1,121 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from src.catalogue import Catalogue
+from src.dedupe import duplicate_groups, fingerprint
+from src.models import Book
+from src.services import LibraryService
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+
+class TestDuplicateGroups(TestCase):
+    def test_fingerprint(self) -> None:
+        """
+        Проверяет, что отпечаток не зависит от регистра, пунктуации, пробелов и «ё»
+        """
+        self.assertEqual(
+            fingerprint("Ёжик  в тумане!", "С. Козлов", 1969),
+            fingerprint("ежик в тумане", "с козлов", 1969),
+        )
+        self.assertNotEqual(fingerprint("Ёжик в тумане", "С. Козлов", 1969), fingerprint("Ёжик в тумане", "С. Козлов", 1970))
+
+    def test_exact_groups(self) -> None:
+        """
+        Проверяет группы точных дубликатов в порядке первых книг
+        """
+        books = [
+            Book("Python Basics", "John", 2020),
+            Book("Война и мир", "Лев Толстой", 1869),
+            Book("война и мир", "лев толстой", 1869),
+            Book("Python basics.", "John", 2020),
+            Book("Python Basics", "John", 2021),
+            Book("Python Basics", "John", 2020),
+        ]
+        self.assertEqual(duplicate_groups(books), [[books[0], books[3], books[5]], [books[1], books[2]]])
+
+    def test_fuzzy_groups(self) -> None:
+        """
+        Проверяет, что похожие книги одного года объединяются, а разные — нет
+        """
+        books = [
+            Book("Преступление и наказание", "Фёдор Достоевский", 1866),
+            Book("Преступление и наказанье", "Федор Достоевский", 1866),
+            Book("Преступление и наказание", "Фёдор Достоевский", 1867),
+            Book("Идиот", "Фёдор Достоевский", 1866),
+        ]
+        self.assertEqual(duplicate_groups(books), [])
+        self.assertEqual(duplicate_groups(books, fuzzy=True), [[books[0], books[1]]])
+        self.assertEqual(duplicate_groups(books, fuzzy=True, threshold=1.0), [])
+
+    def test_fuzzy_groups_keep_book_order(self) -> None:
+        """
+        Проверяет, что книги объединённой группы идут в порядке добавления,
+        а не группами по отпечаткам
+        """
+        books = [
+            Book("Преступление и наказание", "Фёдор Достоевский", 1866),
+            Book("Преступление и наказанье", "Федор Достоевский", 1866),
+            Book("Идиот", "Фёдор Достоевский", 1868),
+            Book("Преступление и наказание", "Фёдор Достоевский", 1866),
+            Book("Идиот", "Фёдор Достоевский", 1868),
+            Book("Преступление и наказанье", "Федор Достоевский", 1866),
+        ]
+        self.assertEqual(
+            duplicate_groups(books, fuzzy=True),
+            [[books[0], books[1], books[3], books[5]], [books[2], books[4]]],
+        )
+
+
+class TestCatalogueDuplicates(TestCase):
+    def test_index_follows_changes(self) -> None:
+        """
+        Проверяет, что индекс отпечатков обновляется при добавлении и удалении книг
+        """
+        first = Book("Анна Каренина", "Лев Толстой", 1877)
+        catalogue = Catalogue([first, Book("Война и мир", "Лев Толстой", 1869)])
+        self.assertEqual(catalogue.find_duplicates("анна каренина", "лев толстой", 1877), [first])
+
+        second = Book("Анна  Каренина", "Лев Толстой", 1877)
+        catalogue.add(second)
+        self.assertEqual(catalogue.find_duplicates("Анна Каренина", "Лев Толстой", 1877), [first, second])
+
+        catalogue.remove(first.id)
+        self.assertEqual(catalogue.find_duplicates("Анна Каренина", "Лев Толстой", 1877), [second])
+
+
+class TestServiceDuplicates(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def check_storage(self, service: LibraryService) -> None:
+        book = service.add_book("Мастер и Маргарита", "Михаил Булгаков", 1967)
+        service.add_book("Белая гвардия", "Михаил Булгаков", 1925)
+
+        self.assertEqual(service.add_book("мастер и маргарита", "михаил булгаков", 1967, merge_duplicates=True), book)
+        self.assertEqual(len(service.get_all_books()), 2)
+
+        copy = service.add_book("Мастер и Маргарита", "Михаил Булгаков", 1967)
+        self.assertEqual(service.find_duplicates("Мастер и маргарита", "Михаил Булгаков", 1967), [book, copy])
+        self.assertEqual(service.duplicate_groups(), [[book, copy]])
+
+        service.remove_book(copy.id)
+        self.assertEqual(service.duplicate_groups(), [])
+
+    def test_catalogue_storage(self) -> None:
+        """
+        Проверяет поиск дубликатов и добавление без дубликата с каталогом в памяти
+        """
+        self.check_storage(LibraryService(Storage(str(Path(self.temp_dir.name) / "books.json"))))
+
+    def test_indexed_storage(self) -> None:
+        """
+        Проверяет поиск дубликатов и добавление без дубликата в SQLite
+        """
+        storage = SQLiteStorage(str(Path(self.temp_dir.name) / "books.db"))
+        self.check_storage(LibraryService(storage))
+        storage.close()
@@ -0,0 +1,125 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.facets import FacetCounts, FacetStore, count_facets
+from src.journal import JournalStorage
+from src.models import Book
+from src.services import LibraryService
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+
+class TestFacetCounts(TestCase):
+    def test_year_ranges(self) -> None:
+        """
+        Проверяет итог, диапазоны лет и порядок статусов сводки
+        """
+        facets = FacetCounts.from_counts({"выдана": 1, "в наличии": 3}, {1877: 1, 1869: 2, 2020: 1}, {"Лев Толстой": 3})
+        self.assertEqual(facets.total, 4)
+        self.assertEqual(facets.statuses, {"в наличии": 3, "выдана": 1})
+        self.assertEqual(facets.years, {1869: 2, 1877: 1, 2020: 1})
+        self.assertEqual(facets.year_ranges, {1860: 2, 1870: 1, 2020: 1})
+        self.assertEqual(FacetCounts.from_counts({}, {1869: 2, 1877: 1}, {}, year_step=100).year_ranges, {1800: 3})
+        self.assertEqual(FacetCounts.from_dict(facets.to_dict()), facets)
+        with self.assertRaises(ValueError):
+            FacetCounts.from_counts({}, {}, {}, year_step=0)
+
+
+class TestServiceFacets(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.books = [
+            Book("Война и мир", "Лев Толстой", 1869),
+            Book("Анна Каренина", "Лев Толстой", 1877),
+            Book("Python Basics", "John", 2020),
+        ]
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return str(Path(self.temp_dir.name) / name)
+
+    def check_incremental(self, service: LibraryService) -> None:
+        service.add_books(self.books)
+        facets = service.facets()
+        self.assertEqual(facets.statuses, {"в наличии": 3, "выдана": 0})
+        self.assertEqual(facets.authors, {"Лев Толстой": 2, "John": 1})
+
+        new_book = service.add_book("Идиот", "Фёдор Достоевский", 1869)
+        service.update_book_status(self.books[0].id, "выдана")
+        service.apply_changes([])
+        service.remove_book(self.books[2].id)
+        service.update_statuses([(new_book.id, "выдана"), (new_book.id, "в наличии")])
+
+        # Счётчики обновлены по изменениям, а не пересчитаны заново
+        with patch("src.facets.count_facets", side_effect=AssertionError):
+            facets = service.facets(year_step=100, authors=1)
+        self.assertEqual(facets.total, 3)
+        self.assertEqual(facets.statuses, {"в наличии": 2, "выдана": 1})
+        self.assertEqual(facets.years, {1869: 2, 1877: 1})
+        self.assertEqual(facets.year_ranges, {1800: 3})
+        self.assertEqual(facets.authors, {"Лев Толстой": 2})
+        self.assertEqual(service.facets(authors=None), LibraryService(service.storage).facets(authors=None))
+
+    def test_catalogue_storage(self) -> None:
+        """
+        Проверяет, что счётчики по срезам следуют за изменениями каталога в памяти
+        """
+        store = FacetStore(self.path("books.json.facets"))
+        self.check_incremental(LibraryService(Storage(self.path("books.json")), facet_store=store))
+        store.close()
+
+    def test_indexed_storage(self) -> None:
+        """
+        Проверяет, что счётчики по срезам следуют за изменениями в SQLite
+        """
+        store = FacetStore(self.path("books.db.facets"))
+        storage = SQLiteStorage(self.path("books.db"))
+        self.check_incremental(LibraryService(storage, facet_store=store))
+        storage.close()
+        store.close()
+
+    def test_persistence_and_outside_changes(self) -> None:
+        """
+        Проверяет, что сохранённые счётчики используются в новом сервисе,
+        а после изменения хранилища в обход сервиса пересчитываются
+        """
+        storage = Storage(self.path("books.json"))
+        store = FacetStore(self.path("books.json.facets"))
+        LibraryService(storage, facet_store=store).add_books(self.books)
+        LibraryService(storage, facet_store=store).facets()
+        store.close()
+
+        store = FacetStore(self.path("books.json.facets"))
+        with patch("src.facets.count_facets", side_effect=AssertionError):
+            self.assertEqual(LibraryService(storage, facet_store=store).facets().total, 3)
+
+        storage.save_books(self.books[:1])
+        self.assertEqual(LibraryService(storage, facet_store=store).facets().total, 1)
+        store.close()
+
+    def test_current_counts_skip_journal_replay(self) -> None:
+        """
+        Проверяет, что при актуальных счётчиках журнал не воспроизводится
+        """
+        storage = JournalStorage(self.path("books.json"))
+        store = FacetStore(self.path("books.json.facets"))
+        LibraryService(storage, facet_store=store).add_books(self.books)
+        LibraryService(storage, facet_store=store).facets()
+
+        with patch.object(JournalStorage, "iter_books", side_effect=AssertionError), \
+                patch.object(JournalStorage, "load_books", side_effect=AssertionError):
+            self.assertEqual(LibraryService(storage, facet_store=store).facets().total, 3)
+        store.close()
+
+    def test_count_facets(self) -> None:
+        """
+        Проверяет подсчёт книг по срезам за один проход
+        """
+        counts = count_facets(self.books)
+        self.assertEqual(counts[("author", "Лев Толстой")], 2)
+        self.assertEqual(counts[("year", 2020)], 1)
+        self.assertEqual(counts[("status", "в наличии")], 3)
@@ -0,0 +1,77 @@
+import io
+from unittest import TestCase
+
+from src.importer import read_books, read_changes
+from src.models import BookStatus, ChangeType
+
+
+class TestReadBooks(TestCase):
+    def test_csv(self) -> None:
+        """
+        Проверяет чтение книг из CSV с заголовком
+        """
+        data = io.StringIO(
+            "title,author,year,status\n"
+            "Война и мир,Лев Толстой,1869,выдана\n"
+            '"Книга, с запятой",Автор,2000,\n'
+        )
+
+        books = list(read_books(data, "csv"))
+
+        self.assertEqual(len(books), 2)
+        self.assertEqual(books[0].status, BookStatus.ISSUED)
+        self.assertEqual(books[1].title, "Книга, с запятой")
+        self.assertEqual(books[1].status, BookStatus.AVAILABLE)
+
+    def test_jsonl_keeps_id(self) -> None:
+        """
+        Проверяет чтение книг из JSONL с сохранением переданного id
+        """
+        data = io.StringIO('{"id": "12345", "title": "Book", "author": "Author", "year": 1999}\n\n')
+
+        books = list(read_books(data, "jsonl"))
+
+        self.assertEqual(len(books), 1)
+        self.assertEqual(books[0].id, "12345")
+
+    def test_invalid_record(self) -> None:
+        """
+        Проверяет, что ошибка в записи сообщает её номер
+        """
+        data = io.StringIO("title,author,year\nBook,Author,1999\nBook,Author,год\n")
+
+        with self.assertRaises(ValueError) as context:
+            list(read_books(data, "csv"))
+
+        self.assertIn("Запись 2", str(context.exception))
+
+
+class TestReadChanges(TestCase):
+    def test_commands(self) -> None:
+        """
+        Проверяет разбор команд добавления, удаления и смены статуса
+        """
+        data = io.StringIO(
+            '{"op": "add", "title": "Book", "author": "Author", "year": 1999}\n'
+            '{"op": "update", "id": "1", "status": "выдана"}\n'
+            '{"op": "remove", "id": "2"}\n'
+        )
+
+        changes = list(read_changes(data))
+
+        self.assertEqual(
+            [change.type for change in changes],
+            [ChangeType.ADD, ChangeType.STATUS, ChangeType.REMOVE],
+        )
+        self.assertEqual(changes[0].book.title, "Book")
+        self.assertEqual(changes[1].status, BookStatus.ISSUED)
+        self.assertEqual(changes[2].book_id, "2")
+
+    def test_unknown_command(self) -> None:
+        """
+        Проверяет, что неизвестная команда вызывает исключение с номером строки
+        """
+        with self.assertRaises(ValueError) as context:
+            list(read_changes(io.StringIO('{"op": "drop"}\n')))
+
+        self.assertIn("Строка 1", str(context.exception))
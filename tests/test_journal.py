@@ -0,0 +1,144 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from src.journal import JournalStorage
+from src.models import Book, BookStatus, Change, ChangeType
+
+
+class TestJournalStorage(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.json"
+        self.storage = JournalStorage(str(self.file_path))
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def add(self, storage: JournalStorage, book: Book) -> None:
+        books = storage.load_books()
+        books.append(book)
+        storage.save_books(books, [Change(ChangeType.ADD, book.id, book=book)])
+
+    def test_changes_are_appended_to_journal(self) -> None:
+        """
+        Проверяет, что изменения дописываются в журнал, а снимок не меняется
+        """
+        book = Book(title="Test Book", author="Author", year=1999)
+        self.add(self.storage, book)
+
+        self.assertEqual(self.file_path.read_text(encoding="utf-8"), "[]")
+        records = self.storage.journal_path.read_text(encoding="utf-8").splitlines()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(json.loads(records[0])["op"], "add")
+
+    def test_replay_in_new_instance(self) -> None:
+        """
+        Проверяет, что новый экземпляр восстанавливает состояние из журнала
+        """
+        first = Book(title="First", author="Author", year=1999)
+        second = Book(title="Second", author="Author", year=2000)
+        self.add(self.storage, first)
+        self.add(self.storage, second)
+        self.storage.save_books([], [Change(ChangeType.REMOVE, first.id)])
+        self.storage.save_books(
+            [], [Change(ChangeType.STATUS, second.id, status=BookStatus.ISSUED)]
+        )
+
+        books = JournalStorage(str(self.file_path)).load_books()
+        self.assertEqual(len(books), 1)
+        self.assertEqual(books[0].id, second.id)
+        self.assertEqual(books[0].status, BookStatus.ISSUED)
+
+    def test_append_does_not_read_books(self) -> None:
+        """
+        Проверяет, что дозапись в журнал не перебирает список книг
+        """
+        def books():
+            raise AssertionError("список книг не должен читаться")
+            yield
+
+        book = Book(title="Test Book", author="Author", year=1999)
+        self.storage.save_books(books(), [Change(ChangeType.ADD, book.id, book=book)])
+
+        self.assertEqual(self.storage.load_books(), [book])
+
+    def test_compact(self) -> None:
+        """
+        Проверяет, что компактирование переносит журнал в снимок
+        """
+        book = Book(title="Test Book", author="Author", year=1999)
+        self.add(self.storage, book)
+        self.storage.compact()
+
+        self.assertEqual(self.storage.journal_path.read_bytes(), b"")
+        snapshot = json.loads(self.file_path.read_text(encoding="utf-8"))
+        self.assertEqual(snapshot[0]["id"], book.id)
+        self.assertEqual(len(JournalStorage(str(self.file_path)).load_books()), 1)
+
+    def test_automatic_compaction(self) -> None:
+        """
+        Проверяет, что журнал компактируется после заданного числа записей
+        """
+        storage = JournalStorage(str(self.file_path), compact_threshold=2)
+        self.add(storage, Book(title="First", author="Author", year=1999))
+        self.add(storage, Book(title="Second", author="Author", year=2000))
+
+        self.assertEqual(storage.journal_path.read_bytes(), b"")
+        self.assertEqual(len(json.loads(self.file_path.read_text(encoding="utf-8"))), 2)
+
+    def test_torn_last_record_is_ignored(self) -> None:
+        """
+        Проверяет, что незавершённая запись в конце журнала отбрасывается
+        """
+        book = Book(title="Test Book", author="Author", year=1999)
+        self.add(self.storage, book)
+        with self.storage.journal_path.open("ab") as file:
+            file.write(b'{"op": "remove", "id"')
+
+        storage = JournalStorage(str(self.file_path))
+        self.assertEqual(len(storage.load_books()), 1)
+        # Читатель не обрезает строку, которую может дописывать другой процесс
+        self.assertTrue(storage.journal_path.read_bytes().endswith(b'"id"'))
+        self.add(storage, Book(title="Second", author="Author", year=2000))
+        self.assertEqual(len(JournalStorage(str(self.file_path)).load_books()), 2)
+
+    def test_loaded_books_are_not_shared(self) -> None:
+        """
+        Проверяет, что изменение загруженных книг без записи не влияет на хранилище
+        """
+        book = Book(title="Test Book", author="Author", year=1999)
+        self.add(self.storage, book)
+
+        self.storage.load_books()[0].status = BookStatus.ISSUED
+        self.assertEqual(self.storage.load_books()[0].status, BookStatus.AVAILABLE)
+
+    def test_snapshot_uses_current_state_after_foreign_append(self) -> None:
+        """
+        Проверяет, что автоматический снимок учитывает записи другого экземпляра
+        """
+        storage = JournalStorage(str(self.file_path), compact_threshold=3)
+        other = JournalStorage(str(self.file_path), compact_threshold=3)
+        first = Book(title="First", author="Author", year=1999)
+        self.add(storage, first)
+        self.add(other, Book(title="Second", author="Author", year=2000))
+
+        third = Book(title="Third", author="Author", year=2001)
+        storage.save_books([first, third], [Change(ChangeType.ADD, third.id, book=third)])
+
+        self.assertEqual(storage.journal_path.read_bytes(), b"")
+        titles = [book["title"] for book in json.loads(self.file_path.read_text(encoding="utf-8"))]
+        self.assertEqual(titles, ["First", "Second", "Third"])
+
+    def test_existing_json_file_is_snapshot(self) -> None:
+        """
+        Проверяет, что существующий books.json читается как снимок
+        """
+        book = Book(title="Test Book", author="Author", year=1999)
+        self.file_path.write_text(
+            json.dumps([book.to_dict()], ensure_ascii=False, indent=4), encoding="utf-8"
+        )
+
+        books = JournalStorage(str(self.file_path)).load_books()
+        self.assertEqual(books, [book])
@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+
+from src.server import create_server
+from src.services import LibraryService
+from src.storage import Storage
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run_main(directory: str, *args: str) -> subprocess.CompletedProcess:
+    """
+    Запускает CLI отдельным процессом с отчётом -X importtime в stderr
+    """
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "src.main", *args],
+        cwd=directory,
+        env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def imported_modules(report: str) -> set[str]:
+    return {line.split("|")[2].strip() for line in report.splitlines() if line.count("|") == 2}
+
+
+class TestStartup(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_help_does_not_import_storage(self) -> None:
+        """
+        Проверяет, что справка не загружает сервис и хранилища и не создаёт файлов
+        """
+        result = run_main(self.temp_dir.name, "--help")
+
+        self.assertIn("Система управления библиотекой", result.stdout)
+        modules = imported_modules(result.stderr)
+        self.assertIn("src.cli", modules)
+        for module in ("src.services", "src.storage", "src.models", "sqlite3", "json"):
+            self.assertNotIn(module, modules)
+        self.assertEqual(list(Path(self.temp_dir.name).iterdir()), [])
+
+    def test_list_imports_only_used_modules(self) -> None:
+        """
+        Проверяет, что вывод списка из JSON-файла не загружает каталог в памяти,
+        полнотекстовый индекс и другие хранилища
+        """
+        (Path(self.temp_dir.name) / "data").mkdir()
+        result = run_main(self.temp_dir.name, "list")
+
+        self.assertIn("Нет книг для отображения.", result.stdout)
+        modules = imported_modules(result.stderr)
+        self.assertIn("src.storage", modules)
+        for module in ("src.catalogue", "src.search", "src.sqlite_storage", "src.binary_storage", "src.client"):
+            self.assertNotIn(module, modules)
+
+    def test_server_list_imports_only_client(self) -> None:
+        """
+        Проверяет, что команда через сервер загружает только клиент, без хранилищ,
+        журнала выдач, счётчиков и sqlite3
+        """
+        storage = Storage(str(Path(self.temp_dir.name) / "books.json"))
+        server = create_server(LibraryService(storage), "127.0.0.1", 0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            result = run_main(self.temp_dir.name, "--server", url, "list")
+        finally:
+            server.shutdown()
+            server.server_close()
+            thread.join()
+
+        self.assertIn("Нет книг для отображения.", result.stdout)
+        modules = imported_modules(result.stderr)
+        self.assertIn("src.client", modules)
+        for module in ("src.services", "src.storage", "src.circulation", "src.facets", "src.paging", "sqlite3", "uuid"):
+            self.assertNotIn(module, modules)
+
+    def test_convert_does_not_create_storage(self) -> None:
+        """
+        Проверяет, что преобразование не создаёт файлы хранилища по умолчанию
+        """
+        source = Path(self.temp_dir.name) / "source.json"
+        source.write_text("[]", encoding="utf-8")
+
+        result = run_main(self.temp_dir.name, "convert", "source.json", "target.bin")
+
+        self.assertIn("Преобразовано книг: 0.", result.stdout)
+        self.assertEqual(
+            sorted(path.name for path in Path(self.temp_dir.name).iterdir()), ["source.json", "target.bin"]
+        )
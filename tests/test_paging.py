@@ -0,0 +1,160 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.binary_storage import BinaryStorage
+from src.models import Book
+from src.paging import Order, Page, decode_cursor, encode_cursor, first_books
+from src.services import LibraryService
+from src.sharded_storage import ShardedStorage
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+
+class TestPaging(TestCase):
+    def setUp(self) -> None:
+        self.books = [
+            Book("б", "Толстой", 1877, id="3"),
+            Book("А", "Пушкин", 1833, id="2"),
+            Book("а", "Гоголь", 1877, id="1"),
+        ]
+
+    def test_order(self) -> None:
+        """
+        Проверяет разбор порядка и ключи книг без учёта регистра с id для равных значений
+        """
+        self.assertEqual(Order.parse("-year"), Order("year", True))
+        self.assertEqual(str(Order.parse("-year")), "-year")
+        self.assertEqual(Order("title").key(self.books[1]), ("а", "2"))
+        self.assertEqual(Order("author").key(self.books[0]), ("толстой", "3"))
+        with self.assertRaises(ValueError):
+            Order.parse("status")
+
+    def test_cursor(self) -> None:
+        """
+        Проверяет, что курсор возвращает ключ только для своего порядка
+        """
+        order = Order("year", True)
+        cursor = encode_cursor(order, (1877, "3"))
+        self.assertEqual(decode_cursor(cursor, order), (1877, "3"))
+        with self.assertRaisesRegex(ValueError, "другого порядка"):
+            decode_cursor(cursor, Order("year"))
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor(Order("title"), ("1877", "3"))[:-2], Order("title"))
+        with self.assertRaises(ValueError):
+            decode_cursor(encode_cursor(Order("year"), ("1877", "3")), Order("year"))
+
+    def test_first_books(self) -> None:
+        """
+        Проверяет отбор первых книг после ключа в обоих направлениях
+        """
+        order = Order("year")
+        self.assertEqual(first_books(self.books, order, None, 2), [self.books[1], self.books[2]])
+        self.assertEqual(first_books(self.books, order, (1877, "1"), 2), [self.books[0]])
+        descending = Order("title", True)
+        self.assertEqual(first_books(self.books, descending, None, None), [self.books[0], self.books[1], self.books[2]])
+        self.assertEqual(first_books(self.books, descending, ("а", "2"), 5), [self.books[2]])
+
+        page = Page.of(self.books, order, 2)
+        self.assertEqual(page.books, self.books[:2])
+        self.assertEqual(decode_cursor(page.cursor, order), (1833, "2"))
+        self.assertIsNone(Page.of(self.books, order, 3).cursor)
+        self.assertEqual(Page.from_dict(page.to_dict()), page)
+
+
+class TestServicePaging(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.books = [
+            Book(f"Книга {number % 7}", f"Автор {number % 3}", 1900 + number % 5, id=f"{number:03d}")
+            for number in range(40)
+        ]
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return str(Path(self.temp_dir.name) / name)
+
+    def expected(self, order_by: str, author: str | None = None) -> list[str]:
+        order = Order.parse(order_by)
+        books = [book for book in self.books if author is None or book.author == author]
+        return [book.id for book in sorted(books, key=order.key, reverse=order.descending)]
+
+    def walk(self, service: LibraryService, order_by: str, limit: int, **criteria) -> list[str]:
+        """
+        Проходит все страницы по курсорам и возвращает id книг
+        """
+        book_ids = []
+        cursor = None
+        while True:
+            page = service.page_books(order_by, cursor, limit, **criteria)
+            book_ids += [book.id for book in page.books]
+            if page.cursor is None:
+                return book_ids
+            cursor = page.cursor
+
+    def check_orders(self, service: LibraryService) -> None:
+        for order_by in ("title", "-title", "author", "-author", "year", "-year"):
+            with self.subTest(order_by=order_by):
+                self.assertEqual(self.walk(service, order_by, 6), self.expected(order_by))
+                self.assertEqual(self.walk(service, order_by, 4, author="автор 1"), self.expected(order_by, "Автор 1"))
+                self.assertEqual([book.id for book in service.search_books(order_by=order_by)], self.expected(order_by))
+
+    def test_storages(self) -> None:
+        """
+        Проверяет обход страниц во всех порядках в каталоге, потоком из файла
+        и в хранилищах с собственными индексами
+        """
+        storages = [
+            Storage(self.path("books.json")),
+            SQLiteStorage(self.path("books.db")),
+            ShardedStorage(self.path("books.shards"), shards=3, workers=1),
+            BinaryStorage(self.path("books.bin")),
+        ]
+        for storage in storages:
+            storage.save_books(self.books)
+            self.check_orders(LibraryService(storage))
+        service = LibraryService(storages[0])
+        service.preload()
+        self.check_orders(service)
+        storages[1].close()
+        storages[2].close()
+
+    def test_cursor_is_stable(self) -> None:
+        """
+        Проверяет, что добавление и удаление книг перед курсором не сдвигает следующую страницу
+        """
+        service = LibraryService(Storage(self.path("books.json")))
+        service.add_books(self.books)
+        page = service.page_books("year", None, 10)
+        next_ids = [book.id for book in service.page_books("year", page.cursor, 10).books]
+
+        service.add_book("Новая книга", "Автор", 1800)
+        service.remove_book(page.books[-1].id)
+        self.assertEqual([book.id for book in service.page_books("year", page.cursor, 10).books], next_ids)
+        self.assertEqual(service.get_all_books(order_by="-year")[-1].title, "Новая книга")
+
+    def test_large_batch_resets_orders(self) -> None:
+        """
+        Проверяет, что после большого пакета порядки строятся заново и остаются верными
+        """
+        service = LibraryService(Storage(self.path("books.json")))
+        service.add_books(self.books[:10])
+        service.page_books("title")
+        with patch("src.services.ORDERS_UPDATE_LIMIT", 5):
+            service.add_books(self.books[10:])
+        self.assertEqual(self.walk(service, "title", 7), self.expected("title"))
+
+    def test_invalid_arguments(self) -> None:
+        """
+        Проверяет ошибки для неверного размера страницы, порядка и курсора
+        """
+        service = LibraryService(Storage(self.path("books.json")))
+        with self.assertRaises(ValueError):
+            service.page_books("title", limit=0)
+        with self.assertRaises(ValueError):
+            service.page_books("rating")
+        with self.assertRaises(ValueError):
+            service.page_books("title", "не курсор")
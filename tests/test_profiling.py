@@ -0,0 +1,99 @@
+import cProfile
+import io
+import json
+import pstats
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from src import profiling
+from src.models import Book
+from src.services import LibraryService
+from src.storage import Storage
+
+
+class TestRecorder(TestCase):
+    def test_timers_and_counters(self) -> None:
+        """
+        Проверяет учёт вызовов фаз, счётчиков и числа элементов потока
+        """
+        recorder = profiling.Recorder()
+        for _ in range(2):
+            with recorder.timer("phase"):
+                pass
+        recorder.add("bytes", 10)
+        self.assertEqual(list(recorder.counted(iter("abc"), "items")), ["a", "b", "c"])
+
+        report = recorder.report()
+        self.assertEqual(report["timers"]["phase"]["calls"], 2)
+        self.assertEqual(report["counters"], {"bytes": 10, "items": 3})
+
+    def test_disabled_by_default(self) -> None:
+        """
+        Проверяет, что без сеанса замеров регистратор ничего не записывает
+        и не оборачивает потоки
+        """
+        self.assertFalse(profiling.recorder.enabled)
+        items = [1, 2]
+        self.assertIs(profiling.recorder.counted(items, "items"), items)
+        self.assertIs(profiling.recorder.timer("a"), profiling.recorder.timer("b"))
+
+
+class TestSession(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name)
+        self.storage = Storage(str(self.directory / "books.json"))
+        self.storage.save_books([Book("Война и мир", "Лев Толстой", 1869), Book("Python Basics", "John", 2020)])
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_stats_file(self) -> None:
+        """
+        Проверяет, что отчёты запусков дописываются строками JSON
+        с фазами хранилища и сервиса, а после сеанса замеры выключаются
+        """
+        stats = self.directory / "stats.jsonl"
+        for _ in range(2):
+            with profiling.session("search", "json", str(stats), None):
+                LibraryService(Storage(str(self.storage.file_path))).search_books(author="толст")
+        self.assertFalse(profiling.recorder.enabled)
+
+        reports = [json.loads(line) for line in stats.read_text(encoding="utf-8").splitlines()]
+        self.assertEqual(len(reports), 2)
+        self.assertEqual(reports[0]["command"], "search")
+        for phase in ("command", "catalogue.load", "storage.read", "storage.decode", "service.search"):
+            self.assertIn(phase, reports[0]["timers"])
+        self.assertEqual(reports[0]["counters"]["storage.books_read"], 2)
+        self.assertEqual(reports[0]["counters"]["service.results"], 1)
+        self.assertEqual(reports[0]["counters"]["storage.bytes_read"], self.storage.file_path.stat().st_size)
+
+        summary = profiling.summarize(stats.read_text(encoding="utf-8").splitlines())
+        self.assertEqual(summary["search"]["runs"], 2)
+        self.assertEqual(summary["search"]["timers"]["service.search"]["calls"], 2)
+        self.assertEqual(summary["search"]["counters"]["storage.books_read"], 4)
+
+    def test_stderr_and_profile(self) -> None:
+        """
+        Проверяет вывод отчёта в stderr и сохранение профиля cProfile
+        """
+        profile = self.directory / "command.prof"
+        with patch("sys.stderr", new=io.StringIO()) as stderr:
+            with profiling.session("add", "json", "-", str(profile)):
+                LibraryService(self.storage).add_book("Анна Каренина", "Лев Толстой", 1877)
+
+        report = json.loads(stderr.getvalue())
+        self.assertEqual(report["counters"]["storage.books_written"], 3)
+        self.assertIn("service.save", report["timers"])
+        self.assertIn("storage.write", report["timers"])
+        self.assertGreater(pstats.Stats(str(profile)).total_calls, 0)
+
+    def test_disabled_session(self) -> None:
+        """
+        Проверяет, что без параметров сеанс не включает замеры и профилировщик
+        """
+        with patch.object(cProfile, "Profile") as profile, profiling.session("list", "json", None, None):
+            self.assertFalse(profiling.recorder.enabled)
+        profile.assert_not_called()
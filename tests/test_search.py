@@ -0,0 +1,177 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.models import Book
+from src.search import SearchIndex, journal_path, tokenize
+from src.services import LibraryService
+from src.storage import Storage
+
+
+class TestTokenize(TestCase):
+    def test_casefold_and_yo(self) -> None:
+        """
+        Проверяет нормализацию регистра и замену «ё» на «е»
+        """
+        self.assertEqual(tokenize("Ёжик в Тумане, 2-е изд."), ["ежик", "в", "тумане", "2", "е", "изд"])
+
+
+class TestSearchIndex(TestCase):
+    def setUp(self) -> None:
+        self.books = [
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+            Book(title="Анна Каренина", author="Лев Толстой", year=1877),
+            Book(title="Мёртвые души", author="Николай Гоголь", year=1842),
+            Book(title="Python Basics", author="John Smith", year=2020),
+        ]
+        self.index = SearchIndex(self.books)
+
+    def ids(self, query: str, limit: int = 10) -> list[str]:
+        return [book_id for book_id, _ in self.index.search(query, limit)]
+
+    def test_exact_word(self) -> None:
+        """
+        Проверяет поиск по целому слову
+        """
+        self.assertEqual(self.ids("мир"), [self.books[0].id])
+
+    def test_yo_folding(self) -> None:
+        """
+        Проверяет, что «е» в запросе находит «ё» в названии
+        """
+        self.assertEqual(self.ids("мертвые"), [self.books[2].id])
+
+    def test_substring(self) -> None:
+        """
+        Проверяет поиск по части слова
+        """
+        self.assertEqual(self.ids("карен"), [self.books[1].id])
+
+    def test_fuzzy(self) -> None:
+        """
+        Проверяет поиск с опечаткой
+        """
+        self.assertEqual(set(self.ids("толстый")), {self.books[0].id, self.books[1].id})
+
+    def test_ranking_and_limit(self) -> None:
+        """
+        Проверяет, что книга с большим числом совпадений идёт первой, а limit ограничивает выдачу
+        """
+        self.assertEqual(self.ids("толстой анна")[0], self.books[1].id)
+        self.assertEqual(len(self.ids("толстой", limit=1)), 1)
+
+    def test_remove(self) -> None:
+        """
+        Проверяет, что удалённая книга не находится
+        """
+        self.index.remove(self.books[0])
+
+        self.assertEqual(self.ids("мир"), [])
+        self.assertEqual(self.ids("толстой"), [self.books[1].id])
+        self.assertEqual(len(self.index), 3)
+
+    def test_changes_after_search(self) -> None:
+        """
+        Проверяет, что добавление и удаление учитываются после первого поиска по слову
+        """
+        self.assertEqual(set(self.ids("толстой")), {self.books[0].id, self.books[1].id})
+
+        self.index.remove(self.books[0])
+        book = Book(title="Толстой", author="Толстой", year=1900)
+        self.index.add(book)
+
+        self.assertEqual(self.ids("толстой"), [book.id, self.books[1].id])
+        self.assertEqual(self.ids("толстой", limit=1), [book.id])
+
+    def test_save_and_load(self) -> None:
+        """
+        Проверяет, что индекс загружается только для той же отметки данных
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "books.json.search"
+            self.index.save(path, (1, 2, 3))
+
+            loaded = SearchIndex.load(path, (1, 2, 3))
+            self.assertEqual(loaded.search("гоголь"), self.index.search("гоголь"))
+            self.assertIsNone(SearchIndex.load(path, (1, 2, 4)))
+
+    def test_expansion_limit(self) -> None:
+        """
+        Проверяет, что короткое слово расширяется только до MAX_EXPANSIONS слов
+        с наибольшими весами
+        """
+        books = [Book(f"абв{'г' * (number % 3)}{chr(ord('а') + number)}", "Автор", 2000) for number in range(30)]
+        index = SearchIndex(books)
+
+        expansions = index._expand("абв")
+        self.assertEqual(len(expansions), SearchIndex.MAX_EXPANSIONS)
+        self.assertTrue(all(len(token) == 4 for token, _ in expansions))
+        self.assertEqual(len(index.search("абв", limit=30)), SearchIndex.MAX_EXPANSIONS)
+
+    def test_journal(self) -> None:
+        """
+        Проверяет, что сохранённый индекс догоняется по непрерывному журналу,
+        а при разрыве цепочки отметок не загружается
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "books.json.search"
+            self.index.save(path, (1, 2, 3))
+            book = Book(title="Ревизор", author="Николай Гоголь", year=1836)
+            SearchIndex.record(path, (1, 2, 3), (1, 2, 4), [(False, self.books[2]), (True, book)])
+            SearchIndex.record(path, (1, 2, 4), (1, 2, 5), [])
+
+            loaded = SearchIndex.load(path, (1, 2, 5))
+            self.assertEqual([book_id for book_id, _ in loaded.search("гоголь")], [book.id])
+            self.assertEqual(loaded.replayed, 2)
+            self.assertEqual(len(SearchIndex.load(path, (1, 2, 4))), 4)
+            self.assertIsNone(SearchIndex.load(path, (1, 2, 6)))
+
+            SearchIndex.record(path, (1, 2, 7), (1, 2, 8), [])
+            self.assertIsNone(SearchIndex.load(path, (1, 2, 8)))
+
+            loaded.save(path, (1, 2, 5))
+            self.assertFalse(journal_path(path).exists())
+
+    def test_load_damaged_file(self) -> None:
+        """
+        Проверяет, что повреждённый или чужой файл индекса игнорируется
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "books.json.search"
+            for content in (b"\x80\x05garbage", b'{"version": 2}', b"[]"):
+                path.write_bytes(content)
+                self.assertIsNone(SearchIndex.load(path, (1, 2, 3)))
+
+
+class TestServiceSearchJournal(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = Storage(str(Path(self.temp_dir.name) / "books.json"))
+        self.index_path = str(Path(self.temp_dir.name) / "books.json.search")
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def service(self) -> LibraryService:
+        return LibraryService(self.storage, search_index_path=self.index_path)
+
+    def test_writes_do_not_invalidate_saved_index(self) -> None:
+        """
+        Проверяет, что после записей в других сервисах индекс не строится заново,
+        а после изменения хранилища в обход сервиса — строится
+        """
+        first = self.service()
+        book = first.add_book("Война и мир", "Лев Толстой", 1869)
+        self.assertEqual(first.find_books("война"), [book])
+
+        second = self.service()
+        new_book = second.add_book("Анна Каренина", "Лев Толстой", 1877)
+        second.update_book_status(book.id, "выдана")
+        second.remove_book(book.id)
+
+        with patch.object(SearchIndex, "save", side_effect=AssertionError):
+            self.assertEqual(self.service().find_books("толстой"), [new_book])
+
+        self.storage.save_books([book])
+        self.assertEqual(self.service().find_books("толстой"), [book])
@@ -0,0 +1,154 @@
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase
+
+from src.circulation import Circulation, LoanEventType
+from src.client import RemoteLibraryService
+from src.models import Book, BookStatus
+from src.server import create_server
+from src.services import LibraryService
+from src.storage import Storage
+
+
+class TestServer(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = Storage(str(Path(self.temp_dir.name) / "books.json"))
+        self.circulation = Circulation(str(Path(self.temp_dir.name) / "books.json.loans"))
+        self.server = create_server(
+            LibraryService(self.storage, circulation=self.circulation), "127.0.0.1", 0
+        )
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client = RemoteLibraryService(f"http://127.0.0.1:{self.server.server_address[1]}")
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.circulation.close()
+        self.temp_dir.cleanup()
+
+    def test_add_search_update_remove(self) -> None:
+        """
+        Проверяет основные операции через клиент и их сохранение сервером
+        """
+        book = self.client.add_book("Война и мир", "Лев Толстой", 1869)
+        self.client.add_book("Python Basics", "John", 2020)
+
+        self.assertEqual(self.client.search_books(author="толст"), [book])
+        self.assertEqual(len(self.client.get_all_books()), 2)
+
+        self.client.update_book_status(book.id, "выдана")
+        self.assertEqual(self.client.search_books(status="выдана")[0].id, book.id)
+        self.assertEqual(self.client.find_books("мир"), [self.client.search_books(status="выдана")[0]])
+
+        self.client.remove_book(book.id)
+        self.assertEqual([saved.title for saved in self.storage.load_books()], ["Python Basics"])
+
+    def test_errors(self) -> None:
+        """
+        Проверяет, что ошибки сервиса передаются клиенту как ValueError
+        """
+        with self.assertRaises(ValueError) as context:
+            self.client.remove_book("none_existent_id")
+        self.assertEqual(str(context.exception), "Книга не найдена")
+
+        with self.assertRaises(ValueError):
+            self.client.update_book_status("none_existent_id", "выдана")
+
+    def test_bulk_changes(self) -> None:
+        """
+        Проверяет пакетное добавление и обновление статусов одним запросом
+        """
+        books = [Book("Book 1", "Author", 1999), Book("Book 2", "Author", 2000)]
+
+        self.assertEqual(self.client.add_books(books), 2)
+        self.client.update_statuses([(books[0].id, "выдана")])
+
+        saved = {book.id: book for book in self.storage.load_books()}
+        self.assertEqual(saved[books[0].id].status, BookStatus.ISSUED)
+        self.assertEqual(saved[books[1].id].status, BookStatus.AVAILABLE)
+
+    def test_circulation(self) -> None:
+        """
+        Проверяет историю выдач, просроченные выдачи и популярные книги через клиент
+        """
+        book = self.client.add_book("Война и мир", "Лев Толстой", 1869)
+        self.client.update_book_status(book.id, "выдана", borrower="Иванов", days=30)
+
+        self.assertEqual(
+            [(event.type, event.borrower) for event in self.client.book_history(book.id, limit=5)],
+            [(LoanEventType.ISSUE, "Иванов")],
+        )
+        self.assertEqual(self.client.top_books(days=1), [(self.client.search_books()[0], 1)])
+        self.assertEqual(self.client.overdue_loans(), [])
+
+    def test_duplicates(self) -> None:
+        """
+        Проверяет поиск дубликатов и добавление без дубликата через клиент
+        """
+        book = self.client.add_book("Война и мир", "Лев Толстой", 1869)
+        self.assertEqual(self.client.add_book("война и мир", "Лев  Толстой", 1869, merge_duplicates=True), book)
+        self.client.add_book("Война и мир.", "Лев Толстой", 1869)
+
+        self.assertEqual(len(self.client.find_duplicates("ВОЙНА И МИР", "лев толстой", 1869)), 2)
+        self.assertEqual([len(group) for group in self.client.duplicate_groups()], [2])
+        self.assertEqual([len(group) for group in self.client.duplicate_groups(fuzzy=True)], [2])
+
+    def test_facets(self) -> None:
+        """
+        Проверяет сводку по каталогу через клиент
+        """
+        book = self.client.add_book("Война и мир", "Лев Толстой", 1869)
+        self.client.add_book("Python Basics", "John", 2020)
+        self.client.update_book_status(book.id, "выдана")
+
+        facets = self.client.facets(year_step=100, authors=1)
+        self.assertEqual(facets.statuses, {"в наличии": 1, "выдана": 1})
+        self.assertEqual(facets.year_ranges, {1800: 1, 2000: 1})
+        self.assertEqual(len(facets.authors), 1)
+        self.assertEqual(len(self.client.facets(authors=None).authors), 2)
+
+    def test_sorted_pages(self) -> None:
+        """
+        Проверяет сортированный список и страницы по курсору через клиент
+        """
+        books = [self.client.add_book(f"Книга {number}", "Автор", 2000 - number) for number in range(5)]
+
+        self.assertEqual(self.client.search_books(author="автор", order_by="year"), books[::-1])
+        self.assertEqual(self.client.get_all_books(order_by="-title"), books[::-1])
+        page = self.client.page_books("title", limit=3)
+        self.assertEqual(page.books, books[:3])
+        last = self.client.page_books("title", page.cursor, 3)
+        self.assertEqual(last.books, books[3:])
+        self.assertIsNone(last.cursor)
+        self.assertEqual(self.client.page_books("title", page.cursor).books, books[3:])
+        with self.assertRaisesRegex(ValueError, "другого порядка"):
+            self.client.page_books("year", page.cursor)
+
+    def test_migrate_sends_local_file(self) -> None:
+        """
+        Проверяет, что перенос читает файл на стороне клиента и передаёт книги в запросе
+        """
+        self.client.add_book("Старая книга", "Автор", 1900)
+        source = Storage(str(Path(self.temp_dir.name) / "source.json"))
+        source.save_books([Book("Book 1", "Author", 1999), Book("Book 2", "Author", 2000)])
+
+        self.assertEqual(self.client.migrate_from_json(str(source.file_path)), 2)
+        self.assertEqual(
+            [book.title for book in self.storage.load_books()], ["Book 1", "Book 2"]
+        )
+
+        with self.assertRaises(ValueError):
+            self.client.migrate_from_json(str(Path(self.temp_dir.name) / "missing.json"))
+
+
+class TestRemoteLibraryServiceUnavailable(TestCase):
+    def test_unavailable_server(self) -> None:
+        """
+        Проверяет, что недоступный сервер приводит к RuntimeError
+        """
+        with self.assertRaises(RuntimeError):
+            RemoteLibraryService("http://127.0.0.1:1").get_all_books()
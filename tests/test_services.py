@@ -1,13 +1,25 @@
+import tempfile
+from multiprocessing import Pool
+from pathlib import Path
 from unittest import TestCase
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
-from src.models import Book, BookStatus
+from src.journal import JournalStorage
+from src.models import Book, BookStatus, Change, ChangeType
 from src.services import LibraryService
+from src.sqlite_storage import SQLiteStorage
+from src.storage import Storage
+
+
+def add_books_in_process(file_path: str, writer: int) -> None:
+    service = LibraryService(Storage(file_path))
+    for number in range(10):
+        service.add_book(f"Book {writer}-{number}", "Author", 2000)
 
 
 class TestLibraryService(TestCase):
     def setUp(self) -> None:
-        self.mock_storage = MagicMock()
+        self.mock_storage = MagicMock(spec=Storage)
         self.service = LibraryService(storage=self.mock_storage)
 
     def test_add_book(self) -> None:
@@ -19,7 +31,7 @@ class TestLibraryService(TestCase):
         self.service.add_book("Test Book", "Author", 1999)
 
         self.mock_storage.save_books.assert_called_once()
-        saved_books = self.mock_storage.save_books.call_args[0][0]
+        saved_books = list(self.mock_storage.save_books.call_args[0][0])
         self.assertEqual(len(saved_books), 1)
         self.assertEqual(saved_books[0].title, "Test Book")
 
@@ -152,3 +164,255 @@ class TestLibraryService(TestCase):
 
         self.assertNotEqual(book.status, "Неверный статус книги")
         self.mock_storage.save_books.assert_not_called()
+
+    def test_compact_storage(self) -> None:
+        """
+        Проверяет, что метод compact_storage вызывает компактирование хранилища
+        """
+        storage = MagicMock(spec=JournalStorage)
+        LibraryService(storage).compact_storage()
+
+        storage.compact.assert_called_once()
+
+    def test_search_books_by_status(self) -> None:
+        """
+        Проверяет, что метод search_books фильтрует книги по статусу
+        """
+        book = Book(title="Python Basics", author="John", year=2020, status=BookStatus.ISSUED)
+        self.mock_storage.load_books.return_value = [
+            book,
+            Book(title="Advanced Python", author="Margo", year=2021),
+        ]
+
+        result = self.service.search_books(status="выдана")
+        self.assertEqual(result, [book])
+
+    def test_catalogue_is_loaded_once(self) -> None:
+        """
+        Проверяет, что каталог загружается из хранилища один раз
+        """
+        book = Book("Test Book", "Author", 1999)
+        self.mock_storage.load_books.return_value = [book]
+
+        self.service.update_book_status(book.id, "выдана")
+        self.service.search_books(title="Test")
+        self.service.remove_book(book.id)
+
+        self.mock_storage.load_books.assert_called_once()
+        self.assertEqual(self.service.get_all_books(), [])
+
+    def test_find_books_ranked(self) -> None:
+        """
+        Проверяет, что метод find_books возвращает книги по убыванию релевантности
+        """
+        books = [
+            Book(title="Python Basics", author="John", year=2020),
+            Book(title="Python and Python", author="Margo", year=2021),
+            Book(title="Rust", author="John", year=2021),
+        ]
+        self.mock_storage.load_books.return_value = books
+
+        result = self.service.find_books("python", limit=1)
+        self.assertEqual(result, [books[1]])
+
+        self.service.remove_book(books[1].id)
+        self.assertEqual(self.service.find_books("python"), [books[0]])
+
+    def test_iter_search_books_streams_from_storage(self) -> None:
+        """
+        Проверяет, что потоковый поиск читает хранилище по одной книге без загрузки каталога
+        """
+        books = [
+            Book(title="Python Basics", author="John", year=2020),
+            Book(title="Advanced Python", author="Margo", year=2021),
+        ]
+        self.mock_storage.iter_books.return_value = iter(books)
+
+        result = list(self.service.iter_search_books(author="margo"))
+
+        self.assertEqual(result, [books[1]])
+        self.mock_storage.load_books.assert_not_called()
+
+    def test_add_books_single_save(self) -> None:
+        """
+        Проверяет, что метод add_books сохраняет все книги одним вызовом save_books
+        """
+        self.mock_storage.load_books.return_value = []
+        books = [Book("Book 1", "Author", 1999), Book("Book 2", "Author", 2000)]
+
+        self.assertEqual(self.service.add_books(books), 2)
+
+        self.mock_storage.save_books.assert_called_once()
+        saved_books, changes = self.mock_storage.save_books.call_args[0]
+        self.assertEqual(list(saved_books), books)
+        self.assertEqual(len(changes), 2)
+
+    def test_remove_books_is_atomic(self) -> None:
+        """
+        Проверяет, что remove_books ничего не удаляет, если одна из книг не найдена
+        """
+        book = Book("Test Book", "Author", 1999)
+        self.mock_storage.load_books.return_value = [book]
+
+        with self.assertRaises(ValueError):
+            self.service.remove_books([book.id, "none_existent_id"])
+
+        self.mock_storage.save_books.assert_not_called()
+        self.assertEqual(self.service.get_all_books(), [book])
+
+    def test_update_statuses(self) -> None:
+        """
+        Проверяет массовое обновление статусов одним сохранением
+        """
+        books = [Book("Book 1", "Author", 1999), Book("Book 2", "Author", 2000)]
+        self.mock_storage.load_books.return_value = books
+
+        self.service.update_statuses([(books[0].id, "выдана"), (books[1].id, "выдана")])
+
+        self.assertEqual([book.status for book in books], [BookStatus.ISSUED] * 2)
+        self.mock_storage.save_books.assert_called_once()
+
+    def test_apply_changes_sees_books_added_in_batch(self) -> None:
+        """
+        Проверяет, что пакет может изменить книгу, добавленную в нём же,
+        но не может дважды удалить одну книгу
+        """
+        self.mock_storage.load_books.return_value = []
+        book = Book("Test Book", "Author", 1999)
+        add = Change(ChangeType.ADD, book.id, book=book)
+        remove = Change(ChangeType.REMOVE, book.id)
+
+        self.service.apply_changes(
+            [add, Change(ChangeType.STATUS, book.id, status=BookStatus.ISSUED)]
+        )
+        self.assertEqual(book.status, BookStatus.ISSUED)
+
+        with self.assertRaises(ValueError):
+            self.service.apply_changes([remove, remove])
+
+    def test_add_with_existing_id_replaces_search_entry(self) -> None:
+        """
+        Проверяет, что добавление книги с существующим id заменяет её в полнотекстовом индексе
+        """
+        book = Book("Война и мир", "Лев Толстой", 1869)
+        self.mock_storage.load_books.return_value = [book]
+        self.assertEqual(self.service.find_books("война"), [book])
+
+        replacement = Book("Python", "John", 2020, id=book.id)
+        self.service.add_books([replacement])
+
+        self.assertEqual(self.service.find_books("война"), [])
+        self.assertEqual(self.service.find_books("python"), [replacement])
+        self.assertEqual(self.service._search_index._total_length, 2)
+
+    def test_failed_journal_write_is_not_visible(self) -> None:
+        """
+        Проверяет, что после ошибки записи в журнал сервис не показывает несохранённый статус
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            storage = JournalStorage(str(Path(temp_dir) / "books.json"))
+            service = LibraryService(storage)
+            book = service.add_book("Test Book", "Author", 1999)
+
+            with patch("src.journal.os.fsync", side_effect=OSError("disk full")):
+                with self.assertRaises(RuntimeError):
+                    service.update_book_status(book.id, "выдана")
+
+            self.assertEqual(service.search_books(status="выдана"), [])
+
+
+class TestConcurrentWriters(TestCase):
+    def test_parallel_processes_do_not_lose_updates(self) -> None:
+        """
+        Проверяет, что параллельные процессы не затирают добавления друг друга
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = str(Path(temp_dir) / "books.json")
+            Storage(file_path)
+            with Pool(4) as pool:
+                pool.starmap(add_books_in_process, [(file_path, writer) for writer in range(4)])
+
+            self.assertEqual(len(Storage(file_path).load_books()), 40)
+
+    def test_sees_changes_of_other_service(self) -> None:
+        """
+        Проверяет, что сервис перечитывает каталог, изменённый другим экземпляром
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = str(Path(temp_dir) / "books.json")
+            first = LibraryService(Storage(file_path))
+            second = LibraryService(Storage(file_path))
+            book = first.add_book("Test Book", "Author", 1999)
+            self.assertEqual(second.get_all_books(), [book])
+
+            second.update_book_status(book.id, "выдана")
+            first.add_book("Second Book", "Author", 2000)
+
+            self.assertEqual(first.search_books(status="выдана")[0].id, book.id)
+            self.assertEqual(len(second.get_all_books()), 2)
+
+
+class TestLibraryServiceSQLiteSearch(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = SQLiteStorage(str(Path(self.temp_dir.name) / "books.db"))
+        self.service = LibraryService(self.storage)
+
+    def tearDown(self) -> None:
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_batch_add_and_remove_updates_search_index(self) -> None:
+        """
+        Проверяет, что книга, добавленная и удалённая в одном пакете, не находится полнотекстовым поиском
+        """
+        self.service.add_book("Война и мир", "Лев Толстой", 1869)
+        self.assertEqual(len(self.service.find_books("война")), 1)
+
+        book = Book("Война миров", "Герберт Уэллс", 1897)
+        self.service.apply_changes(
+            [Change(ChangeType.ADD, book.id, book=book), Change(ChangeType.REMOVE, book.id)]
+        )
+
+        self.assertEqual([found.title for found in self.service.find_books("война")], ["Война и мир"])
+
+
+class TestLibraryServiceIndexedStorage(TestCase):
+    def setUp(self) -> None:
+        self.mock_storage = MagicMock(spec=SQLiteStorage)
+        self.service = LibraryService(storage=self.mock_storage)
+
+    def test_search_is_pushed_down(self) -> None:
+        """
+        Проверяет, что поиск выполняется хранилищем без загрузки каталога
+        """
+        self.service.search_books(title="Python", status="выдана")
+
+        self.mock_storage.search_books.assert_called_once_with(
+            "Python", None, None, None, None, BookStatus.ISSUED
+        )
+        self.mock_storage.load_books.assert_not_called()
+
+    def test_update_book_status_is_single_change(self) -> None:
+        """
+        Проверяет, что смена статуса передаётся хранилищу одним изменением
+        """
+        book = Book("Test Book", "Author", 1999)
+        self.mock_storage.get_book.return_value = book
+
+        self.service.update_book_status(book.id, "выдана")
+
+        changes = self.mock_storage.apply_changes.call_args[0][0]
+        self.assertEqual(changes, [Change(ChangeType.STATUS, book.id, status=BookStatus.ISSUED)])
+        self.mock_storage.save_books.assert_not_called()
+
+    def test_remove_non_existent_book(self) -> None:
+        """
+        Проверяет, что удаление несуществующей книги вызывает исключение
+        """
+        self.mock_storage.get_book.return_value = None
+
+        with self.assertRaises(ValueError):
+            self.service.remove_book("none_existent_id")
+
+        self.mock_storage.apply_changes.assert_not_called()
@@ -0,0 +1,157 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.models import Book, BookStatus, Change, ChangeType
+from src.services import LibraryService
+from src.sharded_storage import ShardedStorage, shard_of
+from src.storage import IndexedStorage, Storage
+
+
+class TestShardedStorage(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name) / "books.shards"
+        self.storage = ShardedStorage(str(self.directory), shards=4, workers=1)
+        self.books = [
+            Book(title=f"Книга {i}", author="Лев Толстой" if i % 2 else "John Smith", year=1900 + i)
+            for i in range(20)
+        ]
+        self.storage.save_books(self.books)
+
+    def tearDown(self) -> None:
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def ids(self, books: list[Book]) -> set[str]:
+        return {book.id for book in books}
+
+    def test_is_indexed_storage(self) -> None:
+        """
+        Проверяет, что хранилище реализует интерфейс IndexedStorage
+        """
+        self.assertIsInstance(self.storage, IndexedStorage)
+
+    def test_books_are_split_by_id(self) -> None:
+        """
+        Проверяет, что каждая книга лежит в сегменте, определяемом её id
+        """
+        for shard in range(4):
+            stored = Storage(str(self.directory / f"shard-{shard:03d}.json")).load_books()
+            self.assertTrue(all(shard_of(book.id, 4) == shard for book in stored))
+        self.assertEqual(self.ids(self.storage.load_books()), self.ids(self.books))
+
+    def test_shard_count_is_persisted(self) -> None:
+        """
+        Проверяет, что повторное открытие использует число сегментов из shards.json
+        """
+        reopened = ShardedStorage(str(self.directory), shards=16, workers=1)
+
+        self.assertEqual(reopened.shards, 4)
+        self.assertEqual(json.loads((self.directory / "shards.json").read_text()), {"shards": 4})
+        self.assertEqual(self.ids(reopened.load_books()), self.ids(self.books))
+
+    def test_search_books(self) -> None:
+        """
+        Проверяет поиск по всем сегментам
+        """
+        found = self.storage.search_books(author="толстой", year_from=1905)
+
+        self.assertEqual(
+            self.ids(found),
+            {book.id for book in self.books if book.year >= 1905 and book.author == "Лев Толстой"},
+        )
+
+    def test_get_book_reads_one_shard(self) -> None:
+        """
+        Проверяет, что поиск книги по id читает только её сегмент
+        """
+        book = self.books[3]
+        with patch("src.sharded_storage.Storage.load_books", autospec=True, side_effect=Storage.load_books) as load:
+            self.assertEqual(self.storage.get_book(book.id), book)
+            self.assertIsNone(self.storage.get_book("missing"))
+
+        shards = {shard_of(book.id, 4), shard_of("missing", 4)}
+        self.assertEqual(load.call_count, len(shards))
+
+    def test_apply_changes(self) -> None:
+        """
+        Проверяет, что изменения переписывают только затронутые сегменты
+        """
+        book = Book(title="Анна Каренина", author="Лев Толстой", year=1877)
+        changes = [
+            Change(ChangeType.ADD, book.id, book=book),
+            Change(ChangeType.REMOVE, self.books[0].id),
+            Change(ChangeType.STATUS, self.books[1].id, status=BookStatus.ISSUED),
+        ]
+        touched = {shard_of(change.book_id, 4) for change in changes}
+        stamps = self.storage.stamp()
+
+        self.storage.apply_changes(changes)
+
+        reopened = ShardedStorage(str(self.directory), workers=1)
+        self.assertEqual(reopened.get_book(book.id), book)
+        self.assertIsNone(reopened.get_book(self.books[0].id))
+        self.assertEqual(reopened.get_book(self.books[1].id).status, BookStatus.ISSUED)
+        for shard, (before, after) in enumerate(zip(stamps, self.storage.stamp())):
+            self.assertEqual(before != after, shard in touched)
+
+    def test_process_pool(self) -> None:
+        """
+        Проверяет чтение, поиск и пакет изменений в пуле процессов
+        """
+        storage = ShardedStorage(str(self.directory), workers=2)
+        try:
+            self.assertEqual(self.ids(storage.load_books()), self.ids(self.books))
+            self.assertEqual(len(storage.search_books(author="smith")), 10)
+
+            storage.apply_changes(
+                [Change(ChangeType.STATUS, book.id, status=BookStatus.ISSUED) for book in self.books]
+            )
+            self.assertEqual(len(storage.search_books(status=BookStatus.ISSUED)), 20)
+            self.assertEqual(self.storage.get_book(self.books[5].id).status, BookStatus.ISSUED)
+        finally:
+            storage.close()
+
+
+class TestLibraryServiceShardedStorage(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = ShardedStorage(str(Path(self.temp_dir.name) / "books.shards"), workers=1)
+        self.service = LibraryService(self.storage)
+
+    def tearDown(self) -> None:
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_service_operations(self) -> None:
+        """
+        Проверяет добавление, смену статуса, удаление и поиск через сервис
+        """
+        book = self.service.add_book("Война и мир", "Лев Толстой", 1869)
+        other = self.service.add_book("Python Basics", "John Smith", 2020)
+        self.service.update_book_status(book.id, "выдана")
+        self.service.remove_book(other.id)
+
+        self.assertEqual(self.service.search_books(status="выдана"), [book])
+        self.assertEqual(self.service.find_books("война"), [book])
+        with self.assertRaises(ValueError):
+            self.service.remove_book(other.id)
+
+    def test_writes_after_process_pool(self) -> None:
+        """
+        Проверяет, что пул процессов, созданный под блокировкой хранилища,
+        не удерживает её и следующая запись не зависает
+        """
+        storage = ShardedStorage(str(Path(self.temp_dir.name) / "pooled.shards"), shards=4, workers=2)
+        service = LibraryService(storage)
+        books = [Book(f"Книга {i}", "Автор", 2000) for i in range(20)]
+        try:
+            service.add_books(books)
+            service.update_book_status(books[0].id, "выдана")
+            service.update_statuses([(book.id, "выдана") for book in books[1:]])
+            self.assertEqual(len(service.search_books(status="выдана")), 20)
+        finally:
+            storage.close()
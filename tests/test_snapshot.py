@@ -0,0 +1,105 @@
+import gzip
+import io
+import json
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipIf
+
+from src import snapshot
+from src.importer import read_books
+from src.models import Book, BookStatus
+from src.snapshot import read_manifest, read_snapshot, write_snapshot
+
+
+class TestSnapshot(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.books = [
+            Book(f"Книга, \"часть\" {number}", f"Автор {number % 3}", 1900 + number, BookStatus.AVAILABLE)
+            for number in range(25)
+        ]
+        self.books[3].status = BookStatus.ISSUED
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def path(self, name: str) -> str:
+        return str(Path(self.temp_dir.name) / name)
+
+    def test_round_trip(self) -> None:
+        """
+        Проверяет, что книги восстанавливаются из снимка во всех форматах и способах сжатия
+        """
+        for file_format in ("jsonl", "csv"):
+            for compression in ("gzip", "lzma", "none"):
+                with self.subTest(file_format=file_format, compression=compression):
+                    directory = self.path(f"{file_format}-{compression}")
+                    manifest = write_snapshot(
+                        self.books, directory, file_format, compression, chunk_size=10, workers=1
+                    )
+                    self.assertEqual(manifest["books"], 25)
+                    self.assertEqual([chunk["books"] for chunk in manifest["chunks"]], [10, 10, 5])
+                    self.assertEqual(list(read_snapshot(directory, workers=1)), self.books)
+
+    def test_parallel(self) -> None:
+        """
+        Проверяет запись и чтение фрагментов в пуле процессов
+        """
+        directory = self.path("parallel")
+        serial = write_snapshot(self.books, self.path("serial"), chunk_size=4, workers=1)
+        parallel = write_snapshot(self.books, directory, chunk_size=4, workers=2)
+        # Сжатие без времени в заголовке делает фрагменты одинаковыми при любом числе процессов
+        self.assertEqual(parallel["chunks"], serial["chunks"])
+        self.assertEqual(list(read_snapshot(directory, workers=2)), self.books)
+
+    def test_chunk_is_importable(self) -> None:
+        """
+        Проверяет, что распакованный фрагмент JSONL читается импортом
+        """
+        directory = Path(self.path("snapshot"))
+        manifest = write_snapshot(self.books, str(directory), workers=1)
+        data = gzip.decompress((directory / manifest["chunks"][0]["file"]).read_bytes()).decode("utf-8")
+        self.assertEqual(list(read_books(io.StringIO(data), "jsonl")), self.books)
+
+    def test_corrupted_chunk(self) -> None:
+        """
+        Проверяет, что изменённый или пропавший фрагмент обнаруживается при чтении
+        """
+        directory = Path(self.path("snapshot"))
+        manifest = write_snapshot(self.books, str(directory), chunk_size=10, workers=1)
+        chunk = directory / manifest["chunks"][1]["file"]
+        data = bytearray(chunk.read_bytes())
+        data[-10] ^= 1
+        chunk.write_bytes(bytes(data))
+        with self.assertRaisesRegex(ValueError, "Контрольная сумма"):
+            list(read_snapshot(str(directory), workers=1))
+
+        chunk.unlink()
+        with self.assertRaisesRegex(ValueError, "не найден"):
+            list(read_snapshot(str(directory), workers=1))
+
+    def test_invalid_snapshot(self) -> None:
+        """
+        Проверяет ошибки для отсутствующего снимка, непустого каталога и другой версии
+        """
+        with self.assertRaises(ValueError):
+            read_manifest(self.path("missing"))
+
+        directory = Path(self.path("snapshot"))
+        write_snapshot(self.books, str(directory), workers=1)
+        with self.assertRaisesRegex(ValueError, "не пуст"):
+            write_snapshot(self.books, str(directory), workers=1)
+
+        manifest = json.loads((directory / "manifest.json").read_text(encoding="utf-8"))
+        manifest["version"] = 99
+        (directory / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        with self.assertRaises(ValueError):
+            read_manifest(str(directory))
+
+    @skipIf(snapshot.zstandard is not None, "модуль zstandard установлен")
+    def test_zstd_unavailable(self) -> None:
+        """
+        Проверяет понятную ошибку, если сжатие zstd недоступно
+        """
+        with self.assertRaisesRegex(ValueError, "zstandard"):
+            write_snapshot(self.books, self.path("snapshot"), compression="zstd")
@@ -0,0 +1,96 @@
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from src.models import Book, BookFilter, BookStatus, Change, ChangeType
+from src.paging import Order
+from src.sqlite_storage import INDEXES, SQLiteStorage
+from src.storage import IndexedStorage
+
+
+class TestSQLiteStorage(TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.db"
+        self.storage = SQLiteStorage(str(self.file_path))
+        self.books = [
+            Book(title="Python Basics", author="John", year=2020),
+            Book(title="Advanced Python", author="Margo", year=2021),
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+        ]
+        self.storage.save_books(self.books)
+
+    def tearDown(self) -> None:
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_is_indexed_storage(self) -> None:
+        """
+        Проверяет, что хранилище реализует интерфейс IndexedStorage
+        """
+        self.assertIsInstance(self.storage, IndexedStorage)
+
+    def test_save_and_load_books(self) -> None:
+        """
+        Проверяет, что методы save_books и load_books сохраняют порядок книг
+        """
+        self.assertEqual(self.storage.load_books(), self.books)
+        self.storage.save_books(self.books[:1])
+        self.assertEqual(self.storage.load_books(), self.books[:1])
+
+    def test_apply_changes(self) -> None:
+        """
+        Проверяет, что изменения применяются построчно
+        """
+        book = Book(title="Анна Каренина", author="Лев Толстой", year=1877)
+        self.storage.apply_changes(
+            [
+                Change(ChangeType.ADD, book.id, book=book),
+                Change(ChangeType.REMOVE, self.books[0].id),
+                Change(ChangeType.STATUS, self.books[1].id, status=BookStatus.ISSUED),
+            ]
+        )
+
+        reopened = SQLiteStorage(str(self.file_path))
+        self.assertEqual(
+            [loaded.id for loaded in reopened.load_books()],
+            [self.books[1].id, self.books[2].id, book.id],
+        )
+        self.assertEqual(reopened.get_book(self.books[1].id).status, BookStatus.ISSUED)
+        self.assertIsNone(reopened.get_book(self.books[0].id))
+        reopened.close()
+
+    def test_search_books(self) -> None:
+        """
+        Проверяет фильтрацию в SQL, в том числе без учёта регистра кириллицы
+        """
+        self.assertEqual(self.storage.search_books(title="python"), self.books[:2])
+        self.assertEqual(self.storage.search_books(author="толст"), [self.books[2]])
+        self.assertEqual(self.storage.search_books(year_from=2000, year_to=2020), [self.books[0]])
+        self.assertEqual(self.storage.search_books(title="python", year=2021), [self.books[1]])
+        self.assertEqual(self.storage.search_books(status=BookStatus.ISSUED), [])
+
+    def test_page_books(self) -> None:
+        """
+        Проверяет выборку страницы по индексу ключа в обоих направлениях
+        и восстановление индексов после замены всех книг
+        """
+        order = Order("title")
+        self.assertEqual(self.storage.page_books(order, None, 2, BookFilter()), [self.books[1], self.books[0]])
+        after = order.key(self.books[1])
+        self.assertEqual(self.storage.page_books(order, after, None, BookFilter()), [self.books[0], self.books[2]])
+        self.assertEqual(
+            self.storage.page_books(Order("year", True), (2021, self.books[1].id), 5, BookFilter(title="python")),
+            [self.books[0]],
+        )
+
+        self.storage.save_books(self.books[:1])
+        indexes = {
+            name for (name,) in self.storage._connection.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        }
+        self.assertLessEqual(set(INDEXES), indexes)
+        plan = self.storage._connection.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM books WHERE (title_lower, id) > (?, ?) ORDER BY title_lower, id",
+            ("", ""),
+        ).fetchall()
+        self.assertIn("books_title_order", str(plan))
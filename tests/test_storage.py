@@ -1,8 +1,11 @@
+import json
 import tempfile
+from pathlib import Path
 from unittest import TestCase
+from unittest.mock import patch
 
-from src.storage import Storage
-from src.models import Book
+from src.storage import CacheInfo, Storage
+from src.models import Book, BookStatus
 
 
 class TestStorage(TestCase):
@@ -22,3 +25,113 @@ class TestStorage(TestCase):
         loaded_books = self.storage.load_books()
         self.assertEqual(len(loaded_books), 1)
         self.assertEqual(loaded_books[0].title, "Test Book")
+
+    def test_iter_books(self):
+        """
+        Проверяет потоковое чтение книг, разрезанных границами блоков
+        """
+        books = [
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+            Book(title="Test Book", author="Author", year=1999),
+        ]
+        self.storage.save_books(books)
+
+        with patch("src.storage.CHUNK_SIZE", 7):
+            self.assertEqual(list(self.storage.iter_books()), books)
+
+    def test_iter_books_is_lazy(self):
+        """
+        Проверяет, что первая книга возвращается до разбора испорченного хвоста файла
+        """
+        book = Book(title="Test Book", author="Author", year=1999)
+        with open(self.temp_file.name, "w", encoding="utf-8") as file:
+            file.write(f'[{json.dumps(book.to_dict())}, {{"id": ')
+
+        books = self.storage.iter_books()
+        self.assertEqual(next(books), book)
+        with self.assertRaises(RuntimeError):
+            next(books)
+
+    def test_failed_save_keeps_previous_file(self):
+        """
+        Проверяет, что прерванная запись не портит файл и не оставляет временных файлов
+        """
+        book = Book(title="Test Book", author="Author", year=1999)
+        self.storage.save_books([book])
+
+        with patch("src.storage.os.fsync", side_effect=OSError("disk full")):
+            with self.assertRaises(RuntimeError):
+                self.storage.save_books([book, Book(title="New", author="Author", year=2000)])
+
+        self.assertEqual(self.storage.load_books(), [book])
+        directory = self.storage.file_path.parent
+        self.assertEqual(list(directory.glob(f".{self.storage.file_path.name}.*.tmp")), [])
+
+
+class TestStorageCache(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.json"
+        self.storage = Storage(str(self.file_path))
+        self.books = [
+            Book(title="Война и мир", author="Лев Толстой", year=1869),
+            Book(title="Test Book", author="Author", year=1999),
+        ]
+        self.storage.save_books(self.books)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_repeated_load_uses_cache(self):
+        """
+        Проверяет, что повторное чтение неизменённого файла не разбирает его
+        """
+        self.assertEqual(self.storage.load_books(), self.books)
+        with patch("src.storage.json.load") as load:
+            self.assertEqual(self.storage.load_books(), self.books)
+            self.assertEqual(list(self.storage.iter_books()), self.books)
+
+        load.assert_not_called()
+        self.assertEqual(self.storage.cache_info(), CacheInfo(hits=2, misses=1))
+
+    def test_returned_books_are_copies(self):
+        """
+        Проверяет, что изменение полученных книг не меняет кеш
+        """
+        self.storage.load_books()[0].status = BookStatus.ISSUED
+        next(self.storage.iter_books()).title = "Изменено"
+
+        self.assertEqual(self.storage.load_books(), self.books)
+
+    def test_external_change_invalidates_cache(self):
+        """
+        Проверяет, что изменение файла другим экземпляром сбрасывает кеш
+        """
+        self.storage.load_books()
+        Storage(str(self.file_path)).save_books(self.books[:1])
+
+        self.assertEqual(self.storage.load_books(), self.books[:1])
+        self.assertEqual(self.storage.cache_info(), CacheInfo(hits=0, misses=2))
+
+    def test_own_write_invalidates_cache(self):
+        """
+        Проверяет, что собственная запись сбрасывает кеш, даже если она не удалась
+        """
+        self.storage.load_books()
+        with patch("src.storage.os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(RuntimeError):
+                self.storage.save_books(self.books[:1])
+
+        self.assertIsNone(self.storage._cached)
+        self.assertEqual(self.storage.load_books(), self.books)
+
+    def test_cache_disabled(self):
+        """
+        Проверяет, что без кеша каждый вызов читает файл
+        """
+        storage = Storage(str(self.file_path), cache=False)
+        storage.load_books()
+        storage.load_books()
+
+        self.assertIsNone(storage._cached)
+        self.assertEqual(storage.cache_info(), CacheInfo(hits=0, misses=0))